@@ -0,0 +1,139 @@
+"""Synthetic writing collections for benchmarking.
+
+The generated files mirror the shapes found in sample_writings/: list and
+block-string tags, missing categories, missing or empty frontmatter,
+quoted and unicode titles, many tags and the odd malformed header. The
+same seed always gives the same corpus, so runs can be compared.
+"""
+
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Relative weights of the frontmatter shapes, modelled on sample_writings/
+SHAPES: Dict[str, float] = {
+    "list_tags": 60,
+    "newline_tags": 8,
+    "no_category": 8,
+    "no_frontmatter": 6,
+    "only_frontmatter": 3,
+    "quoted_title": 5,
+    "unicode": 4,
+    "many_tags": 4,
+    "empty": 1,
+    "malformed": 1,
+}
+
+CATEGORIES = ["poetry", "essays", "journal", "drafts", "fiction", "notes",
+              "letters", "reviews", "travel", "recipes", "research", "scripts"]
+
+_WORDS = (
+    "the a of and to in is it that was for on with as his her they at be this "
+    "from or had by not word but what some we can out other were all there when "
+    "up use your how said an each she which do their time if will way about many "
+    "then them write would like so these long make thing see him two has look "
+    "more day could go come did number sound no most people my over know water "
+    "than call first who may down side been now find morning coffee light window "
+    "river stone garden winter letter memory silence paper ink story quiet city"
+).split()
+
+
+def _title(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 6))).capitalize()
+
+
+def _tags(rng: random.Random, count: int) -> List[str]:
+    return [f"tag{rng.randrange(200)}" for _ in range(count)]
+
+
+def _body(rng: random.Random, words: int) -> str:
+    """Build a markdown body of roughly ``words`` words."""
+    blocks = []
+    while words > 0:
+        roll = rng.random()
+        if roll < 0.08:
+            blocks.append("## " + _title(rng))
+            continue
+        if roll < 0.12:
+            lines = [" ".join(rng.choices(_WORDS, k=rng.randint(2, 8)))
+                     for _ in range(rng.randint(2, 5))]
+            blocks.append("- " + "\n- ".join(lines))
+        elif roll < 0.14:
+            blocks.append("```python\nprint('" + rng.choice(_WORDS) + "')\n```")
+        else:
+            count = min(words, rng.randint(20, 120))
+            blocks.append(" ".join(rng.choices(_WORDS, k=count)))
+            words -= count
+    return "\n\n".join(blocks) + "\n"
+
+
+def render_file(rng: random.Random, shape: str, words: int) -> str:
+    """Render one file of the given frontmatter shape."""
+    category = rng.choices(CATEGORIES, weights=[1 / (i + 1) for i in range(len(CATEGORIES))])[0]
+    title = _title(rng)
+    body = _body(rng, words)
+    if shape == "no_frontmatter":
+        return body
+    if shape == "empty":
+        return ""
+    if shape == "newline_tags":
+        tags = "".join(f"  - {tag}\n" for tag in _tags(rng, 3))
+        return f"---\ncategory: {category}\ntitle: {title}\ntags: |\n{tags}---\n\n{body}"
+    if shape == "no_category":
+        return f"---\ntitle: {title}\ntags: [{', '.join(_tags(rng, 2))}]\n---\n\n{body}"
+    if shape == "only_frontmatter":
+        return f"---\ncategory: {category}\ntitle: {title}\ntags: [empty]\n---\n"
+    if shape == "quoted_title":
+        return f"---\ncategory: {category}\ntitle: \"{title} with 'quotes'\"\n---\n\n{body}"
+    if shape == "unicode":
+        return f"---\ncategory: {category}\ntitle: {title} 🎨 café\ntags: [ünïcode]\n---\n\n✨ {body}"
+    if shape == "many_tags":
+        return f"---\ncategory: {category}\ntitle: {title}\ntags: [{', '.join(_tags(rng, 20))}]\n---\n\n{body}"
+    if shape == "malformed":
+        return f"---\ncategory: {category}\ntitle: {title}\ntags: [broken, list\n---\n\n{body}"
+    date = f"2024-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}"
+    return (f"---\ncategory: {category}\ntitle: {title}\n"
+            f"tags: [{', '.join(_tags(rng, rng.randint(0, 4)))}]\ndate: {date}\n---\n\n{body}")
+
+
+def generate_corpus(directory: Path, files: int = 1000, seed: int = 0,
+                    median_words: int = 400, max_words: int = 20_000,
+                    large_fraction: float = 0.002, large_words: int = 60_000,
+                    subdirs: int = 8, shapes: Optional[Dict[str, float]] = None) -> List[Path]:
+    """Write a synthetic collection and return the paths created.
+
+    Word counts follow a log-normal distribution around ``median_words``,
+    capped at ``max_words``. A ``large_fraction`` of the files get
+    ``large_words`` words instead, enough to take the paged preview path.
+    Files are spread over ``subdirs`` nested directories and given
+    modification times over the last three years.
+    """
+    rng = random.Random(seed)
+    shapes = shapes or SHAPES
+    names, weights = list(shapes), list(shapes.values())
+    now = time.time()
+    paths = []
+
+    directory.mkdir(parents=True, exist_ok=True)
+    folders = [directory]
+    for i in range(subdirs):
+        # Every other folder nests inside the previous one
+        parent = folders[-1] if i % 2 else directory
+        folders.append(parent / f"folder{i}")
+
+    for i in range(files):
+        if rng.random() < large_fraction:
+            words = large_words
+        else:
+            words = min(max_words, int(rng.lognormvariate(0, 1) * median_words))
+        shape = rng.choices(names, weights)[0]
+        folder = folders[i % len(folders)]
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"{shape}_{i:06}.md"
+        path.write_text(render_file(rng, shape, words), encoding="utf-8")
+        mtime = now - rng.uniform(0, 3 * 365 * 86400)
+        os.utime(path, (mtime, mtime))
+        paths.append(path)
+    return paths
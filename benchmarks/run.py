@@ -0,0 +1,328 @@
+"""Benchmark runner for WriterBox.
+
+Generates a synthetic corpus, times the hot paths of scanning, grouping,
+sorting, tree building and preview rendering, appends the results to a
+JSON history and flags benchmarks that got slower than recent runs on
+the same corpus.
+
+    python -m benchmarks.run --files 5000 --repeat 5
+"""
+
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import click
+
+from benchmarks.corpus import generate_corpus
+from writerbox.cache import MetadataCache
+from writerbox.preview import render_preview
+from writerbox.scanner import FileScanner
+
+DEFAULT_HISTORY = Path(__file__).parent / "history.json"
+
+SORTS = ("date_desc", "date_asc", "title", "word_count")
+
+# Absolute limits in seconds, checked on top of the comparison with past runs.
+# Starting the CLI (e.g. --version) must not pay for the UI or the parsers.
+BUDGETS = {"import_cli": 0.15}
+
+
+def timed(func: Callable[[], Any], repeat: int) -> List[float]:
+    """Time ``repeat`` calls of func, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+class Context:
+    """What the benchmarks share: the corpus and a scan of it."""
+
+    def __init__(self, directory: Path, workdir: Path):
+        self.directory = directory
+        self.workdir = workdir
+        self.files = FileScanner(directory, lazy=True).scan()
+
+
+BENCHMARKS: Dict[str, Callable[[Context, int], List[float]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark under a name."""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+@benchmark("scan")
+def bench_scan(ctx: Context, repeat: int) -> List[float]:
+    """Full parse of every file, as FileScanner does by default."""
+    return timed(lambda: FileScanner(ctx.directory).scan(), repeat)
+
+
+@benchmark("scan_lazy")
+def bench_scan_lazy(ctx: Context, repeat: int) -> List[float]:
+    """Header-only parse, as the UI scans."""
+    return timed(lambda: FileScanner(ctx.directory, lazy=True).scan(), repeat)
+
+
+@benchmark("scan_cached")
+def bench_scan_cached(ctx: Context, repeat: int) -> List[float]:
+    """Rescan with every file answered by a warm metadata cache."""
+    cache = MetadataCache(ctx.workdir / "bench-cache.sqlite")
+    scanner = FileScanner(ctx.directory, cache=cache, lazy=True)
+    scanner.scan()
+    try:
+        return timed(scanner.scan, repeat)
+    finally:
+        cache.close()
+
+
+@benchmark("group_by_category")
+def bench_group(ctx: Context, repeat: int) -> List[float]:
+    """Group the scanned files by category."""
+    scanner = FileScanner(ctx.directory)
+    return timed(lambda: scanner.group_by_category(ctx.files), repeat)
+
+
+@benchmark("sort_files")
+def bench_sort(ctx: Context, repeat: int) -> List[float]:
+    """Pick the first page of every category in each sort order."""
+    from writerbox.ordering import SortedFiles
+    from writerbox.ui import WriterBoxUI
+    categories = FileScanner(ctx.directory).group_by_category(ctx.files)
+
+    def run():
+        for sort in SORTS:
+            for files in categories.values():
+                SortedFiles(files, sort).top(WriterBoxUI.TREE_PAGE)
+    return timed(run, repeat)
+
+
+@benchmark("sort_files_full")
+def bench_sort_full(ctx: Context, repeat: int) -> List[float]:
+    """Sort every category fully in each sort order, as when scrolled to the end."""
+    from writerbox.ordering import SortedFiles
+    categories = FileScanner(ctx.directory).group_by_category(ctx.files)
+
+    def run():
+        for sort in SORTS:
+            for files in categories.values():
+                SortedFiles(files, sort).ordered()
+    return timed(run, repeat)
+
+
+@benchmark("tree_populate")
+def bench_tree(ctx: Context, repeat: int) -> List[float]:
+    """Rebuild the tree with every category open and no cached labels."""
+    from writerbox.ui import WriterBoxUI
+    app = WriterBoxUI(ctx.directory, use_cache=False)
+    timings: List[float] = []
+
+    def populate():
+        app.file_labels = {}
+        app.expanded_categories = set(app.categories)
+        app.populate_tree()
+
+    async def run():
+        async with app.run_test(size=(120, 40)) as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            timings.extend(timed(populate, repeat))
+    asyncio.run(run())
+    return timings
+
+
+@benchmark("preview_render")
+def bench_preview(ctx: Context, repeat: int) -> List[float]:
+    """Render the bodies of the 20 largest small-enough files at 80 columns."""
+    from writerbox.ui import WriterBoxUI
+    small = [f for f in ctx.files if f.size is not None and f.size <= WriterBoxUI.PAGED_PREVIEW_BYTES]
+    small.sort(key=lambda f: f.size, reverse=True)
+    bodies = [f.read_body() for f in small[:20]]
+
+    def run():
+        for body in bodies:
+            render_preview(body, 80)
+    return timed(run, repeat)
+
+
+def import_time(module: str) -> float:
+    """Get the cumulative time to import a module in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+@benchmark("import_cli")
+def bench_import_cli(ctx: Context, repeat: int) -> List[float]:
+    """Import the command-line entry point, as every invocation does."""
+    return [import_time("writerbox.cli") for _ in range(repeat)]
+
+
+@benchmark("import_ui")
+def bench_import_ui(ctx: Context, repeat: int) -> List[float]:
+    """Import the TUI, paid once the app starts."""
+    return [import_time("writerbox.ui") for _ in range(repeat)]
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Reduce timings to the numbers kept in the history."""
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def load_history(path: Path) -> List[Dict[str, Any]]:
+    """Read the run history, or start a new one."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            history = json.load(f)
+    except FileNotFoundError:
+        return []
+    return history if isinstance(history, list) else []
+
+
+def save_history(path: Path, history: List[Dict[str, Any]]) -> None:
+    """Write the run history back."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+        f.write("\n")
+
+
+def baselines(history: List[Dict[str, Any]], corpus: Dict[str, Any],
+              window: int = 5) -> Dict[str, float]:
+    """Get the best median of each benchmark over recent runs on the same corpus."""
+    comparable = [run for run in history if run.get("corpus") == corpus][-window:]
+    best: Dict[str, float] = {}
+    for run in comparable:
+        for name, result in run["results"].items():
+            if name not in best or result["median"] < best[name]:
+                best[name] = result["median"]
+    return best
+
+
+def find_regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, float],
+                     tolerance: float) -> List[Tuple[str, float, float]]:
+    """List (name, baseline, median) for benchmarks slower than baseline by over tolerance."""
+    return [
+        (name, baseline[name], result["median"])
+        for name, result in results.items()
+        if name in baseline and result["median"] > baseline[name] * (1 + tolerance)
+    ]
+
+
+@contextmanager
+def quiet_stderr():
+    """Silence stderr at the file descriptor level.
+
+    The UI swaps sys.stderr out while it runs, so redirecting the Python
+    object isn't enough.
+    """
+    sys.stderr.flush()
+    saved = os.dup(2)
+    try:
+        with open(os.devnull, "w") as devnull:
+            os.dup2(devnull.fileno(), 2)
+        yield
+    finally:
+        os.dup2(saved, 2)
+        os.close(saved)
+
+
+def over_budget(results: Dict[str, Dict[str, float]]) -> List[Tuple[str, float, float]]:
+    """List (name, budget, median) for benchmarks over their BUDGETS entry."""
+    return [
+        (name, BUDGETS[name], result["median"])
+        for name, result in results.items()
+        if name in BUDGETS and result["median"] > BUDGETS[name]
+    ]
+
+
+def run_benchmarks(directory: Path, workdir: Path, names: List[str],
+                   repeat: int) -> Dict[str, Dict[str, float]]:
+    """Run the named benchmarks against a corpus."""
+    # Malformed files in the corpus report errors; keep them off the console
+    with quiet_stderr():
+        ctx = Context(directory, workdir)
+        return {name: summarize(BENCHMARKS[name](ctx, repeat)) for name in names}
+
+
+@click.command()
+@click.option("--files", "-n", default=2000, show_default=True, help="Number of files in the corpus")
+@click.option("--seed", default=0, show_default=True, help="Corpus random seed")
+@click.option("--median-words", default=400, show_default=True, help="Median words per file")
+@click.option("--large-fraction", default=0.002, show_default=True,
+              help="Share of files big enough for paged previews")
+@click.option("--repeat", "-r", default=5, show_default=True, type=click.IntRange(min=1),
+              help="Timed runs per benchmark")
+@click.option("--only", "-k", multiple=True, type=click.Choice(list(BENCHMARKS)),
+              help="Run only these benchmarks (repeatable)")
+@click.option("--history", type=click.Path(dir_okay=False, path_type=Path),
+              default=DEFAULT_HISTORY, show_default=True, help="JSON file of past runs")
+@click.option("--tolerance", default=0.2, show_default=True,
+              help="Slowdown over the recent best that counts as a regression")
+@click.option("--no-record", is_flag=True, help="Compare against the history without adding this run")
+@click.option("--fail-on-regression", is_flag=True,
+              help="Exit with status 1 if anything regressed or went over budget")
+def main(files: int, seed: int, median_words: int, large_fraction: float, repeat: int,
+         only: Tuple[str, ...], history: Path, tolerance: float, no_record: bool,
+         fail_on_regression: bool) -> None:
+    """Benchmark WriterBox on a synthetic collection."""
+    corpus = {"files": files, "seed": seed, "median_words": median_words,
+              "large_fraction": large_fraction}
+    names = list(only) or list(BENCHMARKS)
+    with tempfile.TemporaryDirectory(prefix="writerbox-bench-") as tmp:
+        workdir = Path(tmp)
+        directory = workdir / "corpus"
+        click.echo(f"Generating {files:,} files…", err=True)
+        generate_corpus(directory, files, seed=seed, median_words=median_words,
+                        large_fraction=large_fraction)
+        results = run_benchmarks(directory, workdir, names, repeat)
+
+    past = load_history(history)
+    baseline = baselines(past, corpus)
+    regressions = {name for name, _, _ in find_regressions(results, baseline, tolerance)}
+    over = {name for name, _, _ in over_budget(results)}
+
+    click.echo(f"{'benchmark':<20} {'min':>10} {'median':>10} {'baseline':>10}")
+    for name, result in results.items():
+        base = f"{baseline[name] * 1000:9.1f}ms" if name in baseline else f"{'-':>10}"
+        flag = "  REGRESSION" if name in regressions else ""
+        flag += "  OVER BUDGET" if name in over else ""
+        click.echo(f"{name:<20} {result['min'] * 1000:9.1f}ms {result['median'] * 1000:9.1f}ms {base}{flag}")
+
+    if not no_record:
+        past.append({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": corpus,
+            "repeat": repeat,
+            "results": results,
+        })
+        save_history(history, past)
+
+    if (regressions or over) and fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Streaming aggregation of writing collections."""
+
+import heapq
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from writerbox.scanner import IndexChanges, WritingFile
+
+# strftime formats for the periods of a date histogram
+PERIODS = {
+    "day": "%Y-%m-%d",
+    "week": "%G-W%V",
+    "month": "%Y-%m",
+    "year": "%Y",
+}
+
+
+class Totals:
+    """Running totals for a group of files.
+
+    With ``histogram=True`` the files are also counted per period of
+    their modification date, as set by the Aggregator. With
+    ``removable=True`` files can be taken out again; the modification
+    times still counted are then kept so the oldest and newest dates
+    stay right.
+    """
+
+    def __init__(self, histogram: bool = False, removable: bool = False):
+        self.histogram: Optional[Dict[str, Totals]] = {} if histogram else None
+        self.removable = removable
+        self.files = 0
+        self.words = 0
+        self.chars = 0
+        self.reading_time = 0
+        self._oldest: Optional[float] = None
+        self._newest: Optional[float] = None
+        # Files per modification time, with min/max heaps over them whose
+        # stale entries are dropped when they surface
+        self._mtimes: Optional[Dict[float, int]] = {} if removable else None
+        self._low: List[float] = []
+        self._high: List[float] = []
+
+    @property
+    def oldest(self) -> Optional[datetime]:
+        """Get the earliest modification date counted."""
+        return None if self._oldest is None else datetime.fromtimestamp(self._oldest)
+
+    @property
+    def newest(self) -> Optional[datetime]:
+        """Get the latest modification date counted."""
+        return None if self._newest is None else datetime.fromtimestamp(self._newest)
+
+    def add(self, file: WritingFile, period: Optional[str] = None) -> None:
+        """Count a file towards the totals, and its period's histogram entry."""
+        if self.histogram is not None and period is not None:
+            if period not in self.histogram:
+                self.histogram[period] = Totals(removable=self.removable)
+            self.histogram[period].add(file)
+        self.files += 1
+        self.words += file.word_count
+        self.chars += file.char_count
+        self.reading_time += file.reading_time
+
+        mtime = file.mtime
+        if self._mtimes is not None:
+            count = self._mtimes.get(mtime, 0)
+            self._mtimes[mtime] = count + 1
+            if not count:
+                heapq.heappush(self._low, mtime)
+                heapq.heappush(self._high, -mtime)
+        if self._oldest is None or mtime < self._oldest:
+            self._oldest = mtime
+        if self._newest is None or mtime > self._newest:
+            self._newest = mtime
+
+    def remove(self, file: WritingFile, period: Optional[str] = None) -> None:
+        """Take a previously added file back out of the totals."""
+        if self._mtimes is None:
+            raise ValueError("Files can only be removed from removable totals")
+        if self.histogram is not None and period is not None:
+            entry = self.histogram.get(period)
+            if entry is not None:
+                entry.remove(file)
+                if not entry.files:
+                    del self.histogram[period]
+        self.files -= 1
+        self.words -= file.word_count
+        self.chars -= file.char_count
+        self.reading_time -= file.reading_time
+
+        mtime = file.mtime
+        count = self._mtimes.get(mtime, 0) - 1
+        if count > 0:
+            self._mtimes[mtime] = count
+            return
+        self._mtimes.pop(mtime, None)
+        if mtime == self._oldest:
+            while self._low and self._low[0] not in self._mtimes:
+                heapq.heappop(self._low)
+            self._oldest = self._low[0] if self._low else None
+        if mtime == self._newest:
+            while self._high and -self._high[0] not in self._mtimes:
+                heapq.heappop(self._high)
+            self._newest = -self._high[0] if self._high else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for display."""
+        return {
+            "files": self.files,
+            "words": self.words,
+            "chars": self.chars,
+            "reading_time": self.reading_time,
+            "oldest": self.oldest,
+            "newest": self.newest,
+            **({} if self.histogram is None else {
+                "histogram": {
+                    period: totals.to_dict()
+                    for period, totals in sorted(self.histogram.items())
+                },
+            }),
+        }
+
+
+class Aggregator:
+    """Collection, category and tag totals built from a stream of files.
+
+    Only the totals are kept, so memory depends on the number of
+    categories and tags rather than the number of files. Pass a key of
+    PERIODS as ``period`` to also build date histograms for every group.
+
+    With ``removable=True`` the totals can also follow a changing
+    collection. Each added, removed or updated file touches only the
+    groups it belongs to (plus a heap step for the dates), so the cost
+    doesn't grow with the size of the collection.
+    """
+
+    def __init__(self, period: Optional[str] = None, removable: bool = False):
+        if period is not None and period not in PERIODS:
+            raise ValueError(f"Unknown histogram period: {period}")
+        self.period = period
+        self.removable = removable
+        self.total = self._totals()
+        self.categories: Dict[str, Totals] = {}
+        self.tags: Dict[str, Totals] = {}
+
+    def _totals(self) -> Totals:
+        """Create the totals for a new group."""
+        return Totals(histogram=self.period is not None, removable=self.removable)
+
+    def _period(self, file: WritingFile) -> Optional[str]:
+        """Get the histogram period a file falls in."""
+        if self.period is None:
+            return None
+        return file.modified.strftime(PERIODS[self.period])
+
+    def add(self, file: WritingFile) -> None:
+        """Count a file towards every group it belongs to."""
+        period = self._period(file)
+        self.total.add(file, period)
+
+        category = file.category
+        if category not in self.categories:
+            self.categories[category] = self._totals()
+        self.categories[category].add(file, period)
+
+        for tag in file.tags:
+            if tag not in self.tags:
+                self.tags[tag] = self._totals()
+            self.tags[tag].add(file, period)
+
+    def remove(self, file: WritingFile) -> None:
+        """Take a file back out of every group, dropping groups left empty."""
+        period = self._period(file)
+        self.total.remove(file, period)
+        self._remove_from(self.categories, file.category, file, period)
+        for tag in file.tags:
+            self._remove_from(self.tags, tag, file, period)
+
+    @staticmethod
+    def _remove_from(groups: Dict[str, Totals], name: str, file: WritingFile,
+                     period: Optional[str]) -> None:
+        totals = groups.get(name)
+        if totals is None:
+            return
+        totals.remove(file, period)
+        if not totals.files:
+            del groups[name]
+
+    def apply(self, changes: IndexChanges) -> None:
+        """Follow the files added and removed by a scan or refresh."""
+        # Removed first, as a modified file shows up in both lists
+        for file in changes.removed:
+            self.remove(file)
+        for file in changes.added:
+            self.add(file)
+
+    def consume(self, files: Iterable[WritingFile]) -> "Aggregator":
+        """Add every file from an iterable, e.g. FileScanner.iter_scan()."""
+        for file in files:
+            self.add(file)
+        return self
+
+
+def aggregate(files: Iterable[WritingFile], period: Optional[str] = None) -> Aggregator:
+    """Summarise a stream of files in a single pass."""
+    return Aggregator(period).consume(files)
@@ -0,0 +1,148 @@
+"""Persistent metadata cache for WriterBox."""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+def default_cache_dir() -> Path:
+    """Get the cache directory, honouring $XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME")
+    if base:
+        return Path(base) / "writerbox"
+    return Path.home() / ".cache" / "writerbox"
+
+
+def cache_path(directory: Path, suffix: str) -> Path:
+    """Get the path of a cache file belonging to a writing collection."""
+    key = hashlib.sha1(str(directory.resolve()).encode("utf-8")).hexdigest()[:16]
+    return default_cache_dir() / f"{key}{suffix}"
+
+
+class MetadataCache:
+    """SQLite-backed cache of parsed file metadata.
+
+    Entries are keyed by path and are only reused while the file's
+    ``st_mtime_ns`` and ``st_size`` match the values recorded when it was
+    parsed. Records are pickled so frontmatter values (dates, numbers)
+    round-trip unchanged.
+    """
+
+    # Bump whenever the shape of cached records changes
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries: Dict[str, Tuple[int, int, bytes]] = {}
+        self._dirty: Dict[str, Tuple[int, int, bytes]] = {}
+        self._seen: set = set()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open()
+
+    @classmethod
+    def for_directory(cls, directory: Path) -> "MetadataCache":
+        """Get the cache file used for a writing collection."""
+        return cls(cache_path(directory, ".sqlite"))
+
+    def _open(self) -> None:
+        """Open the database and load all entries into memory."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'version'"
+            ).fetchone()
+            if row is None or row[0] != str(self.VERSION):
+                # Stale or fresh cache - start over
+                self._conn.execute("DROP TABLE IF EXISTS files")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                    (str(self.VERSION),),
+                )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, data BLOB)"
+            )
+            self._conn.commit()
+            for path, mtime_ns, size, data in self._conn.execute(
+                "SELECT path, mtime_ns, size, data FROM files"
+            ):
+                self._entries[path] = (mtime_ns, size, data)
+        except sqlite3.Error as e:
+            print(f"Error opening cache {self.path}: {e}", file=sys.stderr)
+            # Run without persistence rather than failing the scan
+            self._conn = None
+
+    def get(self, path: Path, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Get the cached record for a file if it is unchanged on disk."""
+        key = str(path)
+        self._seen.add(key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        mtime_ns, size, data = entry
+        if mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+            return None
+        try:
+            record: Dict[str, Any] = pickle.loads(data)
+        except Exception:
+            return None
+        return record
+
+    def put(self, path: Path, stat: os.stat_result, record: Dict[str, Any]) -> None:
+        """Store the parsed record for a file."""
+        key = str(path)
+        self._seen.add(key)
+        entry = (stat.st_mtime_ns, stat.st_size, pickle.dumps(record))
+        self._entries[key] = entry
+        self._dirty[key] = entry
+
+    def prune(self, keep: Optional[Iterable[str]] = None) -> int:
+        """Drop entries for paths that were not seen since the last save.
+
+        Returns the number of entries removed.
+        """
+        keep_set = set(keep) if keep is not None else self._seen
+        stale = [key for key in self._entries if key not in keep_set]
+        for key in stale:
+            del self._entries[key]
+            self._dirty.pop(key, None)
+        if stale and self._conn is not None:
+            self._conn.executemany(
+                "DELETE FROM files WHERE path = ?", [(key,) for key in stale]
+            )
+        return len(stale)
+
+    def save(self) -> None:
+        """Write pending changes to disk."""
+        if self._conn is None:
+            self._dirty.clear()
+            return
+        try:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, data) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, *entry) for key, entry in self._dirty.items()],
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error saving cache {self.path}: {e}", file=sys.stderr)
+        self._dirty.clear()
+        self._seen.clear()
+
+    def close(self) -> None:
+        """Save and close the database."""
+        self.save()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,30 +1,112 @@
 """Command-line interface for WriterBox."""
 
-import click
-from pathlib import Path
 import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, TextIO, Tuple, TypeVar
 
-from .ui import run_ui
+import click
 
+from .aggregate import PERIODS
+from .report import QUERY_FORMATS, REPORT_FORMATS
+from .scanner import SCAN_MODES, FileScanner
 
-@click.command()
-@click.option(
-    "--dir", "-d",
-    type=click.Path(exists=True, file_okay=False, path_type=Path),
-    default=Path.cwd(),
-    help="Directory to scan for markdown files",
-)
+if TYPE_CHECKING:
+    # sqlite3 is only imported once a command needs the cache
+    from .cache import MetadataCache
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def open_scanner(obj: Dict[str, Any], dir: Optional[Path], no_recursive: bool,
+                 no_cache: bool, scan_mode: Optional[str], workers: Optional[int],
+                 exclude: Tuple[str, ...], skip_hidden: bool,
+                 no_gitignore: bool) -> Tuple[Path, FileScanner, Optional["MetadataCache"]]:
+    """Create a lazy scanner for a subcommand, merging its scan options
+    with the ones given before the command name.
+
+    Returns (directory, scanner, cache); close the cache when done. Scans
+    run in parallel processes unless --scan-mode says otherwise.
+    """
+    from .cache import MetadataCache
+
+    directory = dir or obj["dir"]
+    use_cache = not (no_cache or obj["no_cache"])
+    cache = MetadataCache.for_directory(directory) if use_cache else None
+    scanner = FileScanner(
+        directory,
+        recursive=obj["recursive"] and not no_recursive,
+        cache=cache,
+        mode=scan_mode or obj["scan_mode"] or "process",
+        workers=workers or obj["workers"],
+        lazy=True,
+        excludes=obj["exclude"] + exclude,
+        skip_hidden=skip_hidden or obj["skip_hidden"],
+        use_gitignore=not (no_gitignore or obj["no_gitignore"]),
+    )
+    return directory, scanner, cache
+
+
+def scan_options(func: F) -> F:
+    """Options that control how the collection is scanned.
+
+    Shared by the UI and the stats command, which also accepts them
+    before the command name.
+    """
+    options = [
+        click.option(
+            "--dir", "-d",
+            type=click.Path(exists=True, file_okay=False, path_type=Path),
+            help="Directory to scan for markdown files (default: current directory)",
+        ),
+        click.option(
+            "--no-recursive",
+            is_flag=True,
+            help="Disable recursive scanning",
+        ),
+        click.option(
+            "--no-cache",
+            is_flag=True,
+            help="Re-parse every file instead of using the metadata cache",
+        ),
+        click.option(
+            "--scan-mode",
+            type=click.Choice(SCAN_MODES),
+            help="Parse files serially, in threads (network mounts) or in processes (large collections)",
+        ),
+        click.option(
+            "--workers", "-w",
+            type=click.IntRange(min=1),
+            help="Number of scan workers for thread/process modes",
+        ),
+        click.option(
+            "--exclude", "-x",
+            multiple=True,
+            help="Skip paths matching a .gitignore-style pattern (repeatable)",
+        ),
+        click.option(
+            "--skip-hidden",
+            is_flag=True,
+            help="Skip hidden files and directories",
+        ),
+        click.option(
+            "--no-gitignore",
+            is_flag=True,
+            help="Don't apply .gitignore files found in the collection",
+        ),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+
+@click.group(invoke_without_command=True)
+@scan_options
 @click.option(
     "--recursive", "-r",
     is_flag=True,
     default=True,
     help="Scan subdirectories recursively",
 )
-@click.option(
-    "--no-recursive",
-    is_flag=True,
-    help="Disable recursive scanning",
-)
 @click.option(
     "--editor", "-e",
     help="Text editor to use for opening files",
@@ -45,23 +127,66 @@ from .ui import run_ui
     default="date_desc",
     help="Sort method for files",
 )
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Watch the directory and refresh automatically when files change",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    envvar="WRITERBOX_PROFILE",
+    help="Time each phase (t shows the timings, p profiles a refresh) and save them on exit",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default="writerbox-profile.json",
+    show_default=True,
+    help="Where --profile saves its timings; cProfile output goes next to it as .prof",
+)
 @click.version_option(
     version="0.1.0-alpha",
     message="WriterBox v%(version)s - A terminal-based writing collection manager\nCreated by Brennan Brown (https://brennan.day)"
 )
-def main(dir, recursive, no_recursive, editor, config, no_config, sort):
+@click.pass_context
+def main(ctx: click.Context, dir: Optional[Path], no_recursive: bool, no_cache: bool,
+         scan_mode: Optional[str], workers: Optional[int], exclude: Tuple[str, ...],
+         skip_hidden: bool, no_gitignore: bool, recursive: bool, editor: Optional[str],
+         config: Optional[Path], no_config: bool, sort: str, watch: bool, profile: bool,
+         profile_output: Path) -> None:
     """WriterBox - A beautiful terminal-based writing collection manager.
-    
+
     Organize and browse your markdown files with style.
-    
+
     Repository: https://github.com/brennanbrown/writerbox
     """
     # Handle recursive flag logic
     if no_recursive:
         recursive = False
-    
+
+    # Keep the scan settings for subcommands
+    ctx.obj = {
+        "dir": dir or Path.cwd(),
+        "recursive": recursive,
+        "no_cache": no_cache,
+        "scan_mode": scan_mode,
+        "workers": workers,
+        "exclude": exclude,
+        "skip_hidden": skip_hidden,
+        "no_gitignore": no_gitignore,
+    }
+    if ctx.invoked_subcommand is not None:
+        return
+
+    # Textual is only imported once the UI is actually needed
+    from .ui import run_ui
     try:
-        run_ui(dir, recursive, sort)
+        run_ui(ctx.obj["dir"], recursive, sort, use_cache=not no_cache,
+               scan_mode=scan_mode or "serial", workers=workers, watch=watch,
+               excludes=exclude, skip_hidden=skip_hidden,
+               use_gitignore=not no_gitignore, profile=profile,
+               profile_output=profile_output, editor=editor)
     except KeyboardInterrupt:
         click.echo("\nThanks for using WriterBox! 📝")
         sys.exit(0)
@@ -71,5 +196,122 @@ def main(dir, recursive, no_recursive, editor, config, no_config, sort):
         sys.exit(1)
 
 
+@main.command()
+@scan_options
+@click.option(
+    "--format", "-f", "fmt",
+    type=click.Choice(REPORT_FORMATS),
+    default="json",
+    help="Output format",
+)
+@click.option(
+    "--output", "-o",
+    type=click.File("w", encoding="utf-8"),
+    default="-",
+    help="File to write the report to (default: stdout)",
+)
+@click.option(
+    "--histogram",
+    type=click.Choice(list(PERIODS)),
+    help="Also count files per period of their modification date",
+)
+@click.pass_obj
+def stats(obj: Dict[str, Any], dir: Optional[Path], no_recursive: bool, no_cache: bool,
+          scan_mode: Optional[str], workers: Optional[int], exclude: Tuple[str, ...],
+          skip_hidden: bool, no_gitignore: bool, fmt: str, output: TextIO,
+          histogram: Optional[str]) -> None:
+    """Report per-category and per-tag totals without starting the UI.
+
+    Files are streamed through the scanner, in parallel processes unless
+    --scan-mode says otherwise, so large archives can be summarised from
+    cron. Errors go to stderr, keeping the report on stdout clean.
+    """
+    from .aggregate import aggregate
+    from .report import write_csv, write_json
+
+    directory, scanner, cache = open_scanner(obj, dir, no_recursive, no_cache, scan_mode,
+                                             workers, exclude, skip_hidden, no_gitignore)
+    try:
+        result = aggregate(scanner.iter_scan(), histogram)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if fmt == "csv":
+        write_csv(result, output)
+    else:
+        write_json(result, output, directory)
+
+
+
+@main.command()
+@scan_options
+@click.argument("terms", nargs=-1, required=True)
+@click.option(
+    "--format", "-f", "fmt",
+    type=click.Choice(QUERY_FORMATS),
+    default="paths",
+    help="Print one path per line, or a JSON array of file metadata",
+)
+@click.option(
+    "--limit", "-n",
+    type=click.IntRange(min=1),
+    help="Print at most this many files",
+)
+@click.option(
+    "--output", "-o",
+    type=click.File("w", encoding="utf-8"),
+    default="-",
+    help="File to write the results to (default: stdout)",
+)
+@click.pass_obj
+def query(obj: Dict[str, Any], dir: Optional[Path], no_recursive: bool, no_cache: bool,
+          scan_mode: Optional[str], workers: Optional[int], exclude: Tuple[str, ...],
+          skip_hidden: bool, no_gitignore: bool, terms: Tuple[str, ...], fmt: str,
+          limit: Optional[int], output: TextIO) -> None:
+    """Print the files matching a query, newest first.
+
+    Terms can filter on metadata, e.g.
+
+        writerbox query category:poetry tag:nature 'words>500' modified:<30d
+
+    (quote terms with < or > in the shell). Other words are looked up in
+    the full-text search index, which is brought up to date first.
+    """
+    from .query import QueryError, QueryIndex, parse_query
+    from .report import write_files
+    from .search import SearchIndex
+
+    try:
+        parsed = parse_query(" ".join(terms))
+    except QueryError as e:
+        raise click.BadParameter(str(e), param_hint="TERMS")
+
+    directory, scanner, cache = open_scanner(obj, dir, no_recursive, no_cache, scan_mode,
+                                             workers, exclude, skip_hidden, no_gitignore)
+    try:
+        index = QueryIndex().consume(scanner.iter_scan())
+        search = None
+        if parsed.text or parsed.excluded:
+            search = SearchIndex.for_directory(directory) if cache is not None else SearchIndex()
+            search.load()
+            search.sync(index.files.values())
+            search.save()
+        matches = index.evaluate(parsed, search)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    files = sorted((index.files[path] for path in matches),
+                   key=lambda f: f.mtime, reverse=True)
+    write_files(files[:limit] if limit else files, output, fmt)
+
+
 if __name__ == "__main__":
     main()
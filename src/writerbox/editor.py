@@ -0,0 +1,47 @@
+"""Finding and launching the user's text editor."""
+
+import os
+import shlex
+import shutil
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Tried in order when neither --editor nor $EDITOR is set
+FALLBACK_EDITORS = ("micro", "nano", "vim", "vi", "code")
+
+
+def resolve_editor(preferred: Optional[str] = None) -> Tuple[str, ...]:
+    """Get the editor command as an argument list.
+
+    Uses ``preferred`` (e.g. from --editor), then $EDITOR, then the first
+    of FALLBACK_EDITORS found on the PATH. Commands may carry arguments,
+    e.g. ``code --wait``.
+    """
+    return _resolve(preferred or os.environ.get("EDITOR") or None)
+
+
+@lru_cache(maxsize=8)
+def _resolve(editor: Optional[str]) -> Tuple[str, ...]:
+    """Look the editor up; PATH is only searched once per setting."""
+    if editor:
+        try:
+            command = tuple(shlex.split(editor))
+        except ValueError:
+            # Unbalanced quotes; take the setting as a program name
+            command = (editor,)
+        if command:
+            return command
+    for name in FALLBACK_EDITORS:
+        if shutil.which(name):
+            return (name,)
+    return ("nano",)  # Default fallback
+
+
+def open_in_editor(editor: Tuple[str, ...], path: Path) -> int:
+    """Run the editor on a file and wait for it, without going through a shell.
+
+    Returns the editor's exit status. Raises OSError if it can't be started.
+    """
+    return subprocess.run([*editor, str(path)]).returncode
@@ -0,0 +1,154 @@
+"""Fast frontmatter parsing for WriterBox.
+
+Most headers are a handful of ``key: value`` lines with a flow list of
+tags. Those are read by a small parser that accepts only values YAML
+would also read as plain strings, and gives up on anything else. Other
+headers go through PyYAML, with the libyaml C loader when it is built
+in. JSON and TOML frontmatter is left to python-frontmatter.
+
+Results match python-frontmatter's, which the scanner used before.
+"""
+
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Same delimiter rule as python-frontmatter's YAML handler
+YAML_BOUNDARY = re.compile(r"^-{3,}\s*$", re.MULTILINE)
+
+_KEY = re.compile(r"[A-Za-z_][A-Za-z0-9_-]*")
+
+# A plain scalar starting with a letter and free of the characters that
+# would make it a comment, mapping, quote, anchor, tag and the like. Flow
+# list items can't contain commas either.
+_PLAIN = re.compile(r"[A-Za-z][^:#{}\[\]&*!|>'\"%@`\\]*")
+_PLAIN_FLOW = re.compile(r"[A-Za-z][^:#{}\[\]&*!|>'\"%@`\\,]*")
+
+# The forms of dates and integers YAML reads unambiguously
+_DATE = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
+_INT = re.compile(r"0|[1-9][0-9]*")
+
+# Plain words YAML turns into booleans or null
+_RESERVED = {"y", "yes", "n", "no", "true", "false", "on", "off", "null", "~"}
+
+
+def _plain(value: str, flow: bool = False) -> Any:
+    """Read a scalar the way YAML would, if it is a simple one.
+
+    Handles strings, plain dates and plain integers. Returns None if the
+    value needs the real parser. In a flow list the commas separating
+    items are handled by the caller.
+    """
+    if not value:
+        return None
+    first = value[0]
+    if first == '"':
+        inner = value[1:-1]
+        if len(value) > 1 and value[-1] == '"' and '"' not in inner and "\\" not in inner:
+            return inner if inner.isprintable() else None
+        return None
+    if first == "'":
+        inner = value[1:-1]
+        if len(value) > 1 and value[-1] == "'" and "'" not in inner:
+            return inner if inner.isprintable() else None
+        return None
+    if "0" <= first <= "9":
+        if _INT.fullmatch(value):
+            return int(value)
+        match = _DATE.fullmatch(value)
+        if match:
+            try:
+                return date(*map(int, match.groups()))
+            except ValueError:
+                # Let YAML report the impossible date
+                return None
+        return None
+    if not (_PLAIN_FLOW if flow else _PLAIN).fullmatch(value):
+        return None
+    if value.lower() in _RESERVED or not value.isprintable():
+        return None
+    return value
+
+
+def _flow_list(value: str) -> Optional[List[Any]]:
+    """Read ``[a, b, c]`` made of simple scalars, or get None."""
+    inner = value[1:-1].strip()
+    if not inner:
+        return []
+    items = []
+    for item in inner.split(","):
+        item = _plain(item.strip(), flow=True)
+        if item is None:
+            return None
+        items.append(item)
+    return items
+
+
+def parse_simple(text: str) -> Optional[Dict[str, Any]]:
+    """Parse a header of simple ``key: value`` lines without YAML.
+
+    Values can be plain or quoted strings, dates, integers, or flow lists
+    of them. Returns None for anything else, including nesting, block
+    scalars, comments, floats and booleans.
+    """
+    result: Dict[str, Any] = {}
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        if line[0] in " \t" or "\t" in line:
+            return None
+        key, sep, value = line.partition(": ")
+        if not sep:
+            return None
+        if not _KEY.fullmatch(key) or key.lower() in _RESERVED:
+            return None
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            parsed = _flow_list(value)
+        else:
+            parsed = _plain(value)
+        if parsed is None:
+            return None
+        result[key] = parsed
+    return result
+
+
+@lru_cache(maxsize=None)
+def _yaml_loader() -> Any:
+    """Get the fastest safe YAML loader, importing PyYAML on first use."""
+    import yaml  # type: ignore[import-untyped]
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load_yaml(text: str) -> Dict[str, Any]:
+    """Parse a YAML header into a dict, taking the fast path when possible.
+
+    Malformed YAML raises yaml.YAMLError. A header that isn't a mapping
+    gives an empty dict.
+    """
+    result = parse_simple(text)
+    if result is None:
+        import yaml
+        result = yaml.load(text, Loader=_yaml_loader())
+    return result if isinstance(result, dict) else {}
+
+
+def parse_text(text: str) -> Tuple[Dict[str, Any], str]:
+    """Split file text into frontmatter and stripped body.
+
+    Behaves like python-frontmatter's parse(), which is still used for
+    JSON and TOML frontmatter.
+    """
+    text = text.replace("\r\n", "\n").strip()
+    if YAML_BOUNDARY.match(text):
+        try:
+            _, header, body = YAML_BOUNDARY.split(text, 2)
+        except ValueError:
+            # Unclosed block, which isn't treated as frontmatter
+            return {}, text
+        return load_yaml(header), body.strip()
+    if text[:1] in ("{", "}") or text.startswith("+++"):
+        import frontmatter
+        return frontmatter.parse(text)
+    return {}, text
@@ -0,0 +1,149 @@
+"""Incremental, lazily sorted file lists for WriterBox.
+
+The tree only shows the first screenful or so of a category, so sorting
+every file of a big category up front is mostly wasted. SortedFiles
+answers top(k) with a heap selection until the full order is actually
+needed, then keeps that order up to date with bisection as files come
+and go.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Sort name -> (key, descending)
+SORT_KEYS: Dict[str, Tuple[Callable[[Any], Any], bool]] = {
+    "date_desc": (attrgetter("mtime"), True),
+    "date_asc": (attrgetter("mtime"), False),
+    "title": (attrgetter("title_key"), False),
+    "word_count": (attrgetter("word_count"), True),
+}
+
+DEFAULT_SORT = "date_desc"
+
+
+def sort_key(sort: str) -> Tuple[Callable[[Any], Any], bool]:
+    """Get (key, descending) for a sort name, defaulting to newest first."""
+    return SORT_KEYS.get(sort, SORT_KEYS[DEFAULT_SORT])
+
+
+class SortedFiles:
+    """The files of one category, in a sort order that is built on demand.
+
+    Until the full order is asked for (by iterating or slicing past what
+    top() has covered), files are kept as an unordered bag: adding and
+    changing the sort are O(1) and top(k) costs O(n log k). Once
+    materialized, the order is kept with bisect insertion and removal.
+    """
+
+    __slots__ = ("sort", "_key", "_descending", "_files", "_keys", "_ordered")
+
+    def __init__(self, files: Iterable[Any] = (), sort: str = DEFAULT_SORT):
+        self._files: List[Any] = list(files)
+        # Ascending sort keys, parallel to _files, once ordered
+        self._keys: List[Any] = []
+        self._ordered = False
+        self.set_sort(sort)
+
+    def set_sort(self, sort: str) -> None:
+        """Switch sort order; the files are re-ordered when next needed."""
+        self.sort = sort
+        self._key, self._descending = sort_key(sort)
+        self._ordered = False
+        self._keys = []
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __bool__(self) -> bool:
+        return bool(self._files)
+
+    def __contains__(self, file: Any) -> bool:
+        return any(f is file for f in self._files)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.ordered())
+
+    def __repr__(self) -> str:
+        state = "ordered" if self._ordered else "unordered"
+        return f"<SortedFiles {len(self._files)} files by {self.sort}, {state}>"
+
+    def filter(self, predicate: Callable[[Any], bool]) -> "SortedFiles":
+        """Get the files passing a test, in the same sort order.
+
+        The result starts unordered, so only the rows shown get sorted.
+        """
+        return SortedFiles([file for file in self._files if predicate(file)], self.sort)
+
+    def _materialize(self) -> None:
+        """Sort everything once; ascending, so bisect can maintain it."""
+        if self._ordered:
+            return
+        self._files.sort(key=self._key)
+        self._keys = [self._key(file) for file in self._files]
+        self._ordered = True
+
+    def ordered(self) -> List[Any]:
+        """Get every file in display order."""
+        self._materialize()
+        return self._files[::-1] if self._descending else list(self._files)
+
+    def top(self, k: int) -> List[Any]:
+        """Get the first k files in display order.
+
+        Uses a heap selection while the full order hasn't been needed,
+        so the first screenful of a huge category is cheap.
+        """
+        if k <= 0:
+            return []
+        if self._ordered:
+            if self._descending:
+                return self._files[:-k - 1:-1]
+            return self._files[:k]
+        if k >= len(self._files):
+            # Selecting everything is just a sort, so keep the result
+            return self.ordered()
+        if self._descending:
+            # Reversed, so ties come out as they will once materialized
+            return heapq.nlargest(k, reversed(self._files), key=self._key)
+        return heapq.nsmallest(k, self._files, key=self._key)
+
+    def page(self, start: int, count: int) -> List[Any]:
+        """Get files start to start + count in display order.
+
+        The first page comes from top(); later ones materialize the order.
+        """
+        if start == 0:
+            return self.top(count)
+        self._materialize()
+        if self._descending:
+            end = len(self._files) - start
+            return self._files[max(end - count, 0):max(end, 0)][::-1]
+        return self._files[start:start + count]
+
+    def add(self, file: Any) -> None:
+        """Add a file, bisecting it into place if the order is built."""
+        if not self._ordered:
+            self._files.append(file)
+            return
+        key = self._key(file)
+        index = bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._files.insert(index, file)
+
+    def remove(self, file: Any) -> None:
+        """Remove a file, as it was when added. Unknown files are ignored."""
+        if self._ordered:
+            key = self._key(file)
+            start = bisect_left(self._keys, key)
+            end = bisect_right(self._keys, key, start)
+            candidates = range(start, end)
+        else:
+            candidates = range(len(self._files))
+        for index in candidates:
+            if self._files[index] is file:
+                del self._files[index]
+                if self._ordered:
+                    del self._keys[index]
+                return
@@ -0,0 +1,218 @@
+"""Preview rendering for WriterBox."""
+
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from io import StringIO
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from rich.console import Console, ConsoleOptions, RenderableType, RenderResult
+from rich.segment import Segment
+from rich.text import Text
+
+from writerbox.profiling import timings
+
+
+class RenderedPreview:
+    """A preview rendered ahead of time into lines of segments.
+
+    Rendering markdown is the slow part of showing a file, so it happens
+    once (off the UI thread) and the widget just replays the lines.
+    """
+
+    def __init__(self, lines: List[List[Segment]]):
+        self.lines = lines
+
+    def __rich_console__(self, console: Console, options: ConsoleOptions) -> RenderResult:
+        new_line = Segment.line()
+        for line in self.lines:
+            yield from line
+            yield new_line
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+
+@lru_cache(maxsize=None)
+def markdown_available() -> bool:
+    """Check whether markdown can be rendered, importing the renderer.
+
+    rich.markdown and its parser are slow to import, so this waits for
+    the first preview rather than happening at startup.
+    """
+    try:
+        import rich.markdown  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def render_preview(body: str, width: int, use_markdown: bool = True) -> RenderedPreview:
+    """Render a file body to fit the given width."""
+    renderable: RenderableType
+    if use_markdown:
+        from rich.markdown import Markdown
+        renderable = Markdown(body, code_theme="monokai")
+    else:
+        renderable = Text(body)
+    # A private console, so rendering is safe from a worker thread
+    console = Console(width=width, file=StringIO(), force_terminal=True,
+                      color_system="truecolor", legacy_windows=False)
+    with timings.phase("render"):
+        lines = console.render_lines(renderable, console.options.update_width(width), pad=False)
+    return RenderedPreview(lines)
+
+
+# Same rule python-frontmatter uses for the "---" lines around YAML
+_BOUNDARY = re.compile(rb"-{3,}\s*")
+
+
+def body_offset(path: Path, limit: int = 1 << 20) -> int:
+    """Find the byte offset where a file's body starts, after any frontmatter.
+
+    Only the head of the file is read. Returns 0 when there is no closed
+    frontmatter block within ``limit`` bytes.
+    """
+    with open(path, "rb") as f:
+        offset = 0
+        line = f.readline()
+        # Leading blank lines are ignored, as when parsing the frontmatter
+        while line and not line.strip():
+            offset += len(line)
+            line = f.readline()
+        if not _BOUNDARY.fullmatch(line):
+            return 0
+        offset += len(line)
+        while offset < limit:
+            line = f.readline()
+            if not line:
+                break
+            offset += len(line)
+            if _BOUNDARY.fullmatch(line):
+                return offset
+    return 0
+
+
+def read_page(path: Path, offset: int, size: int) -> Tuple[str, Optional[int]]:
+    """Read roughly ``size`` bytes of text starting at ``offset``.
+
+    Pages end on a paragraph break where possible, so markdown blocks
+    aren't split. Returns the text and the offset of the next page, or
+    None once the end of the file is reached.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read(size)
+    if len(data) < size:
+        return data.decode("utf-8", errors="replace"), None
+    end = data.rfind(b"\n\n") + 2
+    if end < size // 2:
+        end = data.rfind(b"\n") + 1
+    if end <= 0:
+        # One enormous line: cut it, but not inside a UTF-8 sequence
+        end = size
+        while end > 0 and data[end - 1] & 0xC0 == 0x80:
+            end -= 1
+        if end > 0 and data[end - 1] & 0xC0 == 0xC0:
+            end -= 1
+    return data[:end].decode("utf-8", errors="replace"), offset + end
+
+
+class PagedPreview(RenderedPreview):
+    """A preview of a large file, rendered a page at a time.
+
+    The body is read in chunks straight from disk and never held as a
+    whole. ``next_page`` does the slow part and is meant for a worker;
+    ``append`` adds its result and belongs on the UI thread.
+    """
+
+    def __init__(self, path: Path, width: int, use_markdown: bool = True,
+                 page_size: int = 16 * 1024):
+        super().__init__([])
+        self.path = path
+        self.width = width
+        self.use_markdown = use_markdown
+        self.page_size = page_size
+        self.offset: Optional[int] = body_offset(path)
+        self.loading = False
+        self._in_fence = False
+
+    @property
+    def complete(self) -> bool:
+        """Check whether the whole file has been rendered."""
+        return self.offset is None
+
+    def next_page(self) -> Optional[RenderedPreview]:
+        """Read and render the next page, or get None at the end of the file."""
+        if self.offset is None:
+            return None
+        text, self.offset = read_page(self.path, self.offset, self.page_size)
+        if self._in_fence:
+            # Carry an open code block over from the previous page
+            text = "```\n" + text
+        fences = sum(1 for line in text.splitlines() if line.lstrip().startswith("```"))
+        self._in_fence = fences % 2 == 1
+        return render_preview(text, self.width, self.use_markdown)
+
+    def append(self, page: Optional[RenderedPreview]) -> None:
+        """Add a rendered page to the end of the preview."""
+        if page is not None:
+            self.lines.extend(page.lines)
+        self.loading = False
+
+    def fill(self, lines: int) -> None:
+        """Render pages until there are at least ``lines`` lines or the file ends."""
+        while not self.complete and len(self.lines) < lines:
+            self.append(self.next_page())
+
+
+class PreviewCache:
+    """Least-recently-used cache of rendered previews.
+
+    Bounded both by the number of previews and by their total line count,
+    so one huge manuscript can't pin a lot of memory. Safe to use from
+    worker threads.
+    """
+
+    def __init__(self, max_entries: int = 64, max_lines: int = 50_000):
+        self.max_entries = max_entries
+        self.max_lines = max_lines
+        self._entries: "OrderedDict[Hashable, RenderedPreview]" = OrderedDict()
+        # Line counts as of each put, since paged previews grow after caching
+        self._sizes: Dict[Hashable, int] = {}
+        self._lines = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[RenderedPreview]:
+        """Get a cached preview, marking it as recently used."""
+        with self._lock:
+            preview = self._entries.get(key)
+            if preview is not None:
+                self._entries.move_to_end(key)
+            return preview
+
+    def put(self, key: Hashable, preview: RenderedPreview) -> None:
+        """Store a preview, evicting the least recently used ones if needed.
+
+        Put a paged preview again after it grows to update its size.
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._lines -= self._sizes.pop(key)
+            self._entries[key] = preview
+            self._sizes[key] = len(preview)
+            self._lines += len(preview)
+            # Always keep the newest entry, even if it is over the line budget
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._lines > self.max_lines
+            ):
+                evicted, _ = self._entries.popitem(last=False)
+                self._lines -= self._sizes.pop(evicted)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,161 @@
+"""Opt-in timing instrumentation for WriterBox.
+
+Code wraps its slow phases in ``timings.phase(name)``. Until profiling is
+enabled (``--profile`` or $WRITERBOX_PROFILE) that returns a shared no-op
+context manager, so the instrumentation costs next to nothing. Phases can
+nest, e.g. "walk" includes the "stat" calls made while walking.
+
+Timings are kept per process: files parsed by --scan-mode process
+workers don't show up under "parse".
+"""
+
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Known phases in the order they happen, for display
+PHASES = ("walk", "stat", "parse", "group", "sort", "tree", "render", "editor")
+
+_NULL = nullcontext()
+
+
+class PhaseStats:
+    """Running totals for one phase."""
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for display."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "last": self.last,
+        }
+
+
+class PhaseTimer:
+    """Thread-safe wall-clock totals per phase."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._stats: Dict[str, PhaseStats] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def phase(self, name: str) -> ContextManager[None]:
+        """Get a context manager that times its block as ``name``."""
+        if not self.enabled:
+            return _NULL
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one timing to a phase."""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = PhaseStats()
+            stats.add(seconds)
+
+    def iterate(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield from an iterable, timing the time spent producing each item.
+
+        The time callers spend on the items in between isn't counted.
+        """
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    return
+                elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            # One entry per full walk rather than one per file
+            self.record(name, elapsed)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Get the totals so far, known phases first."""
+        with self._lock:
+            names = [p for p in PHASES if p in self._stats]
+            names += sorted(n for n in self._stats if n not in PHASES)
+            return {name: self._stats[name].to_dict() for name in names}
+
+    def format(self) -> str:
+        """Format the totals as a text table."""
+        lines = [f"{'phase':<10} {'calls':>8} {'total':>10} {'mean':>10} {'max':>10} {'last':>10}"]
+        for name, stats in self.snapshot().items():
+            lines.append(
+                f"{name:<10} {stats['count']:>8,} "
+                + " ".join(f"{stats[key] * 1000:8.1f}ms" for key in ("total", "mean", "max", "last"))
+            )
+        if len(lines) == 1:
+            lines.append("Nothing timed yet")
+        return "\n".join(lines)
+
+    def dump(self, path: Path) -> None:
+        """Write the totals to a JSON file."""
+        report = {
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "phases": self.snapshot(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+# The timer shared by the whole app
+timings = PhaseTimer()
+
+
+def profile_call(func: Callable[[], T], path: Path) -> T:
+    """Run func under cProfile and save the stats for pstats/snakeviz."""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func)
+    finally:
+        profiler.dump_stats(str(path))
@@ -0,0 +1,407 @@
+"""Metadata queries for WriterBox.
+
+A query is a list of space-separated terms, all of which must match:
+
+    category:poetry tag:nature words>500 modified:<30d
+
+- ``category:NAME`` and ``tag:NAME`` match exactly, ignoring case. Quote
+  values with spaces: ``tag:"short story"``.
+- ``words`` takes ``>``, ``>=``, ``<``, ``<=`` or ``=`` and a number, e.g.
+  ``words>500`` or ``words:<=1000``.
+- ``modified`` takes an age or a date. ``modified:<30d`` means changed in
+  the last 30 days and ``modified:>1y`` more than a year ago; ages are
+  in hours (h), days (d), weeks (w), months (m) or years (y).
+  ``modified>=2024-01-01`` compares with a day, ``modified:2024-03-01``
+  matches that day only.
+- A leading ``-`` negates a term, e.g. ``-tag:draft``.
+
+Anything else is free text, left for the full-text SearchIndex. Free
+text with a leading ``-``, e.g. ``-draft`` or ``-"first person"``,
+excludes the files it matches.
+
+Category and tag terms are answered from hash indexes (tags from a
+TagIndex) and word and date
+ranges by bisecting sorted columns. Only the most selective term's
+matches are collected, so queries don't look at every file.
+"""
+
+import re
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from writerbox.scanner import IndexChanges, WritingFile
+from writerbox.search import SearchIndex
+from writerbox.tags import TagIndex
+
+FIELDS = ("category", "tag", "words", "modified")
+
+# A term or a run of free text, keeping quoted values in one piece
+_TOKEN = re.compile(r'(?:[^\s"]+|"[^"]*")+')
+_TERM = re.compile(r"(-?)([a-z]+)(:?)(>=|<=|>|<|=)?(.*)", re.IGNORECASE | re.DOTALL)
+_AGE = re.compile(r"([0-9]+(?:\.[0-9]+)?)([hdwmy])")
+_DAY = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
+
+# Seconds per age unit; months and years are approximate
+_UNITS = {"h": 3600, "d": 86400, "w": 7 * 86400, "m": 30 * 86400, "y": 365 * 86400}
+
+
+class QueryError(ValueError):
+    """A query that can't be parsed."""
+
+
+class Term:
+    """One metadata condition of a query.
+
+    Category and tag terms carry a lowercase ``value``. Word and date
+    terms carry a half-open range: ``low`` <= x < ``high``, where None
+    means unbounded.
+    """
+
+    __slots__ = ("field", "value", "low", "high", "negate")
+
+    def __init__(self, field: str, value: Optional[str] = None,
+                 low: Any = None, high: Any = None, negate: bool = False):
+        self.field = field
+        self.value = value
+        self.low = low
+        self.high = high
+        self.negate = negate
+
+    def __repr__(self) -> str:
+        sign = "-" if self.negate else ""
+        if self.value is not None:
+            return f"<Term {sign}{self.field}:{self.value}>"
+        return f"<Term {sign}{self.field} [{self.low}, {self.high})>"
+
+
+class Query:
+    """A parsed query: metadata terms plus free text for full-text search.
+
+    ``excluded`` holds the negated free text, one search query each.
+    """
+
+    def __init__(self, terms: List[Term], text: str = "",
+                 excluded: Optional[List[str]] = None):
+        self.terms = terms
+        self.text = text
+        self.excluded = excluded or []
+
+    def __bool__(self) -> bool:
+        return bool(self.terms or self.text or self.excluded)
+
+
+def _unquote(value: str) -> str:
+    return value.replace('"', "")
+
+
+def _number(field: str, op: str, value: str) -> Tuple[Optional[int], Optional[int]]:
+    """Turn a word count comparison into a half-open range."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise QueryError(f"{field} needs a whole number, not {value!r}") from None
+    if op == ">":
+        return number + 1, None
+    if op == ">=":
+        return number, None
+    if op == "<":
+        return None, number
+    if op == "<=":
+        return None, number + 1
+    return number, number + 1
+
+
+def _timestamp(day: date) -> float:
+    return datetime(day.year, day.month, day.day).timestamp()
+
+
+def _modified(op: str, value: str, now: float) -> Tuple[Optional[float], Optional[float]]:
+    """Turn an age or date comparison into a half-open range of mtimes."""
+    age = _AGE.fullmatch(value)
+    if age:
+        cutoff = now - float(age.group(1)) * _UNITS[age.group(2)]
+        # A bare age means "within"
+        if op in ("", "<", "<="):
+            return cutoff, None
+        if op in (">", ">="):
+            return None, cutoff
+        raise QueryError("Compare ages with < or >, e.g. modified:<30d")
+    match = _DAY.fullmatch(value)
+    if not match:
+        raise QueryError(f"modified needs an age like 30d or a date like 2024-01-31, not {value!r}")
+    try:
+        day = date(*map(int, match.groups()))
+    except ValueError as e:
+        raise QueryError(f"Invalid date {value!r}: {e}") from None
+    start, end = _timestamp(day), _timestamp(day + timedelta(days=1))
+    if op == ">":
+        return end, None
+    if op == ">=":
+        return start, None
+    if op == "<":
+        return None, start
+    if op == "<=":
+        return None, end
+    return start, end
+
+
+def parse_query(text: str, now: Optional[float] = None) -> Query:
+    """Parse a query string.
+
+    Ages are measured back from ``now`` (default: the current time).
+    Raises QueryError for malformed terms. Words that don't name a known
+    field, like ``note:`` or ``10:30``, are kept as free text.
+    """
+    now = time.time() if now is None else now
+    terms: List[Term] = []
+    text_parts: List[str] = []
+    excluded: List[str] = []
+    for token in _TOKEN.findall(text):
+        match = _TERM.fullmatch(token)
+        field = match.group(2).lower() if match else ""
+        if not match or field not in FIELDS or not (match.group(3) or match.group(4)):
+            if token.startswith("-") and len(token) > 1:
+                excluded.append(token[1:])
+            else:
+                text_parts.append(token)
+            continue
+        negate, op, value = match.group(1) == "-", match.group(4) or "", _unquote(match.group(5))
+        if not value:
+            raise QueryError(f"Missing value after {token!r}")
+        if field in ("category", "tag"):
+            if op:
+                raise QueryError(f"{field} can only be matched exactly, e.g. {field}:{value}")
+            terms.append(Term(field, value.lower(), negate=negate))
+        elif field == "words":
+            low, high = _number(field, op, value)
+            terms.append(Term(field, low=low, high=high, negate=negate))
+        else:
+            since, until = _modified(op, value, now)
+            terms.append(Term(field, low=since, high=until, negate=negate))
+    return Query(terms, " ".join(text_parts), excluded)
+
+
+class SortedColumn:
+    """Paths kept in order of a value, for range lookups by bisection.
+
+    Values and paths live in parallel lists, so paths never need to be
+    compared. Single changes are bisected into place; big batches are
+    merged with one sort.
+    """
+
+    # Batches bigger than this are merged by sorting rather than inserting
+    BULK = 64
+
+    def __init__(self) -> None:
+        self.values: List[Any] = []
+        self.paths: List[Path] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value: Any, path: Path) -> None:
+        index = bisect_right(self.values, value)
+        self.values.insert(index, value)
+        self.paths.insert(index, path)
+
+    def add_many(self, items: List[Tuple[Any, Path]]) -> None:
+        """Add several (value, path) pairs at once."""
+        if len(items) <= self.BULK:
+            for value, path in items:
+                self.add(value, path)
+            return
+        merged = list(zip(self.values, self.paths)) + items
+        merged.sort(key=lambda item: item[0])
+        self.values = [value for value, _ in merged]
+        self.paths = [path for _, path in merged]
+
+    def remove(self, value: Any, path: Path) -> None:
+        start = bisect_left(self.values, value)
+        end = bisect_right(self.values, value, start)
+        for index in range(start, end):
+            if self.paths[index] == path:
+                del self.values[index]
+                del self.paths[index]
+                return
+
+    def _bounds(self, low: Any, high: Any) -> Tuple[int, int]:
+        start = 0 if low is None else bisect_left(self.values, low)
+        end = len(self.values) if high is None else bisect_left(self.values, high)
+        return start, max(start, end)
+
+    def count(self, low: Any = None, high: Any = None) -> int:
+        """Count the paths with low <= value < high."""
+        start, end = self._bounds(low, high)
+        return end - start
+
+    def range(self, low: Any = None, high: Any = None) -> List[Path]:
+        """Get the paths with low <= value < high, in value order."""
+        start, end = self._bounds(low, high)
+        return self.paths[start:end]
+
+
+class QueryIndex:
+    """Indexes over a collection's metadata for answering queries.
+
+    Kept up to date from IndexChanges like the other indexes, so queries
+    over a changing collection never rescan it. Tags are looked up in a
+    TagIndex, which this index keeps up to date; pass one in to share it.
+    """
+
+    def __init__(self, tags: Optional[TagIndex] = None):
+        self.files: Dict[Path, WritingFile] = {}
+        self.categories: Dict[str, Set[Path]] = {}
+        self.tags = TagIndex() if tags is None else tags
+        # Lowercase tag -> the spellings used, as tags match ignoring case
+        self._tag_names: Dict[str, Set[str]] = {}
+        self.mtimes = SortedColumn()
+        self.words = SortedColumn()
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def _add_keys(self, file: WritingFile) -> None:
+        """Add a file to the hash indexes."""
+        self.categories.setdefault(file.category.lower(), set()).add(file.path)
+        self.tags.add(file)
+        for tag in file.tags:
+            self._tag_names.setdefault(tag.lower(), set()).add(tag)
+
+    def add(self, file: WritingFile) -> None:
+        """Index a file, which must not be indexed already."""
+        self.files[file.path] = file
+        self._add_keys(file)
+        self.mtimes.add(file.mtime, file.path)
+        self.words.add(file.word_count, file.path)
+
+    def remove(self, file: WritingFile) -> None:
+        """Forget a file, as it was when it was indexed."""
+        if self.files.get(file.path) is not file:
+            return
+        del self.files[file.path]
+        self._discard(self.categories, file.category.lower(), file.path)
+        self.tags.remove(file)
+        for tag in file.tags:
+            if tag not in self.tags:
+                self._discard(self._tag_names, tag.lower(), tag)
+        self.mtimes.remove(file.mtime, file.path)
+        self.words.remove(file.word_count, file.path)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[Any]], key: str, item: Any) -> None:
+        items = index.get(key)
+        if items is not None:
+            items.discard(item)
+            if not items:
+                del index[key]
+
+    def _tagged(self, tag: str) -> Set[Path]:
+        """Get the paths of the files carrying a tag in any case."""
+        names = self._tag_names.get(tag)
+        if not names:
+            return set()
+        if len(names) == 1:
+            return self.tags.files_with(next(iter(names)))
+        return set().union(*(self.tags.files_with(name) for name in names))
+
+    def apply(self, changes: IndexChanges) -> None:
+        """Follow the files added and removed by a scan or refresh."""
+        # Removed first, as a modified file shows up in both lists
+        for file in changes.removed:
+            self.remove(file)
+        self.consume(changes.added)
+
+    def consume(self, files: Iterable[WritingFile]) -> "QueryIndex":
+        """Index many files, e.g. a whole scan, sorting the columns once."""
+        files = list(files)
+        for file in files:
+            self.files[file.path] = file
+            self._add_keys(file)
+        self.mtimes.add_many([(file.mtime, file.path) for file in files])
+        self.words.add_many([(file.word_count, file.path) for file in files])
+        return self
+
+    def _column(self, term: Term) -> SortedColumn:
+        return self.words if term.field == "words" else self.mtimes
+
+    def _keyed(self, term: Term) -> Set[Path]:
+        """Get the paths for a category or tag term from the hash indexes."""
+        value = term.value or ""
+        if term.field == "category":
+            return self.categories.get(value, set())
+        return self._tagged(value)
+
+    def estimate(self, term: Term) -> int:
+        """Count the files matching a term without collecting them."""
+        if term.field in ("category", "tag"):
+            return len(self._keyed(term))
+        return self._column(term).count(term.low, term.high)
+
+    def match(self, term: Term) -> Set[Path]:
+        """Get the paths matching a term, ignoring its negation."""
+        if term.field in ("category", "tag"):
+            return self._keyed(term)
+        return set(self._column(term).range(term.low, term.high))
+
+    def test(self, term: Term, path: Path) -> bool:
+        """Check one indexed file against a term, ignoring its negation."""
+        if term.field in ("category", "tag"):
+            return path in self._keyed(term)
+        file = self.files[path]
+        value = file.word_count if term.field == "words" else file.mtime
+        return ((term.low is None or value >= term.low)
+                and (term.high is None or value < term.high))
+
+    def evaluate(self, query: Query, search: Optional[SearchIndex] = None) -> Set[Path]:
+        """Get the paths matching every term of a query.
+
+        Only the most selective term's matches are collected, using the
+        index sizes and bisected range counts to pick it. The other terms
+        are intersected with it, or checked candidate by candidate when
+        that is cheaper than collecting a large range. Free text, and
+        negated free text, is looked up in ``search`` when one is given,
+        and ignored otherwise.
+        """
+        terms = sorted((term for term in query.terms if not term.negate), key=self.estimate)
+        hits = search.search(query.text) if query.text and search is not None else None
+        if hits is not None and (not terms or len(hits) <= self.estimate(terms[0])):
+            result = {path for path in hits if path in self.files}
+        elif terms:
+            result = set(self.match(terms.pop(0)))
+            if hits is not None:
+                result &= hits
+        else:
+            result = set(self.files)
+        for term in terms:
+            if not result:
+                break
+            if self._filter_cheaper(term, result):
+                result = {path for path in result if self.test(term, path)}
+            else:
+                result &= self.match(term)
+        for term in query.terms:
+            if term.negate and result:
+                if self._filter_cheaper(term, result):
+                    result = {path for path in result if not self.test(term, path)}
+                else:
+                    result -= self.match(term)
+        if search is not None:
+            for text in query.excluded:
+                if not result:
+                    break
+                result -= search.search(text)
+        return result
+
+    # Checking a candidate in Python costs about this many times more than
+    # collecting a range match into a set
+    FILTER_COST = 8
+
+    def _filter_cheaper(self, term: Term, candidates: Set[Path]) -> bool:
+        """Decide between checking candidates one by one and set operations."""
+        if term.field in ("category", "tag"):
+            # The set already exists, so set operations always win
+            return False
+        return len(candidates) * self.FILTER_COST < self.estimate(term)
@@ -0,0 +1,86 @@
+"""Machine-readable collection reports for WriterBox."""
+
+import csv
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, TextIO, Tuple
+
+from writerbox.aggregate import Aggregator, Totals
+from writerbox.scanner import WritingFile
+
+REPORT_FORMATS = ("json", "csv")
+
+QUERY_FORMATS = ("paths", "json")
+
+CSV_FIELDS = ["group", "name", "period", "files", "words", "chars",
+              "reading_time", "oldest", "newest"]
+
+
+def _json_default(value: Any) -> Any:
+    """Serialise the values json doesn't know about."""
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def write_json(stats: Aggregator, stream: TextIO, directory: Path) -> None:
+    """Write the totals as a single JSON document."""
+    report = {
+        "directory": str(directory),
+        "generated": datetime.now(),
+        "period": stats.period,
+        "total": stats.total.to_dict(),
+        "categories": {
+            name: totals.to_dict() for name, totals in sorted(stats.categories.items())
+        },
+        "tags": {
+            name: totals.to_dict() for name, totals in sorted(stats.tags.items())
+        },
+    }
+    json.dump(report, stream, indent=2, default=_json_default)
+    stream.write("\n")
+
+
+def _groups(stats: Aggregator) -> Iterator[Tuple[str, str, Totals]]:
+    """Yield (group, name, totals) for the whole collection and each group."""
+    yield "total", "", stats.total
+    for name, totals in sorted(stats.categories.items()):
+        yield "category", name, totals
+    for name, totals in sorted(stats.tags.items()):
+        yield "tag", name, totals
+
+
+def _row(group: str, name: str, period: str, totals: Totals) -> List[Any]:
+    """Get one CSV row."""
+    return [
+        group, name, period, totals.files, totals.words, totals.chars,
+        totals.reading_time,
+        totals.oldest.isoformat(timespec="seconds") if totals.oldest else "",
+        totals.newest.isoformat(timespec="seconds") if totals.newest else "",
+    ]
+
+
+def write_csv(stats: Aggregator, stream: TextIO) -> None:
+    """Write the totals as CSV, one row per group and histogram period.
+
+    Each group's overall row has an empty period and is followed by its
+    histogram rows, if there are any.
+    """
+    writer = csv.writer(stream)
+    writer.writerow(CSV_FIELDS)
+    for group, name, totals in _groups(stats):
+        writer.writerow(_row(group, name, "", totals))
+        if totals.histogram:
+            for period, bucket in sorted(totals.histogram.items()):
+                writer.writerow(_row(group, name, period, bucket))
+
+
+def write_files(files: Iterable[WritingFile], stream: TextIO, fmt: str = "paths") -> None:
+    """Write a list of files, as one path per line or a JSON array of their metadata."""
+    if fmt == "json":
+        json.dump([file.to_dict() for file in files], stream, indent=2, default=_json_default)
+        stream.write("\n")
+        return
+    for file in files:
+        stream.write(f"{file.path}\n")
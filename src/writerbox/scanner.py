@@ -1,33 +1,239 @@
 """File scanning functionality for WriterBox."""
 
-from pathlib import Path
-from typing import List, Dict, Any
-import frontmatter
+import io
+import os
+import re
+import sys
+import time
+from contextlib import nullcontext, redirect_stderr
 from datetime import datetime
+from functools import lru_cache, partial
+from pathlib import Path
+from stat import S_ISREG
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from writerbox.header import load_yaml, parse_text
+from writerbox.profiling import timings
+from writerbox.textstats import TextStats, count_stream, count_text
+from writerbox.walker import DirectoryWalker
+
+if TYPE_CHECKING:
+    # The pools are imported when a scan needs them, and sqlite3 (for the
+    # cache) by whoever opens one
+    from concurrent.futures import Executor
+
+    from writerbox.cache import MetadataCache
+
+
+# A frontmatter delimiter line, as matched by python-frontmatter's YAML handler
+_BOUNDARY = re.compile(r"-{3,}")
+
+
+@lru_cache(maxsize=4096)
+def _clean_tag(tag: str) -> str:
+    """Strip and intern one tag; most tags recur across the collection."""
+    return sys.intern(tag.strip())
+
+
+@lru_cache(maxsize=1024)
+def _split_tags(tags: str) -> Tuple[str, ...]:
+    """Split a tags string, e.g. a YAML block of ``- tag`` lines."""
+    # Single tag as string
+    if '\n' not in tags:
+        return (sys.intern(tags),)
+    # Split by newlines and clean up
+    tag_list = []
+    for line in tags.split('\n'):
+        line = line.strip()
+        # Remove YAML list markers
+        if line.startswith('- '):
+            line = line[2:]
+        if line:
+            tag_list.append(sys.intern(line))
+    return tuple(tag_list)
+
+
+def _normalize_tags(tags: Any) -> List[str]:
+    """Turn the frontmatter tags value into a clean list of interned strings.
+
+    Runs once per file as it is loaded; the pieces are memoized, so tags
+    shared by many files are only cleaned once.
+    """
+    # Handle different tag formats
+    if isinstance(tags, str):
+        return list(_split_tags(tags))
+    elif isinstance(tags, list):
+        # List of tags - clean each one
+        cleaned = []
+        for tag in tags:
+            tag = _clean_tag(tag if isinstance(tag, str) else str(tag))
+            if tag:
+                cleaned.append(tag)
+        return cleaned
+
+    return []
 
 
 class WritingFile:
-    """Represents a single writing file with metadata."""
-    
-    def __init__(self, path: Path):
+    """Represents a single writing file with metadata.
+
+    Files are stored as compact slotted records: timestamps are floats,
+    category and tags are interned strings shared across the collection,
+    and only frontmatter keys beyond title/category/tags are kept as a
+    dict. The frontmatter and metadata dicts are rebuilt on access.
+    """
+
+    __slots__ = (
+        "path", "_title", "_category", "tags", "_extra", "_content",
+        "ctime", "mtime", "mtime_ns", "size",
+        "word_count", "char_count", "line_count", "title_key",
+    )
+
+    def __init__(self, path: Path, lazy: bool = False,
+                 stat: Optional[os.stat_result] = None):
         self.path = path
-        self.filename = path.name
         self.frontmatter = {}
-        self.content = ""
-        self.metadata = {}
-        
-        # Load file content and parse frontmatter
-        self._load()
-        
-    def _load(self):
+        self._content: Optional[str] = ""
+
+        # Load file content and parse frontmatter. Lazy mode only keeps the
+        # frontmatter and counts; exotic files take the full parse instead.
+        # A stat result from the directory walk saves another syscall.
+        if not (lazy and self._load_lazy(stat)):
+            self._load(stat)
+
+    @classmethod
+    def from_cache(cls, path: Path, stat: os.stat_result,
+                   record: Dict[str, Any]) -> "WritingFile":
+        """Build a WritingFile from a cached record without reading the file."""
+        file = cls.__new__(cls)
+        file.path = path
+        file.frontmatter = record["frontmatter"]
+        # Body is read on demand, see the content property
+        file._content = None
+        file._set_stat(stat)
+        file.word_count = record["word_count"]
+        file.char_count = record["char_count"]
+        file.line_count = record["line_count"]
+        return file
+
+    def cache_record(self) -> Dict[str, Any]:
+        """Get the parsed data worth persisting in a MetadataCache."""
+        return {
+            "frontmatter": self.frontmatter,
+            "word_count": self.word_count,
+            "char_count": self.char_count,
+            "line_count": self.line_count,
+            "reading_time": self.reading_time,
+        }
+
+    @property
+    def filename(self) -> str:
+        """Get the file's name."""
+        return self.path.name
+
+    @property
+    def frontmatter(self) -> Dict[str, Any]:
+        """Get the frontmatter as a dict.
+
+        Tags come back normalized to a list of strings.
+        """
+        fm = dict(self._extra) if self._extra else {}
+        if self._title is not None:
+            fm["title"] = self._title
+        if self._category is not None:
+            fm["category"] = self._category
+        if self.tags:
+            fm["tags"] = list(self.tags)
+        return fm
+
+    @frontmatter.setter
+    def frontmatter(self, value: Dict[str, Any]) -> None:
+        extra = dict(value)
+        self._title = extra.pop("title", None)
+        category = extra.pop("category", None)
+        # Headers like "category: 2024" give numbers; categories are always text
+        self._category = None if category is None else sys.intern(str(category))
+        self.tags = _normalize_tags(extra.pop("tags", None))
+        self._extra = extra or None
+        # Precomputed so sorting by title is lookup-free
+        self.title_key = str(self.title).lower()
+
+    @property
+    def signature(self) -> Optional[Tuple[int, int]]:
+        """Get (st_mtime_ns, st_size) from load time, used to spot changes on disk."""
+        if self.mtime_ns is None or self.size is None:
+            return None
+        return (self.mtime_ns, self.size)
+
+    @property
+    def created(self) -> datetime:
+        """Get the creation time."""
+        return datetime.fromtimestamp(self.ctime)
+
+    @property
+    def modified(self) -> datetime:
+        """Get the last modified time."""
+        return datetime.fromtimestamp(self.mtime)
+
+    @property
+    def reading_time(self) -> int:
+        """Get the reading time in minutes (assuming 200 words per minute)."""
+        return max(1, self.word_count // 200)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Get file statistics as a dict."""
+        return {
+            "created": self.created,
+            "modified": self.modified,
+            "word_count": self.word_count,
+            "char_count": self.char_count,
+            "line_count": self.line_count,
+            "reading_time": self.reading_time,
+        }
+
+    @property
+    def content(self) -> str:
+        """Get the file body, reading it from disk if it wasn't loaded."""
+        if self._content is None:
+            self._content = self.read_body()
+        return self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+
+    def read_body(self) -> str:
+        """Get the file body without keeping it around when it wasn't loaded."""
+        if self._content is not None:
+            return self._content
+        try:
+            return parse_text(self.path.read_text(encoding='utf-8'))[1]
+        except Exception:
+            try:
+                return self.path.read_text(encoding='utf-8')
+            except Exception:
+                return ""
+
+    def _load(self, stat: Optional[os.stat_result] = None) -> None:
         """Load file and parse frontmatter."""
         try:
-            post = frontmatter.load(self.path)
-            self.frontmatter = post.metadata
-            self.content = post.content
-            
+            with timings.phase("parse"):
+                self.frontmatter, self.content = parse_text(
+                    self.path.read_text(encoding='utf-8'))
+
         except Exception as e:
-            print(f"Error loading {self.path}: {e}")
+            print(f"Error loading {self.path}: {e}", file=sys.stderr)
             # Treat as plain text file if frontmatter parsing fails
             try:
                 self.content = self.path.read_text(encoding='utf-8')
@@ -35,70 +241,92 @@ class WritingFile:
             except Exception:
                 self.content = ""
                 self.frontmatter = {}
-        
+
         # Always extract file metadata, even if frontmatter failed
+        counts = count_text(self.content)
+        self._set_metadata(counts.words, counts.chars, counts.lines, stat)
+
+    def _load_lazy(self, stat: Optional[os.stat_result] = None) -> bool:
+        """Parse only the frontmatter block and count the body as it streams past.
+
+        The body is not kept; the content property reads it on demand.
+        Returns False if the file needs the full parser instead.
+        """
+        try:
+            with timings.phase("parse"), open(self.path, "r", encoding="utf-8") as f:
+                # Leading blank space is ignored, as the whole text is stripped
+                first = f.readline()
+                while first and not first.strip():
+                    first = f.readline()
+                first = first.lstrip()
+
+                if first.startswith(("{", "+++")):
+                    # JSON or TOML frontmatter
+                    return False
+
+                if _BOUNDARY.fullmatch(first.rstrip()):
+                    header = []
+                    for line in f:
+                        if _BOUNDARY.fullmatch(line.rstrip()):
+                            break
+                        header.append(line)
+                    else:
+                        # Unclosed block, which isn't treated as frontmatter
+                        return False
+                    self.frontmatter = load_yaml("".join(header))
+                    counts = count_stream(f)
+                else:
+                    self.frontmatter = {}
+                    counts = TextStats()
+                    counts.feed(first)
+                    counts.read_from(f).finish()
+        except Exception:
+            # Let the full parser deal with (and report) anything unusual
+            self.frontmatter = {}
+            return False
+
+        self._content = None
+        self._set_metadata(counts.words, counts.chars, counts.lines, stat)
+        return True
+
+    def _set_stat(self, stat: os.stat_result) -> None:
+        """Record the filesystem metadata from a stat result."""
+        self.ctime = stat.st_ctime
+        self.mtime = stat.st_mtime
+        # None when the file couldn't be stat-ed
+        self.mtime_ns: Optional[int] = stat.st_mtime_ns
+        self.size: Optional[int] = stat.st_size
+
+    def _set_metadata(self, word_count: int, char_count: int, line_count: int,
+                      stat: Optional[os.stat_result] = None) -> None:
+        """Combine content counts with filesystem metadata."""
         try:
-            stat = self.path.stat()
-            self.metadata = {
-                "created": datetime.fromtimestamp(stat.st_ctime),
-                "modified": datetime.fromtimestamp(stat.st_mtime),
-                "word_count": len(self.content.split()),
-                "char_count": len(self.content),
-                "line_count": len(self.content.splitlines()),
-            }
-            
-            # Calculate reading time (assuming 200 words per minute)
-            self.metadata["reading_time"] = max(1, self.metadata["word_count"] // 200)
+            if stat is None:
+                with timings.phase("stat"):
+                    stat = self.path.stat()
+            self._set_stat(stat)
+            self.word_count = word_count
+            self.char_count = char_count
+            self.line_count = line_count
         except Exception as e:
-            print(f"Error getting metadata for {self.path}: {e}")
+            print(f"Error getting metadata for {self.path}: {e}", file=sys.stderr)
             # Set default metadata if stat fails
-            self.metadata = {
-                "created": datetime.now(),
-                "modified": datetime.now(),
-                "word_count": 0,
-                "char_count": 0,
-                "line_count": 0,
-                "reading_time": 1,
-            }
-            
+            self.ctime = self.mtime = time.time()
+            self.mtime_ns = self.size = None
+            self.word_count = 0
+            self.char_count = 0
+            self.line_count = 0
+
     @property
     def category(self) -> str:
         """Get the category from frontmatter, with fallback."""
-        return self.frontmatter.get("category", "uncategorized")
-        
+        return "uncategorized" if self._category is None else self._category
+
     @property
     def title(self) -> str:
         """Get the title from frontmatter or filename."""
-        return self.frontmatter.get("title", self.path.stem)
-        
-    @property
-    def tags(self) -> List[str]:
-        """Get tags from frontmatter."""
-        tags = self.frontmatter.get("tags", [])
-        
-        # Handle different tag formats
-        if isinstance(tags, str):
-            # Handle YAML list format with newlines
-            if '\n' in tags:
-                # Split by newlines and clean up
-                tag_list = []
-                for line in tags.split('\n'):
-                    line = line.strip()
-                    # Remove YAML list markers
-                    if line.startswith('- '):
-                        line = line[2:]
-                    if line:
-                        tag_list.append(line)
-                return tag_list
-            else:
-                # Single tag as string
-                return [tags]
-        elif isinstance(tags, list):
-            # List of tags - clean each one
-            return [str(tag).strip() for tag in tags if str(tag).strip()]
-        
-        return []
-        
+        return self.path.stem if self._title is None else self._title
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for display."""
         return {
@@ -107,46 +335,356 @@ class WritingFile:
             "title": self.title,
             "category": self.category,
             "tags": self.tags,
-            "created": self.metadata["created"],
-            "modified": self.metadata["modified"],
-            "word_count": self.metadata["word_count"],
-            "char_count": self.metadata["char_count"],
-            "line_count": self.metadata["line_count"],
-            "reading_time": self.metadata["reading_time"],
+            "created": self.created,
+            "modified": self.modified,
+            "word_count": self.word_count,
+            "char_count": self.char_count,
+            "line_count": self.line_count,
+            "reading_time": self.reading_time,
         }
 
 
+SCAN_MODES = ("serial", "thread", "process")
+
+
+def _parse(path: Path, stat: Optional[os.stat_result], lazy: bool = False) -> WritingFile:
+    """Parse a file, reusing the stat result from the directory walk."""
+    return WritingFile(path, lazy=lazy, stat=stat)
+
+
+def _parse_detached(path: Path, stat: Optional[os.stat_result],
+                    lazy: bool = False) -> Tuple[WritingFile, str]:
+    """Parse a file in a worker process, returning it with any errors printed.
+
+    The body is dropped before the result is sent back to the parent, so
+    only metadata crosses the process boundary; it is re-read on demand.
+    Errors are handed back for the parent to print, as a worker's stderr
+    goes straight to the terminal, under the UI.
+    """
+    errors = io.StringIO()
+    with redirect_stderr(errors):
+        file = _parse(path, stat, lazy)
+    file._content = None
+    return file, errors.getvalue()
+
+
 class FileScanner:
     """Scans directories for writing files."""
-    
-    def __init__(self, directory: Path, recursive: bool = True):
+
+    # Below this many files to parse, pool start-up costs more than it saves
+    PARALLEL_THRESHOLD = 64
+
+    def __init__(self, directory: Path, recursive: bool = True,
+                 cache: Optional["MetadataCache"] = None,
+                 mode: str = "serial", workers: Optional[int] = None,
+                 lazy: bool = False, excludes: Iterable[str] = (),
+                 skip_hidden: bool = False, use_gitignore: bool = True):
+        if mode not in SCAN_MODES:
+            raise ValueError(f"Unknown scan mode {mode!r}, expected one of {SCAN_MODES}")
         self.directory = directory
         self.recursive = recursive
-        
-    def scan(self) -> List[WritingFile]:
-        """Scan directory for markdown files."""
-        files = []
-        
-        # Find all .md files
+        self.cache = cache
+        self.mode = mode
+        self.workers = workers
+        self.lazy = lazy
+        self.walker = DirectoryWalker(directory, recursive, excludes=excludes,
+                                      skip_hidden=skip_hidden,
+                                      use_gitignore=use_gitignore)
+
+    def find_entries(self, directory: Optional[Path] = None) -> Iterator[Tuple[Path, os.stat_result]]:
+        """Find markdown files with their stat results.
+
+        Covers the whole collection, or one directory of it.
+        """
+        return timings.iterate("walk", self.walker.walk(directory))
+
+    def find_paths(self, directory: Optional[Path] = None) -> Iterator[Path]:
+        """Find markdown files in the collection, or in one directory of it."""
+        for path, _ in self.find_entries(directory):
+            yield path
+
+    def covers(self, path: Path) -> bool:
+        """Check whether a path would belong to the scanned collection."""
+        if path.suffix != ".md":
+            return False
         if self.recursive:
-            pattern = "**/*.md"
+            in_tree = self.directory in path.parents
         else:
-            pattern = "*.md"
-            
-        for path in self.directory.glob(pattern):
-            if path.is_file():
-                files.append(WritingFile(path))
-                
+            in_tree = path.parent == self.directory
+        return in_tree and not self.walker.is_excluded(path)
+
+    def scan(self) -> List[WritingFile]:
+        """Scan directory for markdown files."""
+        files: List[WritingFile] = []
+        for batch in self.scan_batches(batch_size=None):
+            files.extend(batch)
         return files
-        
-    def group_by_category(self, files: List[WritingFile]) -> Dict[str, List[WritingFile]]:
-        """Group files by category."""
+
+    def iter_scan(self) -> Iterator[WritingFile]:
+        """Yield files as they are found and parsed.
+
+        Nothing is held on to once a file has been yielded, so combined
+        with lazy=True this can walk collections that don't fit in memory.
+        Parallel modes work in small batches to keep their pools busy.
+        """
+        if self.mode == "serial":
+            batches = self.scan_batches(batch_size=1, max_batch_size=1)
+        else:
+            batches = self.scan_batches(batch_size=self.PARALLEL_THRESHOLD)
+        for batch in batches:
+            yield from batch
+
+    def scan_batches(self, entries: Optional[Iterable[Tuple[Path, os.stat_result]]] = None,
+                     batch_size: Optional[int] = 100,
+                     max_batch_size: int = 2000) -> Iterator[List[WritingFile]]:
+        """Scan in batches so callers can use results before the scan ends.
+
+        Batches start at batch_size files and double up to max_batch_size,
+        so the first results arrive quickly without paying per-batch
+        overhead on big collections. A batch_size of None gives one batch.
+        The cache is pruned and saved after the last batch.
+        """
+        entries = self.find_entries() if entries is None else entries
+        with self._executor() as executor:
+            pending: List[Tuple[Path, os.stat_result]] = []
+            for entry in entries:
+                pending.append(entry)
+                if batch_size is not None and len(pending) >= batch_size:
+                    yield self._load_batch(pending, executor)
+                    pending = []
+                    batch_size = min(batch_size * 2, max_batch_size)
+            if pending or batch_size is None:
+                yield self._load_batch(pending, executor)
+
+        if self.cache is not None:
+            # Forget files that disappeared since the last scan
+            self.cache.prune()
+            self.cache.save()
+
+    def _load_batch(self, entries: List[Tuple[Path, os.stat_result]],
+                    executor: Optional["Executor"]) -> List[WritingFile]:
+        """Load files from the cache or by parsing, keeping their order."""
+        files: List[Optional[WritingFile]] = []
+        pending: List[Tuple[int, Path, Optional[os.stat_result]]] = []
+        for path, stat in entries:
+            file = self._lookup(path, stat)
+            if file is None:
+                pending.append((len(files), path, stat))
+            files.append(file)
+
+        # Parse everything the cache couldn't answer, keeping scan order
+        parsed = self._parse_all([(path, stat) for _, path, stat in pending], executor)
+        for (index, path, parsed_stat), file in zip(pending, parsed):
+            files[index] = file
+            if self.cache is not None and parsed_stat is not None:
+                self.cache.put(path, parsed_stat, file.cache_record())
+
+        # Every slot is filled by now
+        return [file for file in files if file is not None]
+
+    def load_file(self, path: Path, stat: Optional[os.stat_result] = None) -> WritingFile:
+        """Load a single file, going through the cache if there is one."""
+        if stat is None:
+            try:
+                stat = path.stat()
+            except OSError:
+                stat = None
+        file = self._lookup(path, stat)
+        if file is None:
+            file = _parse(path, stat, self.lazy)
+            if self.cache is not None and stat is not None:
+                self.cache.put(path, stat, file.cache_record())
+        return file
+
+    def _lookup(self, path: Path, stat: Optional[os.stat_result]) -> Optional[WritingFile]:
+        """Build a file from the cache if it is unchanged on disk."""
+        if self.cache is None or stat is None:
+            return None
+
+        record = self.cache.get(path, stat)
+        if record is not None:
+            return WritingFile.from_cache(path, stat, record)
+        return None
+
+    def _executor(self) -> ContextManager[Optional["Executor"]]:
+        """Create the worker pool for the configured scan mode.
+
+        Both pool types only start workers once work is submitted, so this
+        is cheap when every file comes from the cache. The pool modules are
+        imported here, as multiprocessing is slow to import.
+        """
+        if self.mode == "thread":
+            from concurrent.futures import ThreadPoolExecutor
+            # Threads suit I/O-bound scans, e.g. collections on network mounts
+            return ThreadPoolExecutor(max_workers=self.workers)
+        if self.mode == "process":
+            # Processes sidestep the GIL for CPU-bound YAML parsing. Spawn
+            # rather than fork, since the UI may already be running threads.
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            return ProcessPoolExecutor(
+                max_workers=self.workers or os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return nullcontext()
+
+    def _parse_all(self, entries: List[Tuple[Path, Optional[os.stat_result]]],
+                   executor: Optional["Executor"] = None) -> List[WritingFile]:
+        """Parse files using the configured scan mode, preserving order."""
+        if executor is None or len(entries) < self.PARALLEL_THRESHOLD:
+            return [_parse(path, stat, self.lazy) for path, stat in entries]
+
+        paths = [path for path, _ in entries]
+        stats = [stat for _, stat in entries]
+        if self.mode == "thread":
+            return list(executor.map(partial(_parse, lazy=self.lazy), paths, stats))
+
+        workers = self.workers or os.cpu_count() or 1
+        chunksize = max(1, len(entries) // (workers * 4))
+        try:
+            results = list(executor.map(partial(_parse_detached, lazy=self.lazy),
+                                        paths, stats, chunksize=chunksize))
+        except (OSError, RuntimeError) as e:
+            print(f"Error starting scan workers, scanning serially: {e}", file=sys.stderr)
+            return [_parse(path, stat, self.lazy) for path, stat in entries]
+        for _, errors in results:
+            if errors:
+                sys.stderr.write(errors)
+        return [file for file, _ in results]
+
+    def group_by_category(self, files: Iterable[WritingFile]) -> Dict[str, List[WritingFile]]:
+        """Group files by category.
+
+        Accepts any iterable, including iter_scan(). To summarise a stream
+        without keeping the files, use writerbox.aggregate instead.
+        """
         categories = {}
-        
-        for file in files:
-            category = file.category
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(file)
-            
+
+        with timings.phase("group"):
+            for file in files:
+                category = file.category
+                if category not in categories:
+                    categories[category] = []
+                categories[category].append(file)
+
         return categories
+
+
+class IndexChanges:
+    """Files added to and removed from a ScanIndex by one update.
+
+    A modified file appears in both lists: its old version in removed and
+    the freshly parsed one in added.
+    """
+
+    def __init__(self) -> None:
+        self.added: List[WritingFile] = []
+        self.removed: List[WritingFile] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+    @property
+    def categories(self) -> set:
+        """Get every category touched by the changes."""
+        return {f.category for f in self.added} | {f.category for f in self.removed}
+
+
+class ScanIndex:
+    """Path-keyed index of a collection that can be refreshed incrementally.
+
+    After the initial load, only files whose size or modification time
+    changed are parsed again.
+    """
+
+    def __init__(self, scanner: FileScanner):
+        self.scanner = scanner
+        self.files: Dict[Path, WritingFile] = {}
+
+    def load(self) -> List[WritingFile]:
+        """Do a full scan and index the results."""
+        files = self.scanner.scan()
+        self.files = {f.path: f for f in files}
+        return files
+
+    def load_batches(self, entries: Optional[Iterable[Tuple[Path, os.stat_result]]] = None,
+                     **kwargs: Any) -> Iterator[IndexChanges]:
+        """Do a full scan in batches, indexing files as they arrive.
+
+        Each batch is reported as an IndexChanges of added files.
+        """
+        self.files = {}
+        for batch in self.scanner.scan_batches(entries, **kwargs):
+            changes = IndexChanges()
+            for file in batch:
+                self.files[file.path] = file
+                changes.added.append(file)
+            yield changes
+
+    def refresh(self) -> IndexChanges:
+        """Re-stat the whole collection and re-parse only what changed."""
+        changes = IndexChanges()
+        seen = set()
+        for path, stat in self.scanner.find_entries():
+            seen.add(path)
+            self._update_path(path, changes, stat)
+
+        for path in [p for p in self.files if p not in seen]:
+            changes.removed.append(self.files.pop(path))
+
+        self._save_cache()
+        return changes
+
+    def update(self, paths: Iterable[Path]) -> IndexChanges:
+        """Re-check specific files or directories, e.g. from a watcher."""
+        changes = IndexChanges()
+        for path in paths:
+            if path.is_dir():
+                # A directory appeared, moved or was renamed - check all of it
+                found = set()
+                for found_path, stat in self.scanner.find_entries(path):
+                    found.add(found_path)
+                    self._update_path(found_path, changes, stat)
+                for indexed in [p for p in self.files if path in p.parents]:
+                    if indexed not in found:
+                        changes.removed.append(self.files.pop(indexed))
+            elif self.scanner.covers(path):
+                self._update_path(path, changes)
+            else:
+                # A deleted directory no longer looks like one
+                for indexed in [p for p in self.files if path in p.parents]:
+                    changes.removed.append(self.files.pop(indexed))
+
+        self._save_cache()
+        return changes
+
+    def _update_path(self, path: Path, changes: IndexChanges,
+                     stat: Optional[os.stat_result] = None) -> None:
+        """Bring a single path's entry up to date."""
+        old = self.files.get(path)
+        if stat is None:
+            try:
+                stat = path.stat()
+            except OSError:
+                stat = None
+
+        if stat is None or not S_ISREG(stat.st_mode):
+            if old is not None:
+                changes.removed.append(self.files.pop(path))
+            return
+
+        if old is not None and old.signature == (stat.st_mtime_ns, stat.st_size):
+            return
+
+        new = self.scanner.load_file(path, stat)
+        self.files[path] = new
+        if old is not None:
+            changes.removed.append(old)
+        changes.added.append(new)
+
+    def _save_cache(self) -> None:
+        """Persist newly parsed files and forget deleted ones."""
+        cache = self.scanner.cache
+        if cache is not None:
+            cache.prune(keep=[str(p) for p in self.files])
+            cache.save()
@@ -0,0 +1,261 @@
+"""Full-text search for WriterBox."""
+
+import os
+import pickle
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from writerbox.cache import cache_path
+from writerbox.scanner import WritingFile
+
+_WORD = re.compile(r"\w+")
+_CLAUSE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Term id 0 separates the title, tags and body so phrases can't span them
+_BOUNDARY = 0
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase words."""
+    return _WORD.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index over the titles, tags and bodies of a collection.
+
+    Each term maps to the set of documents containing it, which answers
+    plain and prefix queries. Documents also keep their token stream as
+    packed term ids, so phrases are checked with a byte search instead of
+    re-reading files. Entries remember the file signature they were built
+    from, so ``sync`` only re-reads files that changed.
+    """
+
+    # Bump whenever the on-disk format changes
+    VERSION = 1
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._terms: Dict[str, int] = {"": _BOUNDARY}
+        self._postings: Dict[int, Set[int]] = {}
+        # doc id -> (path, signature, packed term ids)
+        self._docs: Dict[int, Tuple[Path, Optional[Tuple[int, int]], bytes]] = {}
+        self._doc_ids: Dict[Path, int] = {}
+        self._next_doc = 0
+        self._sorted_terms: Optional[List[str]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_directory(cls, directory: Path) -> "SearchIndex":
+        """Get the search index file used for a writing collection."""
+        return cls(cache_path(directory, ".search"))
+
+    def load(self) -> bool:
+        """Load the index saved at ``path``, if there is a usable one."""
+        if self.path is None:
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Error loading search index {self.path}: {e}", file=sys.stderr)
+            return False
+        if state.get("version") != self.VERSION:
+            return False
+        with self._lock:
+            self._terms = state["terms"]
+            self._postings = state["postings"]
+            self._docs = state["docs"]
+            self._doc_ids = {path: doc for doc, (path, _, _) in self._docs.items()}
+            self._next_doc = state["next_doc"]
+            self._sorted_terms = None
+            self._dirty = False
+        return True
+
+    def save(self) -> None:
+        """Write the index to ``path`` if it changed."""
+        if self.path is None or not self._dirty:
+            return
+        with self._lock:
+            state = {
+                "version": self.VERSION,
+                "terms": self._terms,
+                "postings": self._postings,
+                "docs": self._docs,
+                "next_doc": self._next_doc,
+            }
+            data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so a crash never leaves half an index
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Error saving search index {self.path}: {e}", file=sys.stderr)
+
+    def _term_id(self, term: str) -> int:
+        """Get the id of a term, adding it to the vocabulary if needed."""
+        term_id = self._terms.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._terms[term] = term_id
+            self._sorted_terms = None
+        return term_id
+
+    def _remove_doc(self, doc: int) -> None:
+        """Drop a document from the postings. Caller holds the lock."""
+        path, _, tokens = self._docs.pop(doc)
+        del self._doc_ids[path]
+        for term_id in set(array("I", tokens)):
+            postings = self._postings.get(term_id)
+            if postings is not None:
+                postings.discard(doc)
+                if not postings:
+                    del self._postings[term_id]
+
+    def add(self, file: WritingFile) -> None:
+        """Index a file, replacing any previous entry for its path."""
+        words: List[str] = tokenize(str(file.title))
+        words.append("")
+        for tag in file.tags:
+            words.extend(tokenize(tag))
+        words.append("")
+        words.extend(tokenize(file.read_body()))
+
+        with self._lock:
+            old = self._doc_ids.get(file.path)
+            if old is not None:
+                self._remove_doc(old)
+            doc = self._next_doc
+            self._next_doc += 1
+            tokens = array("I", [self._term_id(word) for word in words])
+            for term_id in set(tokens):
+                if term_id != _BOUNDARY:
+                    self._postings.setdefault(term_id, set()).add(doc)
+            self._docs[doc] = (file.path, file.signature, tokens.tobytes())
+            self._doc_ids[file.path] = doc
+            self._dirty = True
+
+    def remove(self, path: Path) -> None:
+        """Drop a file from the index."""
+        with self._lock:
+            doc = self._doc_ids.get(path)
+            if doc is not None:
+                self._remove_doc(doc)
+                self._dirty = True
+
+    def is_current(self, file: WritingFile) -> bool:
+        """Check whether a file is indexed as it is now."""
+        with self._lock:
+            doc = self._doc_ids.get(file.path)
+            return (doc is not None and file.signature is not None
+                    and self._docs[doc][1] == file.signature)
+
+    def sync(self, files: Iterable[WritingFile],
+             is_cancelled: Optional[Callable[[], bool]] = None) -> int:
+        """Bring the index in line with a collection.
+
+        Only new and changed files are read; files that are no longer in
+        the collection are dropped. ``is_cancelled`` is checked between
+        files, and a cancelled sync leaves stale entries in place.
+        Returns the number of files indexed.
+        """
+        seen: Set[Path] = set()
+        indexed = 0
+        for file in files:
+            if is_cancelled is not None and is_cancelled():
+                return indexed
+            seen.add(file.path)
+            if not self.is_current(file):
+                self.add(file)
+                indexed += 1
+        with self._lock:
+            stale = [path for path in self._doc_ids if path not in seen]
+        for path in stale:
+            self.remove(path)
+        return indexed
+
+    def _prefix_docs(self, prefix: str) -> Set[int]:
+        """Get the documents containing any term that starts with prefix."""
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._terms)
+        terms = self._sorted_terms
+        start = end = bisect_left(terms, prefix)
+        while end < len(terms) and terms[end].startswith(prefix):
+            end += 1
+        docs: Set[int] = set()
+        empty: Set[int] = set()
+        # Union the postings a chunk at a time, stopping early once a short
+        # prefix has already matched every document
+        for chunk in range(start, end, 256):
+            docs.update(*(self._postings.get(self._terms[term], empty)
+                          for term in terms[chunk:min(chunk + 256, end)]))
+            if len(docs) == len(self._docs):
+                break
+        return docs
+
+    def _phrase_docs(self, words: List[str]) -> Set[int]:
+        """Get the documents containing the words next to each other."""
+        term_ids: List[int] = []
+        for word in words:
+            term_id = self._terms.get(word)
+            if term_id is None:
+                return set()
+            term_ids.append(term_id)
+        postings = sorted((self._postings.get(t, set()) for t in term_ids), key=len)
+        candidates = set.intersection(*postings)
+        if len(words) == 1:
+            return candidates
+        packed = array("I", term_ids)
+        needle, width = packed.tobytes(), packed.itemsize
+        docs = set()
+        for doc in candidates:
+            tokens = self._docs[doc][2]
+            start = tokens.find(needle)
+            # Matches must line up with whole term ids
+            while start != -1 and start % width:
+                start = tokens.find(needle, start + 1)
+            if start != -1:
+                docs.add(doc)
+        return docs
+
+    def search(self, query: str) -> Set[Path]:
+        """Find the files matching every clause of a query.
+
+        Clauses are words (``spring``), prefixes (``spr*``) and quoted
+        phrases (``"spring rain"``). Matching is case-insensitive.
+        """
+        clauses = []
+        for phrase, word in _CLAUSE.findall(query):
+            if word.endswith("*") and len(tokenize(word)) == 1:
+                clauses.append(("prefix", tokenize(word)))
+            else:
+                words = tokenize(phrase or word)
+                if words:
+                    clauses.append(("phrase", words))
+        if not clauses:
+            return set()
+
+        with self._lock:
+            result: Optional[Set[int]] = None
+            for kind, words in clauses:
+                docs = self._prefix_docs(words[0]) if kind == "prefix" else self._phrase_docs(words)
+                result = docs if result is None else result & docs
+                if not result:
+                    return set()
+            return {self._docs[doc][0] for doc in result or ()}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, path: Path) -> bool:
+        return path in self._doc_ids
@@ -0,0 +1,67 @@
+"""Collection-wide tag index for WriterBox."""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from writerbox.scanner import IndexChanges, WritingFile
+
+
+class TagIndex:
+    """Map each tag to the paths of the files that carry it.
+
+    Kept up to date from IndexChanges as files are scanned, edited and
+    deleted, so filtering by tag and listing tags never rescans.
+    """
+
+    def __init__(self) -> None:
+        self.paths: Dict[str, Set[Path]] = {}
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self.paths
+
+    def add(self, file: WritingFile) -> None:
+        """Index a file under each of its tags."""
+        for tag in file.tags:
+            if tag not in self.paths:
+                self.paths[tag] = set()
+            self.paths[tag].add(file.path)
+
+    def remove(self, file: WritingFile) -> None:
+        """Forget a file, dropping tags no other file carries."""
+        for tag in file.tags:
+            paths = self.paths.get(tag)
+            if paths is None:
+                continue
+            paths.discard(file.path)
+            if not paths:
+                del self.paths[tag]
+
+    def apply(self, changes: IndexChanges) -> None:
+        """Apply the files added and removed by a scan or refresh."""
+        # Removed first, as a modified file shows up in both lists
+        for file in changes.removed:
+            self.remove(file)
+        for file in changes.added:
+            self.add(file)
+
+    def consume(self, files: Iterable[WritingFile]) -> "TagIndex":
+        """Index every file from an iterable."""
+        for file in files:
+            self.add(file)
+        return self
+
+    def files_with(self, tag: str) -> Set[Path]:
+        """Get the paths of the files carrying a tag."""
+        return self.paths.get(tag, set())
+
+    def count(self, tag: str) -> int:
+        """Get the number of files carrying a tag."""
+        return len(self.paths.get(tag, ()))
+
+    def counts(self) -> List[Tuple[str, int]]:
+        """List (tag, file count) pairs, most used first, then by name."""
+        return sorted(((tag, len(paths)) for tag, paths in self.paths.items()),
+                      key=lambda item: (-item[1], item[0].lower()))
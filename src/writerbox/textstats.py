@@ -0,0 +1,184 @@
+"""Single-pass text statistics for WriterBox.
+
+Counts are taken over text fed in chunks, so a file never has to be held
+(or split into a list of words or lines) as a whole. They match counting
+on the whole text after .strip(), which is how bodies are stored:
+
+- words: len(text.split())
+- chars: len(text)
+- lines: len(text.splitlines())
+- sentences: runs of . ! or ? followed by whitespace or the end, plus an
+  unfinished last sentence (optional)
+- paragraphs: blocks of text separated by blank lines (optional)
+"""
+
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, TextIO
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+CHUNK_SIZE = 64 * 1024
+
+# Line boundaries str.splitlines knows besides \n and \r, in ASCII and beyond
+_ASCII_BREAKS = ("\v", "\f", "\x1c", "\x1d", "\x1e")
+_UNICODE_BREAKS = _ASCII_BREAKS + ("\x85", "\u2028", "\u2029")
+_SENTENCE = re.compile(r"[.!?]+(?=\s|\Z)")
+_PARAGRAPH_GAP = re.compile(r"\n[^\S\n]*\n\s*")
+_WHITESPACE = re.compile(r"\s")
+
+
+def count_breaks(text: str) -> int:
+    """Count line boundaries in text, using the same rules as str.splitlines."""
+    breaks = text.count("\n")
+    if "\r" in text:
+        breaks += text.count("\r") - text.count("\r\n")
+    # Counting single characters is much faster than a regex search
+    for separator in _ASCII_BREAKS if text.isascii() else _UNICODE_BREAKS:
+        breaks += text.count(separator)
+    return breaks
+
+
+class TextStats:
+    """Running counts over text fed in chunks of any size.
+
+    Chunks are cut after the last complete word and whitespace run, and
+    the rest is held over to the next chunk, so words, blank lines and
+    sentence ends are never split. Call finish() after the last chunk.
+    """
+
+    __slots__ = ("words", "chars", "lines", "sentences", "paragraphs",
+                 "_breaks", "_held", "_held_word", "_started", "_last")
+
+    def __init__(self, sentences: bool = False, paragraphs: bool = False):
+        self.words = 0
+        self.chars = 0
+        self.lines = 0
+        # None unless asked for, as they cost an extra pass over each chunk
+        self.sentences: Optional[int] = 0 if sentences else None
+        self.paragraphs: Optional[int] = 0 if paragraphs else None
+        self._breaks = 0
+        # Text carried over, a whitespace run then a word, kept in pieces
+        # so a long word is joined once instead of on every chunk
+        self._held: List[str] = []
+        self._held_word = False
+        self._started = False
+        self._last = ""
+
+    def feed(self, chunk: str) -> None:
+        """Count a chunk of text."""
+        if not self._started and not self._held:
+            # Leading whitespace never counts, as the text is stripped
+            chunk = chunk.lstrip()
+        if not chunk:
+            return
+        # Only the new chunk is searched, so the carried text is never rescanned
+        space = _WHITESPACE.search(chunk[::-1])
+        if space is None:
+            # The held word goes on
+            self._held.append(chunk)
+            self._held_word = True
+            return
+        # Hold back the last word, which may go on in the next chunk, and
+        # the whitespace before it, which may hold a blank line
+        end = len(chunk[:len(chunk) - space.start()].rstrip())
+        if end:
+            self._count("".join(self._held) + chunk[:end])
+        elif self._held_word:
+            self._count("".join(self._held))
+        else:
+            # The whitespace run goes on
+            self._held.append(chunk)
+            self._held_word = space.start() > 0
+            return
+        self._held = [chunk[end:]]
+        self._held_word = space.start() > 0
+
+    def _count(self, piece: str) -> None:
+        """Count a piece that ends in text and starts after whitespace."""
+        if not self._started:
+            piece = piece.lstrip()
+            self._started = True
+            if self.paragraphs is not None:
+                self.paragraphs += 1
+        self.words += len(piece.split())
+        self.chars += len(piece)
+        self._breaks += count_breaks(piece)
+        self._last = piece[-1]
+        if self.sentences is not None:
+            self.sentences += sum(1 for _ in _SENTENCE.finditer(piece))
+        if self.paragraphs is not None:
+            self.paragraphs += sum(1 for _ in _PARAGRAPH_GAP.finditer(piece))
+
+    def read_from(self, stream: TextIO, chunk_size: int = CHUNK_SIZE) -> "TextStats":
+        """Count everything left in a text stream."""
+        read = stream.read
+        chunk = read(chunk_size)
+        while chunk:
+            self.feed(chunk)
+            chunk = read(chunk_size)
+        return self
+
+    def finish(self) -> "TextStats":
+        """Count the text held back from the last chunk."""
+        rest = "".join(self._held).rstrip()
+        self._held = []
+        self._held_word = False
+        if rest:
+            self._count(rest)
+        self.lines = self._breaks + 1 if self.chars else 0
+        if self.sentences is not None and self.chars and self._last not in ".!?":
+            self.sentences += 1
+        return self
+
+
+def count_text(text: str, sentences: bool = False, paragraphs: bool = False,
+               chunk_size: int = CHUNK_SIZE) -> TextStats:
+    """Count a string, a chunk at a time."""
+    stats = TextStats(sentences, paragraphs)
+    if len(text) <= chunk_size:
+        # Nothing to carry between chunks, so skip the bookkeeping
+        text = text.strip()
+        if text:
+            stats._count(text)
+        return stats.finish()
+    for start in range(0, len(text), chunk_size):
+        stats.feed(text[start:start + chunk_size])
+    return stats.finish()
+
+
+def count_stream(stream: TextIO, sentences: bool = False, paragraphs: bool = False,
+                 chunk_size: int = CHUNK_SIZE) -> TextStats:
+    """Count the rest of a text stream, e.g. a file after its frontmatter."""
+    return TextStats(sentences, paragraphs).read_from(stream, chunk_size).finish()
+
+
+def count_file(path: Path, sentences: bool = False, paragraphs: bool = False,
+               chunk_size: int = CHUNK_SIZE) -> TextStats:
+    """Count a whole file, frontmatter included.
+
+    The file is read through a buffered binary reader and decoded in C,
+    a chunk at a time.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return count_stream(f, sentences, paragraphs, chunk_size)
+
+
+def count_files(paths: Iterable[Path], sentences: bool = False, paragraphs: bool = False,
+                executor: Optional["Executor"] = None,
+                chunk_size: int = CHUNK_SIZE) -> Iterator[Optional[TextStats]]:
+    """Count many files, yielding results in order.
+
+    Files that can't be read give None. Pass a thread pool as ``executor``
+    to overlap reads, e.g. on network mounts.
+    """
+    def count(path: Path) -> Optional[TextStats]:
+        try:
+            return count_file(path, sentences, paragraphs, chunk_size)
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    if executor is None:
+        return map(count, paths)
+    return executor.map(count, paths)
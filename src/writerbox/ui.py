@@ -1,43 +1,52 @@
 """Textual UI for WriterBox."""
 
-from textual.app import App, ComposeResult
-from textual.binding import Binding
-from textual.containers import Container, Horizontal, Vertical, ScrollableContainer
-from textual.reactive import reactive
-from textual.screen import ModalScreen
-from textual.widget import Widget
-from textual.widgets import Footer, Header, Static, Tree
-from textual import events
-from rich.text import Text
 import os
-import subprocess
+import shlex
 import sys
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 
-from writerbox.scanner import FileScanner, WritingFile
+from rich.text import Text
+from textual import events, work
+from textual.app import App, ComposeResult
+from textual.binding import Binding
+from textual.containers import Container, Horizontal, ScrollableContainer, Vertical
+from textual.screen import ModalScreen
+from textual.timer import Timer
+from textual.widgets import Header, Input, OptionList, Static, Tree
+from textual.widgets.tree import TreeNode
+from textual.worker import get_current_worker
 
-# Optional imports for markdown highlighting
-try:
-    import markdown
-    from rich.console import Console
-    from rich.markdown import Markdown as RichMarkdown
-    from rich.syntax import Syntax
-    from io import StringIO
-    MARKDOWN_AVAILABLE = True
-except ImportError:
-    MARKDOWN_AVAILABLE = False
+from writerbox.aggregate import Aggregator
+from writerbox.cache import MetadataCache
+from writerbox.editor import open_in_editor, resolve_editor
+from writerbox.ordering import SortedFiles
+from writerbox.preview import (
+    PagedPreview,
+    PreviewCache,
+    RenderedPreview,
+    markdown_available,
+    render_preview,
+)
+from writerbox.profiling import profile_call, timings
+from writerbox.query import QueryError, QueryIndex, parse_query
+from writerbox.scanner import FileScanner, IndexChanges, ScanIndex, WritingFile
+from writerbox.search import SearchIndex
+from writerbox.tags import TagIndex
+from writerbox.walker import DirectoryWalker
+from writerbox.watcher import InotifyWatcher, PollingWatcher, create_watcher
 
 
 class StartupScreen(ModalScreen):
     """Startup screen with welcome message and instructions."""
-    
+
     BINDINGS = [
         Binding("escape", "dismiss", "Continue"),
         Binding("enter", "dismiss", "Continue"),
         Binding("space", "dismiss", "Continue"),
     ]
-    
+
     def compose(self) -> ComposeResult:
         with Container(id="startup-container"):
             yield Static(
@@ -70,6 +79,8 @@ class StartupScreen(ModalScreen):
                 "│  1-4         • Sort by (date/newest, date/oldest, title,    │\n"
                 "│               word count)                                   │\n"
                 "│  r           • Refresh file list                            │\n"
+                "│  /           • Search titles, tags and text                 │\n"
+                "│  g           • Browse tags and filter by one                │\n"
                 "│  ?           • Show help screen                             │\n"
                 "│  q or Ctrl+Q • Quit the application                        │\n"
                 "│                                                             │\n"
@@ -88,7 +99,7 @@ class StartupScreen(ModalScreen):
                 "Press Enter, Space, or Escape to continue...",
                 id="startup-content"
             )
-    
+
     CSS = """
     #startup-container {
         background: #24283b;
@@ -97,7 +108,7 @@ class StartupScreen(ModalScreen):
         height: 35;
         padding: 1;
     }
-    
+
     #startup-content {
         text-align: center;
         color: #c0caf5;
@@ -107,9 +118,9 @@ class StartupScreen(ModalScreen):
 
 class HelpScreen(ModalScreen):
     """Help screen with keyboard shortcuts."""
-    
+
     BINDINGS = [("escape", "dismiss", "Close")]
-    
+
     def compose(self) -> ComposeResult:
         with Container(id="help-container"):
             yield Static(
@@ -128,7 +139,13 @@ class HelpScreen(ModalScreen):
                 "│  r          - Refresh file list                             │\n"
                 "│  q          - Quit WriterBox                                │\n"
                 "│  ?          - Show this help                                │\n"
-                "│  /          - Search files (not implemented yet)            │\n"
+                "│  /          - Search files (\"phrase\", prefix*)             │\n"
+                "│               or filter: category:x tag:x words>500        │\n"
+                "│               modified:<30d (a leading - excludes)         │\n"
+                "│  g          - Browse tags, Enter filters by the tag        │\n"
+                "│  Esc        - Clear search or tag filter                   │\n"
+                "│  t          - Show phase timings (with --profile)           │\n"
+                "│  p          - Profile one refresh with cProfile             │\n"
                 "╰───────────────────────────────────────────────────────────────╯\n"
                 "\n"
                 "╭─ Sorting ──────────────────────────────────────────────────────╮\n"
@@ -141,7 +158,7 @@ class HelpScreen(ModalScreen):
                 "\n"
                 "╭─ Tips ─────────────────────────────────────────────────────────╮\n"
                 "│  • Files need YAML frontmatter with 'category' field         │\n"
-                "│  • Editor is auto-detected from $EDITOR or common editors   │\n"
+                "│  • Editor comes from --editor, $EDITOR or common editors     │\n"
                 "│  • Files are indented (no arrows), categories expand       │\n"
                 "│  • Categories have emoji icons and can be expanded        │\n"
                 "╰───────────────────────────────────────────────────────────────╯\n"
@@ -149,7 +166,7 @@ class HelpScreen(ModalScreen):
                 "Press [Escape] to close",
                 id="help-content"
             )
-    
+
     CSS = """
     #help-container {
         background: #24283b;
@@ -158,16 +175,120 @@ class HelpScreen(ModalScreen):
         height: 25;
         padding: 1;
     }
-    
+
     #help-content {
         text-align: left;
     }
     """
 
 
+class TimingScreen(ModalScreen):
+    """Live per-phase timings, shown with --profile."""
+
+    BINDINGS = [
+        Binding("escape", "dismiss", "Close"),
+        Binding("t", "dismiss", "Close"),
+    ]
+
+    # Seconds between updates of the table
+    REFRESH_INTERVAL = 0.5
+
+    def compose(self) -> ComposeResult:
+        with Container(id="timing-container"):
+            yield Static("⏱  Phase timings (t or Escape to close)", id="timing-title")
+            yield Static(timings.format(), id="timing-content")
+
+    def on_mount(self) -> None:
+        self.set_interval(self.REFRESH_INTERVAL, self.update_timings)
+
+    def update_timings(self) -> None:
+        """Show the latest totals."""
+        self.query_one("#timing-content", Static).update(timings.format())
+
+    CSS = """
+    #timing-container {
+        background: #24283b;
+        border: solid #5fcfd0;
+        width: 70;
+        height: 16;
+        padding: 1;
+    }
+
+    #timing-title {
+        color: #5fcfd0;
+        text-style: bold;
+    }
+    """
+
+
+class TagScreen(ModalScreen):
+    """Every tag in the collection with its file count; picking one filters the tree."""
+
+    BINDINGS = [
+        Binding("escape", "close", "Close"),
+        Binding("g", "close", "Close"),
+    ]
+
+    # The app's own AUTO_FOCUS names the tree, which isn't on this screen
+    AUTO_FOCUS = "#tag-list"
+
+    def __init__(self, counts: List[Tuple[str, int]], current: Optional[str] = None):
+        super().__init__()
+        self.tags = [tag for tag, _ in counts]
+        self.counts = counts
+        self.current = current
+
+    def compose(self) -> ComposeResult:
+        with Container(id="tag-container"):
+            yield Static(f"🏷  Tags ({len(self.counts)}) - Enter to filter, Escape to close",
+                         id="tag-title")
+            # Tags are shown as typed, so no markup
+            yield OptionList("All files",
+                             *(f"#{tag} ({count})" for tag, count in self.counts),
+                             id="tag-list", markup=False)
+
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        """Dismiss with the chosen tag, or None for all files."""
+        index = event.option_index
+        self.dismiss(self.tags[index - 1] if index else None)
+
+    def action_close(self) -> None:
+        """Close without changing the tag filter."""
+        self.dismiss(self.current)
+
+    CSS = """
+    #tag-container {
+        background: #24283b;
+        border: solid #5fcfd0;
+        width: 60;
+        height: 24;
+        padding: 1;
+    }
+
+    #tag-title {
+        color: #5fcfd0;
+        text-style: bold;
+    }
+
+    #tag-list {
+        height: 1fr;
+    }
+    """
+
+
+class MoreFiles:
+    """Data for the placeholder node that follows a page of file nodes."""
+
+    __slots__ = ("start",)
+
+    def __init__(self, start: int):
+        # Position of the first file not shown yet
+        self.start = start
+
+
 class WriterBoxTree(Tree):
     """Custom Tree widget with enhanced Enter key behavior."""
-    
+
     def action_select_cursor(self) -> None:
         """Handle Enter key - toggle category or open file."""
         if self.cursor_node:
@@ -175,13 +296,15 @@ class WriterBoxTree(Tree):
             if hasattr(self.cursor_node, 'data') and isinstance(self.cursor_node.data, WritingFile):
                 # This is a file, trigger the open file action
                 self.app.action_open_file()
+            elif isinstance(self.cursor_node.data, MoreFiles) and isinstance(self.app, WriterBoxUI):
+                self.app.load_more_files(self.cursor_node)
             else:
                 # This is a category, toggle expansion
                 if self.cursor_node.is_expanded:
                     self.cursor_node.collapse()
                 else:
                     self.cursor_node.expand()
-    
+
     def action_toggle_node(self) -> None:
         """Handle Space key - toggle expansion for any node."""
         if self.cursor_node:
@@ -193,26 +316,48 @@ class WriterBoxTree(Tree):
 
 class WriterBoxUI(App):
     """Main WriterBox application."""
-    
+
+    # Seconds between checks for outside changes in watch mode
+    WATCH_INTERVAL = 1.0
+
+    # Seconds the cursor has to rest on a file before its preview is rendered
+    PREVIEW_DELAY = 0.08
+
+    # Files bigger than this are previewed a page at a time, starting with
+    # PREVIEW_SCREENS screens' worth
+    PAGED_PREVIEW_BYTES = 256 * 1024
+    PREVIEW_SCREENS = 3
+
+    # File nodes are built a page at a time per category; the rest follow
+    # when the cursor reaches the "more" node at the end
+    TREE_PAGE = 100
+
+    # Start on the tree, not the (hidden) search box
+    AUTO_FOCUS = "#file-tree"
+
     BINDINGS = [
         Binding("enter", "open_file", "Open"),
         Binding("q", "quit", "Quit"),
         Binding("r", "refresh", "Refresh"),
         Binding("?", "help", "Help"),
+        Binding("/", "search", "Search"),
+        Binding("g", "tags", "Tags"),
         Binding("escape", "escape", "Escape"),
+        Binding("t", "timings", "Timings"),
+        Binding("p", "profile_refresh", "Profile"),
         Binding("1", "sort_date_desc", "Newest"),
         Binding("2", "sort_date_asc", "Oldest"),
         Binding("3", "sort_title", "Title"),
         Binding("4", "sort_word_count", "Words"),
         Binding("ctrl+q", "quit", "Quit", priority=True),
     ]
-    
+
     CSS = """
     /* Main app styles */
     Screen {
         background: #1a1b26;
     }
-    
+
     /* Header styles */
     Header {
         background: #24283b;
@@ -220,7 +365,7 @@ class WriterBoxUI(App):
         text-align: center;
         content-align: center middle;
     }
-    
+
     /* Tree styles */
     Tree {
         background: #24283b;
@@ -229,15 +374,22 @@ class WriterBoxUI(App):
         width: 1fr;
         height: 1fr;
     }
-    
+
     Tree .tree-node--label {
         color: #c0caf5;
     }
-    
+
     Tree .file-node .tree-node--label {
         color: #9ca0af;
     }
-    
+
+    #search-box {
+        display: none;
+        background: #24283b;
+        border: solid #414868;
+        color: #c0caf5;
+    }
+
     #file-content {
         background: #24283b;
         border: solid #414868;
@@ -247,12 +399,14 @@ class WriterBoxUI(App):
         text-style: none;
         scrollbar-background: #414868;
         scrollbar-color: #565f89;
+        /* Keep the width steady so rendered previews fit */
+        scrollbar-gutter: stable;
     }
-    
+
     #file-content-inner {
         padding: 1;
     }
-    
+
     #content-header {
         background: #414868;
         color: #c0caf5;
@@ -260,7 +414,7 @@ class WriterBoxUI(App):
         height: 1;
         text-align: center;
     }
-    
+
     /* Footer styles */
     #footer-box {
         background: #24283b;
@@ -270,136 +424,188 @@ class WriterBoxUI(App):
         text-align: center;
         text-style: italic;
     }
-    
+
     /* Container styles */
     #main-container {
         height: 100%;
     }
-    
+
     #content-area {
         height: 1fr;
     }
-    
+
     /* Help content */
     #help-content {
         text-align: left;
     }
-    
+
     .category-poetry {
         color: #5fcfd0;
     }
-    
+
     .category-essays {
         color: #c678dd;
     }
-    
+
     .category-journal {
         color: #98c379;
     }
-    
+
     .category-drafts {
         color: #abb2bf;
     }
-    
+
     .category-fiction {
         color: #e06c75;
     }
-    
+
     .category-uncategorized {
         color: #9aa5ce;
     }
-    
+
     .file-entry {
         color: #c0caf5;
     }
-    
+
     .file-entry:hover {
         background: #414868;
     }
-    
+
     .metadata {
         color: #565f89;
         text-style: italic;
     }
-    
+
     .tags {
         color: #e0af68;
     }
-    
+
     .tree-node--selected {
         background: #414868;
         border-left: solid #5fcfd0;
     }
-    
+
     .tree-node--cursor .tree-node__label {
         text-style: bold;
     }
-    
+
     Tree {
         background: #1a1b26;
     }
-    
+
     TextArea {
         background: #24283b;
         border: solid #414868;
         color: #c0caf5;
     }
     """
-    
-    def __init__(self, directory: Path, recursive: bool = True, sort: str = "date_desc", show_startup: bool = False):
+
+    def __init__(self, directory: Path, recursive: bool = True, sort: str = "date_desc", show_startup: bool = False, use_cache: bool = True, scan_mode: str = "serial", workers: Optional[int] = None, watch: bool = False, excludes: Tuple[str, ...] = (), skip_hidden: bool = False, use_gitignore: bool = True, profile: bool = False, profile_output: Optional[Path] = None, editor: Optional[str] = None):
         super().__init__()
         self.directory = directory
         self.recursive = recursive
         self.sort = sort
-        self.files: List[WritingFile] = []
-        self.categories: Dict[str, List[WritingFile]] = {}
+        self.scan_mode = scan_mode
+        self.scan_workers = workers
+        self.live_refresh = watch
+        self.excludes = excludes
+        self.skip_hidden = skip_hidden
+        self.use_gitignore = use_gitignore
+        # Timings are dumped here on exit, and cProfile output next to it
+        self.profile_output = profile_output or Path("writerbox-profile.json")
+        if profile:
+            timings.enable()
+        # --editor, or None to go by $EDITOR; looked up on the first open
+        self.editor = editor
+        self._editor_command: Optional[Tuple[str, ...]] = None
+        self.watcher: Union[InotifyWatcher, PollingWatcher, None] = None
+        # Set on shutdown to stop the watch worker
+        self._watch_stop = threading.Event()
+        # Paths the watcher reported mid-scan, or None if it lost events
+        self._pending_paths: Optional[Set[Path]] = set()
+        self.index: ScanIndex | None = None
+        self.scanning = False
+        # Files loaded and found; the total is None until the walk is over
+        self.scan_progress: Tuple[int, Optional[int]] = (0, None)
+        self._scan_lock = threading.Lock()
+        self.cache: MetadataCache | None = MetadataCache.for_directory(directory) if use_cache else None
+        self.categories: Dict[str, SortedFiles] = {}
         self.current_file: WritingFile | None = None
+        self.previews = PreviewCache()
+        self.shown_preview: Optional[RenderedPreview] = None
+        self.shown_preview_key: Optional[Tuple] = None
+        self._preview_timer: Optional[Timer] = None
+        self.search_index = SearchIndex.for_directory(directory) if use_cache else SearchIndex()
+        self.search_loaded = False
+        self.search_ready = False
+        self.search_query = ""
+        self.search_matches: Optional[Set[Path]] = None
+        self.query_error: Optional[str] = None
+        self.tag_index = TagIndex()
+        # Keeps the tag index up to date as well
+        self.query_index = QueryIndex(self.tag_index)
+        self.tag_filter: Optional[str] = None
+        # Collection, category and tag totals, kept up to date per change
+        self.totals = Aggregator(removable=True)
+        self.file_labels: Dict[WritingFile, Text] = {}
+        # Categories the user has opened, kept across rebuilds and searches
+        self.expanded_categories: Set[str] = set()
         self.show_startup = show_startup
-        
+
     def on_mount(self) -> None:
         """Called when the app is mounted."""
         # Set the title
         self.title = f"WriterBox v0.1.0 — by brennan.day • {self.directory.name}"
-        
+
         # Load files
         self.load_files()
-        
+
         # Show startup screen on first launch
         if self.show_startup:
             self.push_screen(StartupScreen())
-        
+
     def compose(self) -> ComposeResult:
         """Compose the UI."""
         yield Header()
-        
+
         with Container(id="main-container"):
             # Main content area
             with Container(id="content-area"):
                 with Horizontal():
-                    # File tree
-                    yield WriterBoxTree("Files", id="file-tree")
-                    
+                    # Search box (shown with /) above the file tree
+                    with Vertical(id="tree-pane"):
+                        yield Input(placeholder="Search… (category: tag: words>500 modified:<30d)",
+                                    id="search-box")
+                        yield WriterBoxTree("Files", id="file-tree")
+
                     # Content viewer
                     with Vertical():
                         yield Static("Select a file to view its content", id="content-header")
                         with ScrollableContainer(id="file-content"):
                             yield Static("", id="file-content-inner")
-            
+
             # Footer with status - will be updated in load_files
             yield Static("", id="footer-box")
-        
+
     def on_mount(self) -> None:
         """Called when the app is mounted."""
         # Set the title
         self.title = f"WriterBox v0.1.0 — by brennan.day • {self.directory.name}"
-        
+
         # Load files
         self.load_files()
-        
+
+        # Render more of a long file as its preview is scrolled
+        self.watch(self.query_one("#file-content"), "scroll_y", self.on_preview_scroll, init=False)
+
+        # Pick up changes made outside the app
+        if self.live_refresh and self.index is not None:
+            self.watch_files(self.index.scanner.walker)
+
         # Show startup screen on first launch
         if hasattr(self, 'show_startup') and self.show_startup:
             self.push_screen(StartupScreen())
-        
+
     def get_category_icon(self, category: str) -> str:
         """Get the icon for a category."""
         icons = {
@@ -411,234 +617,830 @@ class WriterBoxUI(App):
             "uncategorized": "📄",
         }
         return icons.get(category.lower(), "📄")
-        
+
     def load_files(self) -> None:
-        """Load and display files."""
-        scanner = FileScanner(self.directory, self.recursive)
-        self.files = scanner.scan()
-        self.categories = scanner.group_by_category(self.files)
-        
-        # Apply sorting to files within each category
-        for category in self.categories:
-            self.categories[category] = self.sort_files(self.categories[category])
-        
+        """Load and display files.
+
+        Scanning runs on a background worker and the tree fills in as
+        batches arrive. Calling this mid-scan cancels and restarts it.
+        """
+        scanner = FileScanner(self.directory, self.recursive, cache=self.cache,
+                              mode=self.scan_mode, workers=self.scan_workers,
+                              lazy=True, excludes=self.excludes,
+                              skip_hidden=self.skip_hidden,
+                              use_gitignore=self.use_gitignore)
+        self.index = ScanIndex(scanner)
+        self.categories = {}
+        self.file_labels = {}
+        self.tag_index = TagIndex()
+        self.totals = Aggregator(removable=True)
+        self.query_index = QueryIndex(self.tag_index)
+        self.scanning = True
+        self.scan_progress = (0, None)
+        self.search_ready = False
+        self.update_footer()
+        self.populate_tree()
+        self.scan_files(self.index)
+
+    @work(thread=True, exclusive=True, group="scan")
+    def scan_files(self, index: ScanIndex) -> None:
+        """Scan the collection in a worker thread, streaming batches to the UI."""
+        worker = get_current_worker()
+        # A cancelled scan stops at its next batch; wait for it to let go of
+        # the cache before starting over
+        with self._scan_lock:
+            if worker.is_cancelled:
+                return
+            self.call_from_thread(self.scan_batch_loaded, index, IndexChanges(), 0, None)
+            found = 0
+            walked = False
+
+            def entries() -> Iterator[Tuple[Path, os.stat_result]]:
+                # Batches are loaded while the walk is still going
+                nonlocal found, walked
+                for entry in index.scanner.find_entries():
+                    found += 1
+                    yield entry
+                walked = True
+
+            done = 0
+            for changes in index.load_batches(entries()):
+                if worker.is_cancelled:
+                    return
+                done += len(changes.added)
+                self.call_from_thread(self.scan_batch_loaded, index, changes, done,
+                                      found if walked else None)
+            self.call_from_thread(self.scan_finished, index)
+
+    def scan_batch_loaded(self, index: ScanIndex, changes: IndexChanges, done: int,
+                          total: Optional[int]) -> None:
+        """Add a batch of scanned files to the tree."""
+        if index is not self.index:
+            # Left over from a scan that has since been restarted
+            return
+        self.scan_progress = (done, total)
+        if changes:
+            self.apply_changes(changes)
+        else:
+            self.update_footer()
+
+    def scan_finished(self, index: ScanIndex) -> None:
+        """Wrap up once the background scan is done."""
+        if index is not self.index:
+            return
+        self.scanning = False
+        self.update_footer()
+        if not self.categories:
+            self.populate_tree()
+        self.index_files(index)
+        pending, self._pending_paths = self._pending_paths, set()
+        if pending is None or pending:
+            self.files_changed(pending)
+
+    @work(thread=True, exclusive=True, group="search")
+    def index_files(self, index: ScanIndex) -> None:
+        """Bring the search index up to date in a worker thread."""
+        worker = get_current_worker()
+        if not self.search_loaded:
+            self.search_index.load()
+            self.search_loaded = True
+        self.search_index.sync(list(index.files.values()), lambda: worker.is_cancelled)
+        if worker.is_cancelled:
+            return
+        self.search_index.save()
+        self.call_from_thread(self.search_indexed, index)
+
+    def search_indexed(self, index: ScanIndex) -> None:
+        """Switch to incremental search updates once the index is built."""
+        if index is not self.index:
+            return
+        # Catch up with anything that changed while the worker was busy
+        self.search_index.sync(self.index.files.values())
+        self.search_ready = True
+        if self.search_matches is not None:
+            self.apply_search()
+
+    def sort_categories(self) -> None:
+        """Re-order the already loaded files within each category.
+
+        Nothing is sorted here; each category works out just the rows it
+        shows when the tree is rebuilt.
+        """
+        for files in self.categories.values():
+            files.set_sort(self.sort)
+
+    def update_footer(self) -> None:
+        """Update the footer with collection statistics."""
         # Update footer with single line format
         footer = self.query_one("#footer-box", Static)
-        total_files = len(self.files)
-        total_categories = len(self.categories)
-        total_words = sum(f.metadata['word_count'] for f in self.files)
-        total_reading_time = sum(f.metadata['reading_time'] for f in self.files)
-        
+        totals = self.totals.total
+        total_files = totals.files
+        total_categories = len(self.totals.categories)
+        total_words = totals.words
+        total_reading_time = totals.reading_time
+
         sort_display = {
             "date_desc": "Newest",
-            "date_asc": "Oldest", 
+            "date_asc": "Oldest",
             "title": "Title",
             "word_count": "Words"
         }
-        
+
+        progress = ""
+        if self.scanning:
+            done, total = self.scan_progress
+            count = f"{done:,}" if total is None else f"{done:,}/{total:,}"
+            progress = f"Scanning {count}… r=Restart | "
+        if self.query_error is not None:
+            progress += f"Query: {self.query_error} | "
+        if self.tag_filter is not None:
+            progress += f"Tag: #{self.tag_filter} | "
+        matches = self.filter_matches()
+        if matches is not None:
+            # Search results and tag sets only hold indexed files, so they
+            # can be counted without walking the categories
+            progress += f"Matches: {len(matches)} | "
+
         footer_text = (
+            progress +
             f"Files: {total_files} | "
             f"Categories: {total_categories} | "
             f"Words: {total_words:,} | "
             f"Time: {total_reading_time:.0f} min | "
             f"Sort: {sort_display.get(self.sort, self.sort)} | "
-            "Shortcuts: Enter=Open q=Quit r=Refresh ?=Help 1-4=Sort"
+            "Shortcuts: Enter=Open q=Quit r=Refresh /=Search g=Tags ?=Help 1-4=Sort"
         )
         footer.update(footer_text)
-        
-        # Populate the tree
+
+    def populate_tree(self) -> None:
+        """Rebuild the tree from the loaded categories.
+
+        Only open categories get file nodes, so the cost follows what is
+        on screen rather than the size of the collection.
+        """
+        with timings.phase("tree"):
+            self._populate_tree()
+
+    def _populate_tree(self) -> None:
         tree = self.query_one("#file-tree", Tree)
         tree.clear()
-        
-        if not self.files:
+
+        if not self.categories:
             # Empty state
-            empty_node = tree.root.add("No files found")
+            empty_node = tree.root.add("Scanning…" if self.scanning else "No files found")
+            return
+
+        categories = self.visible_categories()
+        if not categories:
+            tree.root.add("No matches")
             return
-        
-        for category, files in sorted(self.categories.items()):
-            # Get category icon
-            icon = self.get_category_icon(category)
-            
-            # Add category node with simple label
-            category_label = f"{icon} {category.title()} ({len(files)} files)"
-            category_node = tree.root.add(category_label)
-            
-            # Add files as leaf nodes (not expandable)
-            for file in files:
-                # Format file label with metadata
-                file_label = self.format_file_label_simple(file)
-                # Create the node and set its data
-                file_node = category_node.add_leaf(file_label)
-                file_node.data = file
-                
+
+        for category, files in sorted(categories.items()):
+            # Open every category with search or tag hits
+            expand = category in self.expanded_categories or self.filtering
+            category_node = tree.root.add(self.format_category_label(category, files),
+                                          data=category, expand=expand)
+            # Closed categories get their file nodes when first opened
+            if expand:
+                self.add_file_nodes(category_node, files)
+
         tree.root.expand()
         # Don't refresh to avoid clearing selection
-        
-    def sort_files(self, files: List[WritingFile]) -> List[WritingFile]:
-        """Sort files based on the current sort method."""
-        if self.sort == "date_desc":
-            return sorted(files, key=lambda f: f.metadata['modified'], reverse=True)
-        elif self.sort == "date_asc":
-            return sorted(files, key=lambda f: f.metadata['modified'])
-        elif self.sort == "title":
-            return sorted(files, key=lambda f: f.title.lower())
-        elif self.sort == "word_count":
-            return sorted(files, key=lambda f: f.metadata['word_count'], reverse=True)
+
+    @property
+    def filtering(self) -> bool:
+        """Check whether a search or tag filter narrows down the tree."""
+        return self.search_matches is not None or self.tag_filter is not None
+
+    def filter_matches(self) -> Optional[Set[Path]]:
+        """Get the paths passing the search and tag filters, or None without filters."""
+        matches = self.search_matches
+        if self.tag_filter is not None:
+            tagged = self.tag_index.files_with(self.tag_filter)
+            matches = tagged if matches is None else matches & tagged
+        return matches
+
+    def visible_categories(self) -> Dict[str, SortedFiles]:
+        """Get the categories to show, narrowed down to search and tag matches."""
+        matches = self.filter_matches()
+        if matches is None:
+            return self.categories
+        visible = {}
+        for category, files in self.categories.items():
+            hits = files.filter(lambda f: f.path in matches)
+            if hits:
+                visible[category] = hits
+        return visible
+
+    def apply_search(self) -> None:
+        """Filter the tree down to files matching the search query.
+
+        Field terms (category:, tag:, words, modified) are answered by the
+        query index and any other words by full-text search. While a
+        half-typed term doesn't parse, the last results stay up.
+        """
+        try:
+            query = parse_query(self.search_query.strip())
+        except QueryError as e:
+            self.query_error = str(e)
+        else:
+            self.query_error = None
+            self.search_matches = self.query_index.evaluate(query, self.search_index) if query else None
+        self.update_footer()
+        self.populate_tree()
+
+    def format_category_label(self, category: str, files: SortedFiles) -> str:
+        """Format a category label with its icon and file count."""
+        icon = self.get_category_icon(category)
+        return f"{icon} {category.title()} ({len(files)} files)"
+
+    def add_file_nodes(self, category_node: TreeNode, files: SortedFiles,
+                       count: Optional[int] = None) -> None:
+        """Add files as leaf nodes (not expandable) under a category.
+
+        Only the first ``count`` files (TREE_PAGE by default) get nodes,
+        picked without sorting the whole category, followed by a node
+        that loads the next page.
+        """
+        with timings.phase("sort"):
+            shown = files.top(count or self.TREE_PAGE)
+        for file in shown:
+            category_node.add_leaf(self.file_label(file), data=file)
+        self.add_more_node(category_node, len(shown), len(files))
+
+    def add_more_node(self, category_node: TreeNode, shown: int, total: int) -> None:
+        """Add the placeholder for files past the ones shown, if there are any."""
+        if shown < total:
+            category_node.add_leaf(Text(f"  … {total - shown:,} more", style="dim"),
+                                   data=MoreFiles(shown))
+
+    def load_more_files(self, node: TreeNode) -> None:
+        """Replace a "more" node with the next page of its category."""
+        category_node = node.parent
+        if category_node is None or category_node.data is None or not isinstance(node.data, MoreFiles):
+            return
+        start = node.data.start
+        node.remove()
+        files = self.visible_categories().get(category_node.data)
+        if not files:
+            return
+        with timings.phase("tree"):
+            with timings.phase("sort"):
+                page = files.page(start, self.TREE_PAGE)
+            for file in page:
+                category_node.add_leaf(self.file_label(file), data=file)
+            self.add_more_node(category_node, start + len(page), len(files))
+
+    def patch_file_nodes(self, category_node: TreeNode, files: SortedFiles) -> None:
+        """Bring an open category's file nodes in line with its files.
+
+        When the rows shown are the same files in the same order, e.g.
+        after an edit that doesn't move the file, only the changed nodes
+        are relabelled and the rest of the tree is left alone. As many
+        rows as were loaded stay loaded.
+        """
+        children = [child for child in category_node.children
+                    if isinstance(child.data, WritingFile)]
+        count = max(len(children), self.TREE_PAGE)
+        shown = files.top(count)
+        if [child.data.path for child in children if child.data] != [file.path for file in shown]:
+            category_node.remove_children()
+            self.add_file_nodes(category_node, files, count)
+            return
+        for child, file in zip(children, shown):
+            if child.data is not file:
+                child.data = file
+                child.set_label(self.file_label(file))
+        for child in list(category_node.children):
+            if isinstance(child.data, MoreFiles):
+                child.remove()
+        self.add_more_node(category_node, len(shown), len(files))
+
+    def select_file(self, path: Path) -> bool:
+        """Move the tree cursor to a file's node if it is on screen."""
+        tree = self.query_one("#file-tree", WriterBoxTree)
+        for category_node in tree.root.children:
+            for node in category_node.children:
+                if isinstance(node.data, WritingFile) and node.data.path == path:
+                    tree.move_cursor(node)
+                    return True
+        return False
+
+    def file_label(self, file: WritingFile) -> Text:
+        """Get a file's tree label, formatting it the first time it is shown."""
+        label = self.file_labels.get(file)
+        if label is None:
+            label = self.file_labels[file] = self.format_file_label_simple(file)
+        return label
+
+    def on_tree_node_expanded(self, event: Tree.NodeExpanded) -> None:
+        """Build a category's file nodes when it is opened."""
+        node = event.node
+        if isinstance(node.data, str):
+            self.expanded_categories.add(node.data)
+            files = self.visible_categories().get(node.data)
+            if not node.children and files:
+                with timings.phase("tree"):
+                    self.add_file_nodes(node, files)
+
+    def on_tree_node_collapsed(self, event: Tree.NodeCollapsed) -> None:
+        """Drop a closed category's file nodes; reopening reuses the cached labels."""
+        node = event.node
+        if isinstance(node.data, str):
+            self.expanded_categories.discard(node.data)
+            node.remove_children()
+
+    def refresh_files(self) -> None:
+        """Pick up changes on disk, re-parsing only files that changed."""
+        if self.index is None or self.scanning:
+            self.load_files()
+            return
+        self.update_files(self.index, None)
+
+    def reload_file(self, file: WritingFile) -> None:
+        """Pick up changes to a single file, e.g. after editing it.
+
+        Only that file is re-stat-ed and, if it changed, re-parsed. Its
+        node is patched in place, moving category if need be, and the
+        cursor stays on it.
+        """
+        if self.index is None or self.scanning:
+            self.load_files()
+            return
+        self.update_files(self.index, {file.path}, select=file.path)
+
+    @work(thread=True, group="scan")
+    def update_files(self, index: ScanIndex, paths: Optional[Set[Path]],
+                     select: Optional[Path] = None) -> None:
+        """Re-check files in a worker thread and hand the changes to the UI.
+
+        A refresh (``paths`` None) walks and stats the whole collection,
+        so like the scan it stays off the UI thread. Once the changes are
+        in, the cursor is put back on ``select``.
+        """
+        worker = get_current_worker()
+        with self._scan_lock:
+            # Restarting the scan cancels pending updates
+            if worker.is_cancelled:
+                return
+            changes = index.refresh() if paths is None else index.update(paths)
+            if changes:
+                self.call_from_thread(self.files_updated, index, changes, select)
+
+    def files_updated(self, index: ScanIndex, changes: IndexChanges,
+                      select: Optional[Path]) -> None:
+        """Patch in the changes found by update_files."""
+        if index is not self.index:
+            return
+        self.apply_changes(changes)
+        if select is not None:
+            # Rebuilt nodes would leave the cursor on whatever took the file's line
+            self.call_after_refresh(self.select_file, select)
+
+    @work(thread=True, exclusive=True, group="watch")
+    def watch_files(self, walker: DirectoryWalker) -> None:
+        """Watch for outside changes in a worker thread.
+
+        Setting up the watcher walks the whole tree and the polling
+        fallback re-stats every file, so both stay off the UI thread;
+        only the changed paths are handed over.
+        """
+        worker = get_current_worker()
+        watcher = create_watcher(self.directory, self.recursive, walker)
+        self.watcher = watcher
+        try:
+            while not self._watch_stop.wait(self.WATCH_INTERVAL) and not worker.is_cancelled:
+                paths = watcher.poll()
+                if paths is None or paths:
+                    self.call_from_thread(self.files_changed, paths)
+        finally:
+            watcher.close()
+
+    def files_changed(self, paths: Optional[Set[Path]]) -> None:
+        """Patch in the paths the watcher saw change (None: rescan everything)."""
+        if self.scanning or self.index is None:
+            # Kept until the scan is done
+            if paths is None or self._pending_paths is None:
+                self._pending_paths = None
+            else:
+                self._pending_paths |= paths
+            return
+        # None means the watcher lost track of events, so refresh everything
+        if paths is None or paths:
+            self.update_files(self.index, paths)
+
+    def apply_changes(self, changes: IndexChanges) -> None:
+        """Update categories and patch only the affected tree nodes."""
+        if not changes:
+            return
+
+        with timings.phase("group"):
+            for file in changes.removed:
+                self.file_labels.pop(file, None)
+                files = self.categories.get(file.category)
+                if files is not None:
+                    files.remove(file)
+            for file in changes.added:
+                files = self.categories.get(file.category)
+                if files is None:
+                    files = self.categories[file.category] = SortedFiles(sort=self.sort)
+                # Bisected into place once the category has been fully sorted
+                files.add(file)
+            self.totals.apply(changes)
+            # Also updates the tag index
+            self.query_index.apply(changes)
+
+        affected = changes.categories
+        for category in affected:
+            if not self.categories.get(category):
+                self.categories.pop(category, None)
+
+        if self.search_ready:
+            for file in changes.removed:
+                self.search_index.remove(file.path)
+            for file in changes.added:
+                self.search_index.add(file)
+        self.update_footer()
+
+        tree = self.query_one("#file-tree", WriterBoxTree)
+        nodes = {node.data: node for node in tree.root.children if isinstance(node.data, str)}
+        if self.search_matches is not None:
+            # Results can change anywhere, so filter again
+            self.apply_search()
+        elif self.tag_filter is not None:
+            self.populate_tree()
+        elif not self.categories or any(c in self.categories and c not in nodes for c in affected):
+            # A new category (or the empty state) changes the tree's shape
+            self.populate_tree()
         else:
-            # Default to date_desc
-            return sorted(files, key=lambda f: f.metadata['modified'], reverse=True)
-        
-    def format_file_label_simple(self, file: WritingFile) -> str:
+            with timings.phase("tree"):
+                for category in affected:
+                    node = nodes.get(category)
+                    if node is None:
+                        continue
+                    if category not in self.categories:
+                        node.remove()
+                        continue
+                    node.set_label(self.format_category_label(category, self.categories[category]))
+                    if node.is_expanded:
+                        self.patch_file_nodes(node, self.categories[category])
+
+        # Keep the preview in step with an edited file
+        if (self.index is not None and self.current_file is not None
+                and self.current_file in changes.removed):
+            replacement = self.index.files.get(self.current_file.path)
+            if replacement is not None:
+                self.display_file_content(replacement)
+
+    def set_sort(self, sort: str) -> None:
+        """Change the sort method without touching the filesystem."""
+        self.sort = sort
+        self.sort_categories()
+        self.update_footer()
+        self.populate_tree()
+
+    def format_file_label_simple(self, file: WritingFile) -> Text:
         """Format a file label for tree display with Rich text styling."""
         # Create a Rich Text object with styling
         text = Text()
-        
+
         # Add filename (default color)
         text.append("  ")
         text.append(file.filename, style="default")
         text.append(" • ")
-        
+
         # Add date in red
-        text.append(file.metadata['modified'].strftime('%b %d'), style="red")
+        text.append(file.modified.strftime('%b %d'), style="red")
         text.append(" • ")
-        
+
         # Add word count in orange/yellow
-        text.append(f"{file.metadata['word_count']} words", style="yellow")
+        text.append(f"{file.word_count} words", style="yellow")
         text.append(" • ")
-        
+
         # Add reading time in green
-        reading_time = file.metadata['reading_time']
+        reading_time = file.reading_time
         if reading_time < 1:
             text.append("<1 min", style="green")
         elif reading_time == 1:
             text.append("~1 min", style="green")
         else:
             text.append(f"~{reading_time} min", style="green")
-        
+
         # Add tags in light blue if they exist
         if file.tags:
             for tag in file.tags:
                 text.append(f" #{tag}", style="bright_blue")
-        
+
         return text
-        
+
     def on_tree_node_highlighted(self, event: Tree.NodeHighlighted) -> None:
         """Called when a tree node is highlighted (cursor moves)."""
         # Only display content if this is a file node (has WritingFile data)
         if hasattr(event.node, 'data') and isinstance(event.node.data, WritingFile):
-            self.display_file_content(event.node.data)
+            # Wait for the cursor to settle before rendering anything new
+            self.display_file_content(event.node.data, delay=self.PREVIEW_DELAY)
+        elif isinstance(event.node.data, MoreFiles):
+            # Scrolling onto the end of a page loads the next one
+            self.load_more_files(event.node)
         # Don't do anything for category nodes - don't clear the content
-            
+
     def on_tree_node_selected(self, event: Tree.NodeSelected) -> None:
         """Called when a tree node is selected."""
         # Only display content if this is a file node (has WritingFile data)
         if hasattr(event.node, 'data') and isinstance(event.node.data, WritingFile):
             self.display_file_content(event.node.data)
         # Don't do anything for category nodes
-            
-    def display_file_content(self, file: WritingFile) -> None:
-        """Display the content of a file with optional markdown highlighting."""
-        content_widget = self.query_one("#file-content-inner", Static)
+
+    def on_resize(self, event: events.Resize) -> None:
+        """Re-render the preview to fit the new width."""
+        if self.current_file is not None:
+            self.display_file_content(self.current_file, delay=self.PREVIEW_DELAY)
+
+    def preview_width(self) -> int:
+        """Get the width available to the preview."""
+        return self.query_one("#file-content-inner", Static).content_region.width or 80
+
+    def preview_key(self, file: WritingFile, width: int) -> Tuple:
+        """Get the cache key for a file's preview at a given width."""
+        return (file.path, file.signature, width)
+
+    def display_file_content(self, file: WritingFile, delay: float = 0) -> None:
+        """Display the content of a file with optional markdown highlighting.
+
+        Cached previews show straight away. Anything else is rendered on a
+        worker thread, once ``delay`` seconds pass without another file
+        being shown, so scrolling past files doesn't render each of them.
+        """
         header = self.query_one("#content-header", Static)
-        
-        if MARKDOWN_AVAILABLE:
-            # Use Rich's Markdown component directly in Static
-            content_widget.update(RichMarkdown(file.content, code_theme="monokai"))
-        else:
-            # Fallback to plain text
-            content_widget.update(file.content)
-        
+
         # Update header
         icon = self.get_category_icon(file.category)
         header.update(f"{icon} {file.filename} ({file.category})")
         self.current_file = file
-        
-    def get_editor(self) -> str:
-        """Get the preferred text editor."""
-        # Check environment variables
-        editor = os.environ.get("EDITOR")
-        if editor:
-            return editor
-            
-        # Fallback to common editors
-        editors = ["micro", "nano", "vim", "vi", "code"]
-        for ed in editors:
-            if subprocess.run(["which", ed], capture_output=True).returncode == 0:
-                return ed
-                
-        return "nano"  # Default fallback
-        
+
+        if self._preview_timer is not None:
+            self._preview_timer.stop()
+            self._preview_timer = None
+        width = self.preview_width()
+        if self.preview_key(file, width) in self.previews:
+            self.preview_rendered(file, width)
+        elif delay:
+            self._preview_timer = self.set_timer(
+                delay, lambda: self.render_file_preview(file, width))
+        else:
+            self.render_file_preview(file, width)
+
+    @work(thread=True, exclusive=True, group="preview")
+    def render_file_preview(self, file: WritingFile, width: int) -> None:
+        """Render a preview in a worker thread and show it when done."""
+        worker = get_current_worker()
+        preview = self.build_preview(file, width)
+        self.previews.put(self.preview_key(file, width), preview)
+        if not worker.is_cancelled:
+            self.call_from_thread(self.preview_rendered, file, width)
+
+    def build_preview(self, file: WritingFile, width: int) -> RenderedPreview:
+        """Render a file's preview; runs on a worker thread."""
+        if file.size is not None and file.size > self.PAGED_PREVIEW_BYTES:
+            # Start with the first few screens and render the rest on scroll
+            preview = PagedPreview(file.path, width, markdown_available())
+            preview.fill(self.PREVIEW_SCREENS * self.size.height)
+            return preview
+        # Files are scanned lazily, so this is where the body is first read
+        return render_preview(file.read_body(), width, markdown_available())
+
+    def preview_rendered(self, file: WritingFile, width: int) -> None:
+        """Show a cached preview if its file is still the one selected."""
+        if file is not self.current_file:
+            return
+        preview = self.previews.get(self.preview_key(file, width))
+        if preview is None:
+            return
+        if preview is not self.shown_preview:
+            self.query_one("#file-content-inner", Static).update(preview)
+            self.query_one("#file-content", ScrollableContainer).scroll_home(animate=False)
+            self.shown_preview = preview
+            self.shown_preview_key = self.preview_key(file, width)
+        self.prefetch_previews(width)
+
+    def on_preview_scroll(self, scroll_y: float) -> None:
+        """Render the next page of a paged preview as the end comes into view."""
+        preview = self.shown_preview
+        if not isinstance(preview, PagedPreview) or preview.complete or preview.loading:
+            return
+        container = self.query_one("#file-content", ScrollableContainer)
+        if scroll_y + 2 * container.size.height >= container.virtual_size.height:
+            preview.loading = True
+            self.load_preview_page(preview)
+
+    @work(thread=True, group="preview-page")
+    def load_preview_page(self, preview: PagedPreview) -> None:
+        """Render the next page of a preview in a worker thread."""
+        page = preview.next_page()
+        self.call_from_thread(self.preview_page_loaded, preview, page)
+
+    def preview_page_loaded(self, preview: PagedPreview, page: Optional[RenderedPreview]) -> None:
+        """Add a freshly rendered page to a preview."""
+        preview.append(page)
+        if preview is not self.shown_preview:
+            return
+        # Keep the cache's line count honest now the preview has grown
+        self.previews.put(self.shown_preview_key, preview)
+        self.query_one("#file-content-inner", Static).update(preview)
+        # A short page may still leave the end in view
+        self.call_after_refresh(self.on_preview_scroll,
+                                self.query_one("#file-content", ScrollableContainer).scroll_y)
+
+    def prefetch_previews(self, width: int) -> None:
+        """Render the files either side of the cursor ahead of time."""
+        tree = self.query_one("#file-tree", WriterBoxTree)
+        neighbours = []
+        for line in (tree.cursor_line + 1, tree.cursor_line - 1):
+            node = tree.get_node_at_line(line) if line >= 0 else None
+            if node is not None and isinstance(node.data, WritingFile):
+                if self.preview_key(node.data, width) not in self.previews:
+                    neighbours.append(node.data)
+        if neighbours:
+            self.prefetch_file_previews(neighbours, width)
+
+    @work(thread=True, exclusive=True, group="prefetch")
+    def prefetch_file_previews(self, files: List[WritingFile], width: int) -> None:
+        """Render previews into the cache without showing them."""
+        worker = get_current_worker()
+        for file in files:
+            if worker.is_cancelled:
+                return
+            self.previews.put(self.preview_key(file, width), self.build_preview(file, width))
+
+    def get_editor(self) -> Tuple[str, ...]:
+        """Get the editor command, looked up once and then reused."""
+        if self._editor_command is None:
+            self._editor_command = resolve_editor(self.editor)
+        return self._editor_command
+
     def action_open_file(self) -> None:
         """Open the currently selected file in the preferred editor."""
         # Get the currently selected tree node
         tree = self.query_one("#file-tree", WriterBoxTree)
-        
+
         if tree.cursor_node:
             # Check if this is a file node (has WritingFile data)
             if hasattr(tree.cursor_node, 'data') and isinstance(tree.cursor_node.data, WritingFile):
                 # This is a file node, open it
                 file_to_open = tree.cursor_node.data
                 editor = self.get_editor()
-                file_path = str(file_to_open.path)
-                
+
                 try:
                     # Use suspend as a context manager for proper terminal handling
-                    with self.suspend():
-                        # Simple, clean command without extra flags
-                        os.system(f'{editor} "{file_path}"')
+                    with self.suspend(), timings.phase("editor"):
+                        # Run the editor directly, so paths need no quoting
+                        open_in_editor(editor, file_to_open.path)
                 except Exception as e:
                     # If anything fails, show the command to run manually
-                    self.notify(f"Error: {e}. Run manually: {editor} {file_path}", severity="error")
+                    command = shlex.join([*editor, str(file_to_open.path)])
+                    self.notify(f"Error: {e}. Run manually: {command}", severity="error")
                     return
-                
-                # Refresh the file list when returning
-                self.load_files()
-                self.notify(f"Returned from {editor}", severity="information")
+
+                # Only the edited file can have changed
+                self.reload_file(file_to_open)
+                self.notify(f"Returned from {editor[0]}", severity="information")
             else:
                 # This shouldn't happen since the Tree handles categories
                 pass
         else:
             self.notify("No file selected", severity="warning")
-                
+
     def action_refresh(self) -> None:
-        """Refresh the file list."""
-        self.load_files()
+        """Refresh the file list, or restart a scan that is in progress."""
+        if self.scanning:
+            self.load_files()
+            self.notify("Scan restarted", severity="information")
+            return
+        self.refresh_files()
         self.notify("File list refreshed", severity="information")
-        
+
     def action_sort_date_desc(self) -> None:
         """Sort by date (newest first)."""
-        self.sort = "date_desc"
-        self.load_files()
+        self.set_sort("date_desc")
         self.notify("Sorted by date (newest first)", severity="information")
-        
+
     def action_sort_date_asc(self) -> None:
         """Sort by date (oldest first)."""
-        self.sort = "date_asc"
-        self.load_files()
+        self.set_sort("date_asc")
         self.notify("Sorted by date (oldest first)", severity="information")
-        
+
     def action_sort_title(self) -> None:
         """Sort by title (A-Z)."""
-        self.sort = "title"
-        self.load_files()
+        self.set_sort("title")
         self.notify("Sorted by title (A-Z)", severity="information")
-        
+
     def action_sort_word_count(self) -> None:
         """Sort by word count (longest first)."""
-        self.sort = "word_count"
-        self.load_files()
+        self.set_sort("word_count")
         self.notify("Sorted by word count (longest first)", severity="information")
-        
+
+    def action_search(self) -> None:
+        """Show the search box."""
+        search_box = self.query_one("#search-box", Input)
+        search_box.display = True
+        search_box.focus()
+
+    def action_tags(self) -> None:
+        """Show the tag browser."""
+        if not self.tag_index:
+            self.notify("No tags found", severity="warning")
+            return
+        self.push_screen(TagScreen(self.tag_index.counts(), self.tag_filter),
+                         self.set_tag_filter)
+
+    def set_tag_filter(self, tag: Optional[str]) -> None:
+        """Show only files carrying a tag, or everything for None."""
+        self.tag_filter = tag
+        self.update_footer()
+        self.populate_tree()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Filter the tree as the search query is typed."""
+        if event.input.id == "search-box":
+            self.search_query = event.value
+            self.apply_search()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Move to the results when Enter is pressed in the search box."""
+        if event.input.id == "search-box":
+            self.query_one("#file-tree", WriterBoxTree).focus()
+
+    def action_timings(self) -> None:
+        """Show the live phase timings."""
+        if not timings.enabled:
+            self.notify("Start WriterBox with --profile to collect timings", severity="warning")
+            return
+        self.push_screen(TimingScreen())
+
+    def action_profile_refresh(self) -> None:
+        """Run one refresh under cProfile and save the stats."""
+        if not timings.enabled:
+            self.notify("Start WriterBox with --profile to collect timings", severity="warning")
+            return
+        if self.index is None or self.scanning:
+            self.notify("Wait for the scan to finish first", severity="warning")
+            return
+        if not self._scan_lock.acquire(blocking=False):
+            self.notify("Wait for the refresh to finish first", severity="warning")
+            return
+        index = self.index
+        path = self.profile_output.with_suffix(".prof")
+        try:
+            # Refreshed here rather than on a worker, as cProfile only sees this thread
+            profile_call(lambda: self.apply_changes(index.refresh()), path)
+        except OSError as e:
+            self.notify(f"Error saving profile: {e}", severity="error")
+            return
+        finally:
+            self._scan_lock.release()
+        self.notify(f"Refresh profile saved to {path}", severity="information")
+
     def action_help(self) -> None:
         """Show the help screen."""
         self.push_screen(HelpScreen())
-        
+
     def action_quit(self) -> None:
         """Quit the application."""
         self.exit()
-        
+
+    def on_unmount(self) -> None:
+        """Called when the app is shutting down."""
+        # The watch worker closes the watcher on its way out
+        self._watch_stop.set()
+        if timings.enabled:
+            try:
+                timings.dump(self.profile_output)
+            except OSError as e:
+                print(f"Error saving timings to {self.profile_output}: {e}", file=sys.stderr)
+        self.search_index.save()
+        if self.cache is not None:
+            # Let a cancelled scan finish its batch before closing the cache
+            with self._scan_lock:
+                self.cache.close()
+
     def action_escape(self) -> None:
         """Handle escape key."""
+        # Clear an active search first
+        search_box = self.query_one("#search-box", Input)
+        if search_box.display:
+            search_box.value = ""
+            search_box.display = False
+            self.search_query = ""
+            self.query_error = None
+            self.apply_search()
+            self.query_one("#file-tree", WriterBoxTree).focus()
+            return
+
+        # Then a tag filter
+        if self.tag_filter is not None:
+            self.set_tag_filter(None)
+            return
+
         # If help is shown, close it
         if self.screen_stack:
             self.pop_screen()
@@ -647,7 +1449,15 @@ class WriterBoxUI(App):
             self.exit()
 
 
-def run_ui(directory: Path, recursive: bool = True, sort: str = "date_desc") -> None:
+def run_ui(directory: Path, recursive: bool = True, sort: str = "date_desc", use_cache: bool = True,
+           scan_mode: str = "serial", workers: Optional[int] = None, watch: bool = False,
+           excludes: Tuple[str, ...] = (), skip_hidden: bool = False, use_gitignore: bool = True,
+           profile: bool = False, profile_output: Optional[Path] = None,
+           editor: Optional[str] = None) -> None:
     """Run the WriterBox UI."""
-    app = WriterBoxUI(directory, recursive, sort)
+    app = WriterBoxUI(directory, recursive, sort, use_cache=use_cache,
+                      scan_mode=scan_mode, workers=workers, watch=watch,
+                      excludes=excludes, skip_hidden=skip_hidden,
+                      use_gitignore=use_gitignore, profile=profile,
+                      profile_output=profile_output, editor=editor)
     app.run()
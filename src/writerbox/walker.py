@@ -0,0 +1,204 @@
+"""Directory walking for WriterBox."""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from writerbox.profiling import timings
+
+# Directories that never hold a writing collection worth scanning
+DEFAULT_EXCLUDES = (".git/", ".hg/", ".svn/", "node_modules/")
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore-style glob into a regular expression."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            parts.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+class IgnorePattern:
+    """A single gitignore-style pattern.
+
+    Supports negation (``!``), directory-only patterns (trailing ``/``),
+    anchoring (a leading or inner ``/``), ``*``, ``?``, ``[...]`` and ``**``.
+    """
+
+    def __init__(self, pattern: str, base: str = ""):
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        self.anchored = "/" in pattern
+        self.regex = re.compile(_translate(pattern.lstrip("/")))
+        # Patterns from a nested .gitignore only apply below that directory
+        self.base = base
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        """Check a path relative to the collection root."""
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        if self.anchored:
+            return self.regex.fullmatch(rel_path) is not None
+        return self.regex.fullmatch(rel_path.rsplit("/", 1)[-1]) is not None
+
+
+def parse_ignore_lines(lines: Iterable[str], base: str = "") -> List[IgnorePattern]:
+    """Parse the lines of a .gitignore file."""
+    patterns = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("\\"):
+            # Escaped leading '#' or '!'
+            line = line[1:]
+        patterns.append(IgnorePattern(line, base))
+    return patterns
+
+
+class DirectoryWalker:
+    """Find markdown files with os.scandir, pruning ignored directories.
+
+    Each file comes with the stat result from its DirEntry, so callers
+    don't need to stat it again. Excluded directories are never entered.
+    """
+
+    def __init__(self, root: Path, recursive: bool = True,
+                 excludes: Iterable[str] = (), skip_hidden: bool = False,
+                 use_gitignore: bool = True):
+        self.root = root
+        self.recursive = recursive
+        self.skip_hidden = skip_hidden
+        self.use_gitignore = use_gitignore
+        self.patterns = parse_ignore_lines([*DEFAULT_EXCLUDES, *excludes])
+        self._gitignores: Dict[Path, List[IgnorePattern]] = {}
+
+    def _rel(self, path: Path) -> str:
+        """Get a path relative to the root, with forward slashes."""
+        return path.relative_to(self.root).as_posix()
+
+    def _gitignore(self, directory: Path) -> List[IgnorePattern]:
+        """Get the patterns from a directory's .gitignore, if it has one."""
+        if directory not in self._gitignores:
+            patterns: List[IgnorePattern] = []
+            if self.use_gitignore:
+                try:
+                    with open(directory / ".gitignore", encoding="utf-8") as f:
+                        base = "" if directory == self.root else self._rel(directory)
+                        patterns = parse_ignore_lines(f, base)
+                except (OSError, UnicodeDecodeError):
+                    pass
+            self._gitignores[directory] = patterns
+        return self._gitignores[directory]
+
+    def _rules_for(self, directory: Path) -> List[IgnorePattern]:
+        """Get every pattern that applies to entries of a directory."""
+        rules = list(self.patterns)
+        chain = [directory, *directory.parents]
+        for ancestor in reversed(chain):
+            if ancestor == self.root or self.root in ancestor.parents:
+                rules.extend(self._gitignore(ancestor))
+        return rules
+
+    def _ignored(self, rules: List[IgnorePattern], name: str, rel_path: str,
+                 is_dir: bool) -> bool:
+        """Check a single entry against hidden-file and ignore rules."""
+        if self.skip_hidden and name.startswith("."):
+            return True
+        ignored = False
+        for pattern in rules:
+            if pattern.matches(rel_path, is_dir):
+                ignored = not pattern.negate
+        return ignored
+
+    def walk(self, directory: Optional[Path] = None) -> Iterator[Tuple[Path, os.stat_result]]:
+        """Yield (path, stat) for every markdown file, in name order."""
+        directory = directory or self.root
+        if directory != self.root:
+            if not self.recursive or self.is_excluded(directory, is_dir=True):
+                # Subdirectories aren't part of a non-recursive collection
+                return
+
+        stack = [(directory, self._rules_for(directory))]
+        while stack:
+            current, rules = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    is_file = not is_dir and entry.is_file()
+                except OSError:
+                    continue
+                if not (is_dir or (is_file and entry.name.endswith(".md"))):
+                    continue
+                path = current / entry.name
+                if self._ignored(rules, entry.name, self._rel(path), is_dir):
+                    continue
+                if is_dir:
+                    if self.recursive:
+                        subdirs.append(path)
+                    continue
+                try:
+                    with timings.phase("stat"):
+                        stat = entry.stat()
+                except OSError:
+                    continue
+                yield path, stat
+
+            # Push in reverse so directories come out in name order
+            for subdir in reversed(subdirs):
+                stack.append((subdir, rules + self._gitignore(subdir)))
+
+    def is_excluded(self, path: Path, is_dir: bool = False) -> bool:
+        """Check whether a path, or any directory above it, is excluded."""
+        try:
+            parts = path.relative_to(self.root).parts
+        except ValueError:
+            return True
+        current = self.root
+        for i, name in enumerate(parts):
+            last = i == len(parts) - 1
+            rules = self._rules_for(current)
+            current = current / name
+            if self._ignored(rules, name, self._rel(current), is_dir or not last):
+                return True
+        return False
@@ -0,0 +1,180 @@
+"""Filesystem change detection for WriterBox."""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple, Union
+
+from writerbox.walker import DirectoryWalker
+
+
+class PollingWatcher:
+    """Detect changes by comparing stat snapshots of the collection.
+
+    Works everywhere, at the cost of re-stating every file on each poll.
+    """
+
+    def __init__(self, directory: Path, recursive: bool = True,
+                 walker: Optional[DirectoryWalker] = None):
+        self.directory = directory
+        self.recursive = recursive
+        self.walker = walker or DirectoryWalker(directory, recursive)
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """Record (mtime, size) for every markdown file."""
+        return {
+            path: (stat.st_mtime_ns, stat.st_size)
+            for path, stat in self.walker.walk()
+        }
+
+    def poll(self) -> Optional[Set[Path]]:
+        """Get the paths created, modified or deleted since the last poll."""
+        snapshot = self._take_snapshot()
+        changed = {
+            path for path, signature in snapshot.items()
+            if self._snapshot.get(path) != signature
+        }
+        changed.update(path for path in self._snapshot if path not in snapshot)
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+
+
+class InotifyWatcher:
+    """Detect changes with Linux inotify, without touching unchanged files.
+
+    Events are read without blocking, so poll() can be called from a timer.
+    """
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+
+    # Only react once writes are finished, not to every partial write
+    MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+            | IN_DELETE | IN_DELETE_SELF)
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, directory: Path, recursive: bool = True,
+                 walker: Optional[DirectoryWalker] = None):
+        self.directory = directory
+        self.recursive = recursive
+        self.walker = walker or DirectoryWalker(directory, recursive)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                                 use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, Path] = {}
+        try:
+            self._add_tree(directory)
+        except BaseException:
+            # e.g. out of watches; don't leak the descriptor
+            self.close()
+            raise
+
+    def _add_watch(self, directory: Path) -> None:
+        """Watch a single directory."""
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory: Path) -> None:
+        """Watch a directory and, when recursive, everything below it."""
+        self._add_watch(directory)
+        if self.recursive:
+            for root, dirs, _ in os.walk(directory):
+                # Don't spend watches on .git, node_modules and the like
+                dirs[:] = [
+                    name for name in dirs
+                    if not self.walker.is_excluded(Path(root) / name, is_dir=True)
+                ]
+                for name in dirs:
+                    self._add_watch(Path(root) / name)
+
+    def poll(self) -> Optional[Set[Path]]:
+        """Get the paths created, modified or deleted since the last poll.
+
+        Directories are reported as a whole when they appear or vanish.
+        Returns None if events were lost and a full rescan is needed.
+        """
+        changed: Set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                if mask & self.IN_Q_OVERFLOW:
+                    return None
+
+                parent = self._watches.get(wd)
+                if parent is None:
+                    continue
+                if mask & self.IN_IGNORED:
+                    # The watched directory is gone
+                    del self._watches[wd]
+                    continue
+                if mask & self.IN_DELETE_SELF:
+                    changed.add(parent)
+                    continue
+
+                path = parent / os.fsdecode(name)
+                if mask & self.IN_ISDIR:
+                    if not self.recursive or self.walker.is_excluded(path, is_dir=True):
+                        continue
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        try:
+                            self._add_tree(path)
+                        except OSError:
+                            continue
+                    changed.add(path)
+                elif path.suffix == ".md":
+                    changed.add(path)
+
+        return changed
+
+    def close(self) -> None:
+        """Stop watching."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._watches.clear()
+
+
+def create_watcher(directory: Path, recursive: bool = True,
+                   walker: Optional[DirectoryWalker] = None) -> Union[InotifyWatcher, PollingWatcher]:
+    """Get the best available watcher for this platform.
+
+    Pass the scanner's walker so excluded directories are skipped.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory, recursive, walker)
+        except (OSError, AttributeError) as e:
+            # No inotify (or out of watches) - fall back to polling
+            print(f"Error starting inotify, polling for changes instead: {e}", file=sys.stderr)
+    return PollingWatcher(directory, recursive, walker)
@@ -0,0 +1,72 @@
+"""Tests for streaming aggregation."""
+
+from pathlib import Path
+
+import pytest
+
+from writerbox.aggregate import Aggregator, aggregate
+from writerbox.scanner import FileScanner
+
+
+@pytest.fixture
+def sample_writings_dir():
+    """Use the actual sample_writings directory for testing."""
+    return Path(__file__).parent.parent / "sample_writings"
+
+
+def test_aggregate_matches_materialized_scan(sample_writings_dir):
+    """Streaming totals agree with grouping the full file list."""
+    scanner = FileScanner(sample_writings_dir, recursive=True, lazy=True)
+    files = scanner.scan()
+    groups = scanner.group_by_category(files)
+
+    stats = aggregate(scanner.iter_scan())
+
+    assert stats.total.files == len(files)
+    assert stats.total.words == sum(f.metadata["word_count"] for f in files)
+    assert set(stats.categories) == set(groups)
+    for category, members in groups.items():
+        totals = stats.categories[category]
+        assert totals.files == len(members)
+        assert totals.reading_time == sum(f.metadata["reading_time"] for f in members)
+        assert totals.oldest == min(f.metadata["modified"] for f in members)
+        assert totals.newest == max(f.metadata["modified"] for f in members)
+
+
+def test_aggregate_counts_each_tag(sample_writings_dir):
+    """A file with several tags counts towards each of them."""
+    scanner = FileScanner(sample_writings_dir, recursive=True)
+    files = scanner.scan()
+
+    stats = Aggregator().consume(files)
+
+    for tag, totals in stats.tags.items():
+        assert totals.files == sum(1 for f in files if tag in f.tags)
+
+
+def test_removable_totals_follow_changes(sample_writings_dir):
+    """Removing files gives the same totals as aggregating what is left."""
+    files = FileScanner(sample_writings_dir, recursive=True, lazy=True).scan()
+    files.sort(key=lambda f: f.mtime)
+    stats = Aggregator("month", removable=True).consume(files)
+
+    # Take out the oldest and newest files, and everything of one category
+    gone = [files[0], files[-1]] + [f for f in files[1:-1] if f.category == "poetry"]
+    for file in gone:
+        stats.remove(file)
+    expected = aggregate([f for f in files if f not in gone], "month")
+
+    assert stats.total.to_dict() == expected.total.to_dict()
+    assert "poetry" not in stats.categories
+    assert {c: t.to_dict() for c, t in stats.categories.items()} == \
+        {c: t.to_dict() for c, t in expected.categories.items()}
+    assert {t: v.to_dict() for t, v in stats.tags.items()} == \
+        {t: v.to_dict() for t, v in expected.tags.items()}
+
+
+def test_streaming_totals_are_not_removable(sample_writings_dir):
+    """Plain aggregators keep no per-file state, so they can't take files back."""
+    files = FileScanner(sample_writings_dir, recursive=True, lazy=True).scan()
+    stats = aggregate(files)
+    with pytest.raises(ValueError):
+        stats.remove(files[0])
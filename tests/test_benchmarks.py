@@ -0,0 +1,42 @@
+"""Tests for the benchmark suite."""
+
+from benchmarks.corpus import SHAPES, generate_corpus
+from benchmarks.run import BUDGETS, baselines, find_regressions, over_budget
+from writerbox.scanner import FileScanner
+
+
+def test_corpus_is_reproducible_and_scannable(tmp_path, capsys):
+    """The same seed gives the same files, and every shape can be scanned."""
+    first = generate_corpus(tmp_path / "a", files=120, seed=3, median_words=50)
+    second = generate_corpus(tmp_path / "b", files=120, seed=3, median_words=50)
+
+    assert [p.relative_to(tmp_path / "a") for p in first] == \
+        [p.relative_to(tmp_path / "b") for p in second]
+    assert first[7].read_text(encoding="utf-8") == second[7].read_text(encoding="utf-8")
+    assert {p.name.rsplit("_", 1)[0] for p in first} <= set(SHAPES)
+
+    files = FileScanner(tmp_path / "a").scan()
+    assert len(files) == 120
+    assert "uncategorized" in {f.category for f in files}
+
+
+def test_regressions_compare_against_recent_best():
+    """A benchmark is flagged when it is slower than the recent best on the same corpus."""
+    corpus = {"files": 100, "seed": 0}
+    history = [
+        {"corpus": corpus, "results": {"scan": {"median": 1.0}, "sort_files": {"median": 0.5}}},
+        {"corpus": corpus, "results": {"scan": {"median": 0.8}}},
+        {"corpus": {"files": 5, "seed": 0}, "results": {"scan": {"median": 0.1}}},
+    ]
+    baseline = baselines(history, corpus)
+    assert baseline == {"scan": 0.8, "sort_files": 0.5}
+
+    results = {"scan": {"median": 1.0}, "sort_files": {"median": 0.55}, "new": {"median": 9.0}}
+    assert find_regressions(results, baseline, tolerance=0.2) == [("scan", 0.8, 1.0)]
+
+
+def test_budgets_flag_slow_imports():
+    """Benchmarks with a budget are flagged when their median exceeds it."""
+    limit = BUDGETS["import_cli"]
+    assert over_budget({"import_cli": {"median": limit / 2}}) == []
+    assert over_budget({"import_cli": {"median": limit * 2}}) == [("import_cli", limit, limit * 2)]
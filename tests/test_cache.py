@@ -0,0 +1,109 @@
+"""Tests for the persistent metadata cache."""
+
+import os
+from unittest import mock
+
+import pytest
+
+from writerbox.cache import MetadataCache
+from writerbox.scanner import FileScanner, WritingFile
+
+
+@pytest.fixture
+def collection(tmp_path):
+    """Create a small writing collection."""
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "poem.md").write_text("""---
+category: poetry
+title: Cached Poem
+tags: [nature]
+---
+
+Leaves fall slowly down.
+""")
+    (notes / "plain.md").write_text("Just some words here.\n")
+    return notes
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return MetadataCache(tmp_path / "cache.sqlite")
+
+
+def test_cache_hit_skips_parsing(collection, cache):
+    """Unchanged files are served from the cache."""
+    first = FileScanner(collection, cache=cache).scan()
+
+    with mock.patch.object(WritingFile, "_load") as load:
+        second = FileScanner(collection, cache=cache).scan()
+        load.assert_not_called()
+
+    by_name = {f.filename: f for f in second}
+    poem = by_name["poem.md"]
+    assert poem.title == "Cached Poem"
+    assert poem.tags == ["nature"]
+    assert poem.metadata["word_count"] == 4
+    assert poem.content == "Leaves fall slowly down."
+    assert len(first) == len(second)
+
+
+def test_cache_persists_between_instances(collection, tmp_path):
+    """Records survive closing and reopening the cache file."""
+    cache = MetadataCache(tmp_path / "cache.sqlite")
+    FileScanner(collection, cache=cache).scan()
+    cache.close()
+
+    reopened = MetadataCache(tmp_path / "cache.sqlite")
+    assert len(reopened) == 2
+
+
+def test_modified_file_is_reparsed(collection, cache):
+    """A change in mtime or size invalidates the cached entry."""
+    FileScanner(collection, cache=cache).scan()
+
+    poem = collection / "poem.md"
+    poem.write_text("""---
+category: poetry
+title: Edited Poem
+---
+
+Now with quite a few more words than before.
+""")
+    stat = poem.stat()
+    os.utime(poem, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    files = FileScanner(collection, cache=cache).scan()
+    edited = next(f for f in files if f.filename == "poem.md")
+    assert edited.title == "Edited Poem"
+    assert edited.metadata["word_count"] == 9
+
+
+def test_deleted_files_are_pruned(collection, cache):
+    """Entries for files that no longer exist are dropped."""
+    FileScanner(collection, cache=cache).scan()
+    assert len(cache) == 2
+
+    (collection / "plain.md").unlink()
+    FileScanner(collection, cache=cache).scan()
+    assert len(cache) == 1
+
+
+def test_version_mismatch_discards_entries(collection, tmp_path):
+    """Bumping the cache version throws away old records."""
+    cache = MetadataCache(tmp_path / "cache.sqlite")
+    FileScanner(collection, cache=cache).scan()
+    cache.close()
+
+    with mock.patch.object(MetadataCache, "VERSION", MetadataCache.VERSION + 1):
+        reopened = MetadataCache(tmp_path / "cache.sqlite")
+        assert len(reopened) == 0
+
+
+def test_for_directory_uses_xdg_cache_home(collection, tmp_path, monkeypatch):
+    """The default cache location follows $XDG_CACHE_HOME."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    cache = MetadataCache.for_directory(collection)
+
+    assert cache.path.parent == tmp_path / "xdg" / "writerbox"
+    assert cache.path.suffix == ".sqlite"
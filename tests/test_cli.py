@@ -0,0 +1,124 @@
+"""Tests for the command-line interface."""
+
+import csv
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+from writerbox import cli
+
+
+@pytest.fixture
+def sample_writings_dir():
+    """Use the actual sample_writings directory for testing."""
+    return Path(__file__).parent.parent / "sample_writings"
+
+
+def run(*args):
+    result = CliRunner().invoke(cli.main, [str(arg) for arg in args])
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def test_no_command_starts_the_ui(sample_writings_dir):
+    """Without a subcommand the TUI is launched with the scan options."""
+    with mock.patch("writerbox.ui.run_ui") as run_ui:
+        run("--dir", sample_writings_dir, "--no-cache", "--scan-mode", "thread")
+    args, kwargs = run_ui.call_args
+    assert args[0] == sample_writings_dir
+    assert kwargs["scan_mode"] == "thread"
+    assert kwargs["use_cache"] is False
+    assert kwargs["editor"] is None
+
+
+def test_editor_option_reaches_the_ui(sample_writings_dir):
+    """--editor is handed to the UI instead of being ignored."""
+    with mock.patch("writerbox.ui.run_ui") as run_ui:
+        run("--dir", sample_writings_dir, "--editor", "code --wait")
+    assert run_ui.call_args.kwargs["editor"] == "code --wait"
+
+
+def test_cli_import_skips_heavy_modules():
+    """Loading the CLI (e.g. for --version) doesn't import the UI, parsers or cache."""
+    heavy = ["textual", "rich.markdown", "markdown", "frontmatter", "multiprocessing",
+             "sqlite3"]
+    code = f"import sys, writerbox.cli; print([m for m in {heavy!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_stats_json(sample_writings_dir):
+    """The JSON report has collection, category and tag totals."""
+    result = run("stats", "--dir", sample_writings_dir, "--no-cache", "--scan-mode", "serial")
+    report = json.loads(result.stdout)
+
+    assert report["total"]["files"] == 19
+    assert sum(c["files"] for c in report["categories"].values()) == 19
+    assert "poetry" in report["categories"]
+    assert report["tags"]
+    assert "histogram" not in report["total"]
+
+
+def test_stats_csv_with_histogram(sample_writings_dir):
+    """CSV rows cover every group, each followed by its histogram rows."""
+    result = run("--dir", sample_writings_dir, "stats", "--no-cache",
+                 "--scan-mode", "thread", "--format", "csv", "--histogram", "month")
+    rows = list(csv.DictReader(io.StringIO(result.stdout)))
+
+    totals = [row for row in rows if row["group"] == "total"]
+    assert totals[0]["period"] == "" and totals[0]["files"] == "19"
+    assert sum(int(row["files"]) for row in totals[1:]) == 19
+    assert {row["group"] for row in rows} == {"total", "category", "tag"}
+
+
+def test_stats_excludes_combine_with_group_options(sample_writings_dir):
+    """Scan options given before the command still apply to it."""
+    result = run("--exclude", "subdir/", "stats", "--dir", sample_writings_dir,
+                 "--no-cache", "--scan-mode", "serial")
+    report = json.loads(result.stdout)
+    assert report["total"]["files"] < 19
+
+
+def test_stats_with_numeric_category(tmp_path):
+    """A numeric category doesn't break sorting the report."""
+    (tmp_path / "a.md").write_text("---\ncategory: 2024\n---\n\nA year.\n")
+    (tmp_path / "b.md").write_text("---\ncategory: poetry\n---\n\nA poem.\n")
+    result = run("stats", "--dir", tmp_path, "--no-cache", "--format", "csv")
+    groups = [row["name"] for row in csv.DictReader(io.StringIO(result.stdout))
+              if row["group"] == "category"]
+    assert groups == ["2024", "poetry"]
+
+
+def test_query_prints_matching_paths(sample_writings_dir):
+    """Metadata terms and free text combine; results come newest first."""
+    from writerbox.scanner import FileScanner
+    files = FileScanner(sample_writings_dir).scan()
+    expected = sorted((f for f in files if f.category == "poetry" and f.word_count > 10),
+                      key=lambda f: f.mtime, reverse=True)
+    assert expected
+
+    result = run("query", "--dir", sample_writings_dir, "--no-cache", "--scan-mode", "serial",
+                 "category:poetry", "words>10")
+    paths = result.stdout.splitlines()
+    assert sorted(paths) == sorted(str(f.path) for f in expected)
+    mtimes = [Path(path).stat().st_mtime for path in paths]
+    assert mtimes == sorted(mtimes, reverse=True)
+
+    result = run("query", "--dir", sample_writings_dir, "--no-cache", "--scan-mode", "serial",
+                 "--format", "json", "--limit", "1", "category:poetry words>10")
+    entries = json.loads(result.stdout)
+    assert len(entries) == 1 and entries[0]["category"] == "poetry"
+    assert Path(entries[0]["path"]).stat().st_mtime == expected[0].mtime
+
+
+def test_query_reports_bad_terms(sample_writings_dir):
+    """A malformed term is a usage error, not an empty result."""
+    result = CliRunner().invoke(cli.main, ["query", "--dir", str(sample_writings_dir), "words>lots"])
+    assert result.exit_code == 2
+    assert "whole number" in result.output
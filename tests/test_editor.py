@@ -0,0 +1,37 @@
+"""Tests for editor lookup and launching."""
+
+import sys
+from unittest import mock
+
+from writerbox import editor
+from writerbox.editor import open_in_editor, resolve_editor
+
+
+def setup_function():
+    editor._resolve.cache_clear()
+
+
+def test_preferred_editor_wins(monkeypatch):
+    """--editor beats $EDITOR, and arguments are kept."""
+    monkeypatch.setenv("EDITOR", "vim")
+    assert resolve_editor("code --wait") == ("code", "--wait")
+    assert resolve_editor() == ("vim",)
+
+
+def test_fallback_searches_path_once(monkeypatch):
+    """Without a setting, the first editor on the PATH is used and remembered."""
+    monkeypatch.delenv("EDITOR", raising=False)
+    with mock.patch("shutil.which", side_effect=lambda name: "/usr/bin/vim" if name == "vim" else None) as which:
+        assert resolve_editor() == ("vim",)
+        assert resolve_editor() == ("vim",)
+    assert [call.args[0] for call in which.call_args_list] == ["micro", "nano", "vim"]
+
+
+def test_open_in_editor_passes_path_as_one_argument(tmp_path):
+    """Paths with spaces and quotes reach the editor untouched, with no shell."""
+    path = tmp_path / "it's a \"file\".md"
+    path.write_text("x", encoding="utf-8")
+    out = tmp_path / "args.txt"
+    script = f"import sys; open({str(out)!r}, 'w').write(sys.argv[1])"
+    assert open_in_editor((sys.executable, "-c", script), path) == 0
+    assert out.read_text() == str(path)
@@ -0,0 +1,94 @@
+"""Tests for the fast frontmatter parser."""
+
+from datetime import date
+from pathlib import Path
+
+import frontmatter
+import pytest
+import yaml
+
+from writerbox.header import load_yaml, parse_simple, parse_text
+
+
+@pytest.fixture
+def sample_writings_dir():
+    """Use the actual sample_writings directory for testing."""
+    return Path(__file__).parent.parent / "sample_writings"
+
+
+HEADERS = [
+    "title: Morning Coffee\ncategory: poetry\ntags: [coffee, morning, contemplation]\n",
+    "title: \"Poem with 'quotes' in title\"\ncategory: poetry\n",
+    "title: 'Single \"quoted\"'\ntags: []\n",
+    "title: Unicode Test 🎨\ncategory: fiction\n",
+    "title: Commas, are fine here\n",
+    "title: Spaced   out\n\ncategory: drafts\n",
+    "date: 2024-01-28\n",
+    "date: 2024-1-8\n",
+    "date: 2024-02-30\n",
+    "date: 2024-01-28 10:30:00\n",
+    "title: 1984\n",
+    "count: 0123\n",
+    "ratio: 1.5\n",
+    "title: -dash\n",
+    "draft: yes\n",
+    "title: Null\n",
+    "title: Key: value\n",
+    "title: Note # with a comment\n",
+    "tags: |\n  - first tag\n  - second tag\n",
+    "tags:\n  - a\n  - b\n",
+    "tags: [one, 2, three]\n",
+    "tags: [\"a, b\", c]\n",
+    "title: !!str tagged\n",
+    "title: &anchor A\nother: *anchor\n",
+    "on: value\n",
+    "title: \"escaped \\\" quote\"\n",
+    "just a scalar\n",
+    "",
+]
+
+
+@pytest.mark.parametrize("header", HEADERS)
+def test_load_yaml_matches_pyyaml(header):
+    """The fast path and the fallback together give PyYAML's result."""
+    try:
+        expected = yaml.safe_load(header)
+    except Exception as e:
+        with pytest.raises(type(e)):
+            load_yaml(header)
+        return
+    assert load_yaml(header) == (expected if isinstance(expected, dict) else {})
+
+
+def test_common_headers_skip_yaml():
+    """The usual title/category/tags shapes never reach PyYAML."""
+    assert parse_simple(HEADERS[0]) == {
+        "title": "Morning Coffee",
+        "category": "poetry",
+        "tags": ["coffee", "morning", "contemplation"],
+    }
+    assert parse_simple("date: 2024-01-28\ntags: [a, 2]\n") == {
+        "date": date(2024, 1, 28),
+        "tags": ["a", 2],
+    }
+    for header in ("tags:\n  - a\n", "ratio: 1.5\n", "draft: yes\n"):
+        assert parse_simple(header) is None
+
+
+def test_malformed_yaml_still_raises():
+    """Broken headers raise so the scanner can fall back to plain text."""
+    with pytest.raises(yaml.YAMLError):
+        load_yaml("tags: [test, edge-case\ndate: invalid-date-format\n")
+
+
+def test_sample_writings_match_python_frontmatter(sample_writings_dir):
+    """Every fixture splits exactly as python-frontmatter splits it."""
+    for path in sorted(sample_writings_dir.rglob("*.md")):
+        text = path.read_text(encoding="utf-8")
+        try:
+            expected = frontmatter.parse(text)
+        except yaml.YAMLError:
+            with pytest.raises(yaml.YAMLError):
+                parse_text(text)
+            continue
+        assert parse_text(text) == expected, path.name
@@ -0,0 +1,78 @@
+"""Tests for lazily sorted file lists."""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from writerbox.ordering import SORT_KEYS, SortedFiles
+
+
+def make_files(count, seed=0):
+    """Stand-ins with the attributes the sort keys read, with plenty of ties."""
+    rng = random.Random(seed)
+    return [SimpleNamespace(name=f"f{i}", mtime=float(rng.randrange(20)),
+                            title_key=f"t{rng.randrange(30):02}", word_count=rng.randrange(50))
+            for i in range(count)]
+
+
+def full_order(files, sort):
+    key, descending = SORT_KEYS[sort]
+    ordered = sorted(files, key=key)
+    return ordered[::-1] if descending else ordered
+
+
+@pytest.mark.parametrize("sort", sorted(SORT_KEYS))
+def test_top_and_pages_match_the_full_order(sort):
+    """The first rows come out the same before and after the full sort."""
+    files = make_files(200)
+    expected = full_order(files, sort)
+
+    lazy = SortedFiles(files, sort)
+    assert lazy.top(17) == expected[:17]
+    assert lazy.page(0, 17) == expected[:17]
+
+    pages = [lazy.page(start, 17) for start in range(0, len(files), 17)]
+    assert [f for page in pages for f in page] == expected
+    assert lazy.top(17) == expected[:17]
+    assert list(lazy) == expected
+
+
+@pytest.mark.parametrize("sort", sorted(SORT_KEYS))
+def test_changes_keep_the_order(sort):
+    """Adds and removes give the same order as sorting from scratch."""
+    files = make_files(100)
+    extra = make_files(30, seed=1)
+    lazy = SortedFiles(files[:50], sort)
+
+    for file in files[50:]:
+        lazy.add(file)
+    lazy.ordered()
+    for file in extra:
+        lazy.add(file)
+    for file in files[::3]:
+        lazy.remove(file)
+    lazy.remove(make_files(1)[0])  # Not in the list
+
+    kept = [f for f in files + extra if f not in files[::3]]
+    assert list(lazy) == full_order(kept, sort)
+    assert len(lazy) == len(kept)
+
+
+def test_set_sort_and_filter_defer_the_work():
+    """Switching sort and filtering don't sort anything until rows are asked for."""
+    files = make_files(50)
+    lazy = SortedFiles(files)
+    lazy.ordered()
+
+    lazy.set_sort("title")
+    assert "unordered" in repr(lazy)
+    # Ties keep the previous order, so compare the titles
+    titles = [f.title_key for f in full_order(files, "title")]
+    assert [f.title_key for f in lazy.top(5)] == titles[:5]
+
+    short = lazy.filter(lambda f: f.word_count < 10)
+    assert "unordered" in repr(short)
+    assert sorted(short, key=id) == sorted((f for f in files if f.word_count < 10), key=id)
+    assert [f.title_key for f in short] == sorted(f.title_key for f in short)
+    assert not SortedFiles()
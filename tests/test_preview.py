@@ -0,0 +1,127 @@
+"""Tests for preview rendering and caching."""
+
+from rich.segment import Segment
+
+from writerbox.preview import (
+    PagedPreview,
+    PreviewCache,
+    RenderedPreview,
+    body_offset,
+    read_page,
+    render_preview,
+)
+
+
+def preview(lines):
+    return RenderedPreview([[Segment("x")] for _ in range(lines)])
+
+
+def test_render_preview_fits_width():
+    """Rendered lines never exceed the requested width."""
+    body = "# Title\n\n" + "word " * 200
+    rendered = render_preview(body, 40)
+    assert len(rendered) > 5
+    assert all(Segment.get_line_length(line) <= 40 for line in rendered.lines)
+    text = "".join(segment.text for line in rendered.lines for segment in line)
+    assert "Title" in text
+
+
+def test_render_preview_plain_text():
+    """Without markdown the body is shown as-is."""
+    rendered = render_preview("# not a heading", 40, use_markdown=False)
+    assert "".join(s.text for s in rendered.lines[0]).rstrip() == "# not a heading"
+
+
+def test_cache_evicts_least_recently_used():
+    """The oldest unused entry goes first once the cache is full."""
+    cache = PreviewCache(max_entries=2)
+    cache.put("a", preview(1))
+    cache.put("b", preview(1))
+    assert cache.get("a") is not None
+    cache.put("c", preview(1))
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+
+
+def test_cache_is_bounded_by_lines():
+    """Large previews push others out to stay under the line budget."""
+    cache = PreviewCache(max_lines=100)
+    cache.put("a", preview(60))
+    cache.put("b", preview(30))
+    cache.put("c", preview(30))
+    assert len(cache) == 2
+    assert "a" not in cache
+    # A single oversized preview is still kept
+    cache.put("d", preview(500))
+    assert len(cache) == 1 and "d" in cache
+
+
+def test_body_offset_skips_frontmatter(tmp_path):
+    """The body starts after the closing boundary line."""
+    path = tmp_path / "note.md"
+    path.write_bytes(b"\n---\ntitle: x\n---\nBody text\n")
+    assert path.read_bytes()[body_offset(path):] == b"Body text\n"
+
+    path.write_bytes(b"No frontmatter\n---\n")
+    assert body_offset(path) == 0
+    path.write_bytes(b"---\ntitle: never closed\n")
+    assert body_offset(path) == 0
+
+
+def test_read_page_breaks_between_paragraphs(tmp_path):
+    """Pages end on a blank line and carry on where the last one stopped."""
+    path = tmp_path / "note.md"
+    paragraphs = [f"Paragraph {i} " + "é" * 20 for i in range(50)]
+    path.write_text("\n\n".join(paragraphs) + "\n", encoding="utf-8")
+
+    text, offset = read_page(path, 0, 200)
+    assert text.endswith("\n\n")
+    assert text.startswith("Paragraph 0")
+    pages = [text]
+    while offset is not None:
+        text, offset = read_page(path, offset, 200)
+        pages.append(text)
+    assert "".join(pages) == path.read_text(encoding="utf-8")
+
+
+def test_read_page_cuts_long_lines_on_character_boundaries(tmp_path):
+    """A single huge line is split without breaking UTF-8 sequences."""
+    path = tmp_path / "note.md"
+    path.write_text("é" * 1000, encoding="utf-8")
+    text, offset = read_page(path, 0, 101)
+    assert text == "é" * 50
+    assert offset == 100
+
+
+def test_paged_preview_renders_incrementally(tmp_path):
+    """Only enough pages for the requested lines are rendered at first."""
+    path = tmp_path / "big.md"
+    body = "".join(f"Paragraph {i} " + "word " * 30 + "\n\n" for i in range(200))
+    path.write_text("---\ntitle: Big\n---\n" + body)
+
+    preview = PagedPreview(path, 60, page_size=1024)
+    preview.fill(20)
+    assert 20 <= len(preview) < 100
+    assert not preview.complete
+
+    preview.fill(10 ** 6)
+    assert preview.complete
+    text = "".join(s.text for line in preview.lines for s in line)
+    assert "Paragraph 0" in text and "Paragraph 199" in text
+    assert "title" not in text
+
+
+def test_paged_preview_carries_code_fences(tmp_path):
+    """A code block split across pages stays a code block."""
+    path = tmp_path / "code.md"
+    code = "\n\n".join(f"line_{i} = {i}" for i in range(40))
+    path.write_text("```python\n" + code + "\n```\n\nAfter the code.\n")
+
+    preview = PagedPreview(path, 60, page_size=200)
+    preview.fill(10 ** 6)
+    plain = render_preview(path.read_text(), 60)
+    text = "".join(s.text for line in preview.lines for s in line)
+    # Rendered as code, so the fence markers themselves never show up
+    assert "```" not in text
+    assert "After the code." in text
+    assert "".join(s.text for line in plain.lines for s in line).count("line_") == text.count("line_")
@@ -0,0 +1,71 @@
+"""Tests for the timing instrumentation."""
+
+import json
+import pstats
+from pathlib import Path
+
+import pytest
+
+from writerbox.profiling import PhaseTimer, profile_call, timings
+from writerbox.scanner import FileScanner
+
+
+@pytest.fixture
+def sample_writings_dir():
+    """Use the actual sample_writings directory for testing."""
+    return Path(__file__).parent.parent / "sample_writings"
+
+
+@pytest.fixture
+def enabled_timings():
+    """Turn the shared timer on for one test."""
+    timings.reset()
+    timings.enable()
+    yield timings
+    timings.enabled = False
+    timings.reset()
+
+
+def test_disabled_timer_records_nothing():
+    """Phases are free no-ops until profiling is enabled."""
+    timer = PhaseTimer()
+    with timer.phase("parse"):
+        pass
+    assert list(timer.iterate("walk", [1, 2, 3])) == [1, 2, 3]
+    assert timer.snapshot() == {}
+
+
+def test_phases_are_counted_and_ordered():
+    """Each timed block counts once, and a walk counts once per pass."""
+    timer = PhaseTimer()
+    timer.enable()
+    for _ in range(3):
+        with timer.phase("sort"):
+            pass
+    with timer.phase("custom"):
+        pass
+    assert list(timer.iterate("walk", iter("abc"))) == ["a", "b", "c"]
+
+    stats = timer.snapshot()
+    assert list(stats) == ["walk", "sort", "custom"]
+    assert stats["sort"]["count"] == 3
+    assert stats["walk"]["count"] == 1
+    assert stats["sort"]["max"] >= stats["sort"]["mean"] >= 0
+
+
+def test_scan_reports_walk_stat_and_parse(sample_writings_dir, enabled_timings, tmp_path):
+    """A scan records its phases and the totals can be dumped as JSON."""
+    FileScanner(sample_writings_dir).group_by_category(FileScanner(sample_writings_dir).scan())
+
+    path = tmp_path / "profile.json"
+    enabled_timings.dump(path)
+    phases = json.loads(path.read_text())["phases"]
+    assert {"walk", "stat", "parse", "group"} <= set(phases)
+    assert phases["stat"]["count"] >= 19
+
+
+def test_profile_call_saves_stats(tmp_path):
+    """cProfile output can be read back with pstats."""
+    path = tmp_path / "refresh.prof"
+    assert profile_call(lambda: sum(range(100)), path) == 4950
+    assert pstats.Stats(str(path)).total_calls > 0
@@ -0,0 +1,192 @@
+"""Tests for metadata queries."""
+
+import os
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from writerbox.query import QueryError, QueryIndex, SortedColumn, parse_query
+from writerbox.scanner import FileScanner, ScanIndex
+from writerbox.search import SearchIndex
+from writerbox.tags import TagIndex
+
+
+@pytest.fixture
+def sample_writings_dir():
+    """Use the actual sample_writings directory for testing."""
+    return Path(__file__).parent.parent / "sample_writings"
+
+
+NOW = time.time()
+DAY = 86400
+
+
+def brute_force(files, query):
+    """Evaluate a query by looking at every file."""
+    def matches(file, term):
+        if term.field == "category":
+            return file.category.lower() == term.value
+        if term.field == "tag":
+            return term.value in (tag.lower() for tag in file.tags)
+        value = file.word_count if term.field == "words" else file.mtime
+        return ((term.low is None or value >= term.low)
+                and (term.high is None or value < term.high))
+
+    return {f.path for f in files
+            if all(matches(f, t) != t.negate for t in query.terms)}
+
+
+@pytest.fixture
+def collection(tmp_path):
+    """A few dozen files with varied categories, tags, lengths and ages."""
+    rng = random.Random(1)
+    for i in range(60):
+        path = tmp_path / f"file{i}.md"
+        tags = ", ".join(rng.sample(["nature", "city", "Love", "night"], rng.randint(0, 3)))
+        category = rng.choice(["poetry", "essays", "Journal"])
+        path.write_text(f"---\ncategory: {category}\ntags: [{tags}]\n---\n\n"
+                        + "word " * rng.randint(0, 1000), encoding="utf-8")
+        mtime = NOW - rng.uniform(0, 400) * DAY
+        os.utime(path, (mtime, mtime))
+    return tmp_path
+
+
+def test_parse_terms_and_text():
+    """Known fields become terms; everything else is free text."""
+    query = parse_query('category:Poetry -tag:"short story" words>=500 note:x "a phrase"', now=NOW)
+
+    assert [(t.field, t.value, t.negate) for t in query.terms] == [
+        ("category", "poetry", False), ("tag", "short story", True), ("words", None, False)]
+    assert query.terms[2].low == 500 and query.terms[2].high is None
+    assert query.text == 'note:x "a phrase"'
+    assert query.excluded == []
+
+
+@pytest.mark.parametrize("text, low, high", [
+    ("modified:<30d", NOW - 30 * DAY, None),
+    ("modified:2w", NOW - 14 * DAY, None),
+    ("modified>1y", None, NOW - 365 * DAY),
+    ("modified:2024-03-01", datetime(2024, 3, 1).timestamp(), datetime(2024, 3, 2).timestamp()),
+    ("modified>2024-03-01", datetime(2024, 3, 2).timestamp(), None),
+    ("modified<=2024-03-01", None, datetime(2024, 3, 2).timestamp()),
+    ("words<10", None, 10),
+    ("words:<=10", None, 11),
+    ("words=10", 10, 11),
+])
+def test_parse_ranges(text, low, high):
+    """Comparisons become half-open ranges."""
+    term = parse_query(text, now=NOW).terms[0]
+    assert (term.low, term.high) == (low, high)
+
+
+@pytest.mark.parametrize("text", [
+    "words>many", "modified:soon", "modified:2024-02-30", "modified=3d", "tag:", "category>a",
+])
+def test_parse_errors(text):
+    """Malformed terms are reported rather than silently ignored."""
+    with pytest.raises(QueryError):
+        parse_query(text)
+
+
+def test_sorted_column_ranges():
+    """Single inserts, bulk merges and removals keep the column in order."""
+    column = SortedColumn()
+    for value in [5, 1, 3, 3]:
+        column.add(value, Path(f"/{value}-{len(column)}"))
+    column.add_many([(value, Path(f"/bulk{value}")) for value in range(100)])
+    column.remove(3, Path("/3-3"))
+
+    assert column.values == sorted(column.values)
+    assert len(column) == 103
+    assert column.range(3, 5) == [Path("/3-2"), Path("/bulk3"), Path("/bulk4")]
+    assert len(column.range(high=1)) == 1
+
+
+@pytest.mark.parametrize("text", [
+    "category:poetry",
+    "category:journal tag:love",
+    "tag:nature words>500",
+    "words<=100",
+    "modified:<30d",
+    "modified:>90d words>=200 -category:essays",
+    "-tag:night",
+    "category:missing",
+])
+def test_index_matches_brute_force(collection, text):
+    """Indexed evaluation agrees with checking every file."""
+    files = FileScanner(collection).scan()
+    query = parse_query(text)
+
+    assert QueryIndex().consume(files).evaluate(query) == brute_force(files, query)
+
+
+def test_index_follows_changes(collection):
+    """Edits and deletions are reflected without rebuilding the index."""
+    scan = ScanIndex(FileScanner(collection))
+    index = QueryIndex().consume(scan.load())
+    path = collection / "file0.md"
+
+    path.write_text("---\ncategory: drafts\ntags: [fresh]\n---\n\n" + "word " * 5000, encoding="utf-8")
+    index.apply(scan.update([path]))
+    (collection / "file1.md").unlink()
+    index.apply(scan.update([collection / "file1.md"]))
+
+    query = parse_query("category:drafts tag:fresh words>4000 modified:<1h")
+    assert index.evaluate(query) == {path}
+    files = list(scan.files.values())
+    for text in ("words>500", "modified:>100d", "tag:nature"):
+        query = parse_query(text)
+        assert index.evaluate(query) == brute_force(files, query)
+    assert len(index) == len(index.mtimes) == len(index.words) == 59
+
+
+def test_tags_are_shared_and_match_any_case(tmp_path):
+    """Tag terms use the TagIndex handed in; numeric categories work too."""
+    (tmp_path / "a.md").write_text("---\ncategory: 2024\ntags: [Nature]\n---\n\nA.\n")
+    (tmp_path / "b.md").write_text("---\ncategory: poetry\ntags: [nature]\n---\n\nB.\n")
+    scan = ScanIndex(FileScanner(tmp_path))
+    tags = TagIndex()
+    index = QueryIndex(tags).consume(scan.load())
+    a, b = tmp_path / "a.md", tmp_path / "b.md"
+
+    assert tags.files_with("Nature") == {a}
+    assert index.evaluate(parse_query("tag:NATURE")) == {a, b}
+    assert index.evaluate(parse_query("category:2024")) == {a}
+
+    a.unlink()
+    index.apply(scan.update([a]))
+    assert "Nature" not in tags
+    assert index.evaluate(parse_query("tag:nature")) == {b}
+
+def test_free_text_uses_search_index(sample_writings_dir):
+    """Words that aren't terms narrow the results by full-text search."""
+    files = FileScanner(sample_writings_dir, lazy=True).scan()
+    index = QueryIndex().consume(files)
+    search = SearchIndex()
+    search.sync(files)
+
+    query = parse_query("morning words>10")
+    expected = search.search("morning") & index.evaluate(parse_query("words>10"))
+    assert expected
+    assert index.evaluate(query, search) == expected
+
+
+def test_negated_free_text_excludes_matches(sample_writings_dir):
+    """Free text with a leading - removes the files it matches."""
+    files = FileScanner(sample_writings_dir, lazy=True).scan()
+    index = QueryIndex().consume(files)
+    search = SearchIndex()
+    search.sync(files)
+
+    query = parse_query('category:poetry -poem -"spring rain"')
+    assert query.text == ""
+    assert query.excluded == ["poem", '"spring rain"']
+
+    poetry = index.evaluate(parse_query("category:poetry"))
+    expected = poetry - search.search("poem") - search.search('"spring rain"')
+    assert search.search("poem") & poetry
+    assert index.evaluate(query, search) == expected
+    assert index.evaluate(parse_query("-poem"), search) == set(index.files) - search.search("poem")
@@ -1,12 +1,12 @@
 """Tests for the file scanner module."""
 
-import pytest
-from pathlib import Path
-from datetime import datetime
-import tempfile
 import os
+import tempfile
+from pathlib import Path
+
+import pytest
 
-from writerbox.scanner import WritingFile, FileScanner
+from writerbox.scanner import FileScanner, ScanIndex, WritingFile
 
 
 @pytest.fixture
@@ -14,7 +14,7 @@ def temp_dir():
     """Create a temporary directory with test markdown files."""
     with tempfile.TemporaryDirectory() as tmpdir:
         dir_path = Path(tmpdir)
-        
+
         # Create test files with different frontmatter
         test_files = {
             "poem1.md": """---
@@ -41,10 +41,10 @@ Technology is changing our world...
 No frontmatter here.
 """,
         }
-        
+
         for filename, content in test_files.items():
             (dir_path / filename).write_text(content)
-            
+
         # Create a subdirectory with another file
         subdir = dir_path / "subdir"
         subdir.mkdir()
@@ -55,7 +55,7 @@ title: Nested Idea
 
 A nested file.
 """)
-        
+
         yield dir_path
 
 
@@ -63,7 +63,7 @@ def test_writing_file_load(temp_dir):
     """Test WritingFile loads and parses correctly."""
     file_path = temp_dir / "poem1.md"
     writing_file = WritingFile(file_path)
-    
+
     assert writing_file.category == "poetry"
     assert writing_file.title == "Spring Sonnet"
     assert writing_file.tags == ["nature", "spring"]
@@ -75,7 +75,7 @@ def test_writing_file_no_frontmatter(temp_dir):
     """Test WritingFile handles missing frontmatter."""
     file_path = temp_dir / "no_frontmatter.md"
     writing_file = WritingFile(file_path)
-    
+
     assert writing_file.category == "uncategorized"
     assert writing_file.title == "no_frontmatter"
     assert writing_file.tags == []
@@ -85,7 +85,7 @@ def test_filescanner_non_recursive(temp_dir):
     """Test FileScanner in non-recursive mode."""
     scanner = FileScanner(temp_dir, recursive=False)
     files = scanner.scan()
-    
+
     # Should only find files in root directory
     assert len(files) == 3
     filenames = [f.filename for f in files]
@@ -99,7 +99,7 @@ def test_filescanner_recursive(temp_dir):
     """Test FileScanner in recursive mode."""
     scanner = FileScanner(temp_dir, recursive=True)
     files = scanner.scan()
-    
+
     # Should find all files including nested
     assert len(files) == 4
     filenames = [f.filename for f in files]
@@ -111,13 +111,184 @@ def test_group_by_category(temp_dir):
     scanner = FileScanner(temp_dir, recursive=True)
     files = scanner.scan()
     categories = scanner.group_by_category(files)
-    
+
     assert "poetry" in categories
     assert "essays" in categories
     assert "drafts" in categories
     assert "uncategorized" in categories
-    
+
     assert len(categories["poetry"]) == 1
     assert len(categories["essays"]) == 1
     assert len(categories["drafts"]) == 1
     assert len(categories["uncategorized"]) == 1
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_parallel_scan_matches_serial(temp_dir, monkeypatch, mode):
+    """Parallel scan modes return the same files in the same order."""
+    monkeypatch.setattr(FileScanner, "PARALLEL_THRESHOLD", 0)
+    serial = FileScanner(temp_dir, recursive=True).scan()
+    parallel = FileScanner(temp_dir, recursive=True, mode=mode, workers=2).scan()
+
+    assert [f.path for f in parallel] == [f.path for f in serial]
+    assert [f.metadata["word_count"] for f in parallel] == [f.metadata["word_count"] for f in serial]
+    assert [f.tags for f in parallel] == [f.tags for f in serial]
+    assert [f.content for f in parallel] == [f.content for f in serial]
+
+
+def test_process_scan_reports_errors_in_parent(tmp_path, monkeypatch, capsys):
+    """Worker processes hand parse errors back instead of printing under the UI."""
+    monkeypatch.setattr(FileScanner, "PARALLEL_THRESHOLD", 0)
+    (tmp_path / "bad.md").write_text("---\ntitle: [unclosed\n---\n\nBody text.\n")
+    (tmp_path / "good.md").write_text("---\ntitle: Fine\n---\n\nBody text.\n")
+
+    files = FileScanner(tmp_path, mode="process", workers=2).scan()
+
+    assert sorted(f.filename for f in files) == ["bad.md", "good.md"]
+    # Printed by the parent, so it goes wherever sys.stderr points
+    assert f"Error loading {tmp_path / 'bad.md'}" in capsys.readouterr().err
+
+
+def test_unknown_scan_mode_rejected(temp_dir):
+    """An unknown scan mode is reported immediately."""
+    with pytest.raises(ValueError):
+        FileScanner(temp_dir, mode="gpu")
+
+
+def test_lazy_load_matches_eager(temp_dir):
+    """Lazy loading gives the same metadata without holding the body."""
+    for path in sorted(temp_dir.rglob("*.md")):
+        eager = WritingFile(path)
+        lazy = WritingFile(path, lazy=True)
+
+        assert lazy._content is None
+        assert lazy.frontmatter == eager.frontmatter
+        for key in ("word_count", "char_count", "line_count", "reading_time"):
+            assert lazy.metadata[key] == eager.metadata[key]
+        # Body is read on first access
+        assert lazy.content == eager.content
+
+
+def test_lazy_load_edge_cases(tmp_path):
+    """Streaming counts match the full parse on awkward whitespace."""
+    samples = [
+        "",
+        "\n\n  \n",
+        "  ---\ntitle: Indented\n---\n\n\nhello  world\n\n",
+        "---\ntitle: Unclosed\n",
+        "---\n---\nbody",
+        "windows\r\nline endings\r\n\r\n",
+        "form\x0cfeed\n \x0b \nend  \n\n",
+    ]
+    for i, text in enumerate(samples):
+        path = tmp_path / f"sample{i}.md"
+        path.write_bytes(text.encode("utf-8"))
+        eager = WritingFile(path)
+        lazy = WritingFile(path, lazy=True)
+
+        assert lazy.frontmatter == eager.frontmatter
+        for key in ("word_count", "char_count", "line_count"):
+            assert lazy.metadata[key] == eager.metadata[key], (text, key)
+
+
+def test_scan_index_refresh_only_reparses_changes(temp_dir, monkeypatch):
+    """A refresh re-parses changed files and reports what moved."""
+    index = ScanIndex(FileScanner(temp_dir, recursive=True))
+    index.load()
+
+    poem = temp_dir / "poem1.md"
+    poem.write_text("""---
+category: essays
+title: Spring Sonnet
+---
+
+Now an essay.
+""")
+    stat = poem.stat()
+    os.utime(poem, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (temp_dir / "essay1.md").unlink()
+    (temp_dir / "fresh.md").write_text("Brand new file.\n")
+
+    parsed = []
+    original_init = WritingFile.__init__
+
+    def tracking_init(self, path, *args, **kwargs):
+        parsed.append(path.name)
+        original_init(self, path, *args, **kwargs)
+
+    monkeypatch.setattr(WritingFile, "__init__", tracking_init)
+    changes = index.refresh()
+
+    assert sorted(parsed) == ["fresh.md", "poem1.md"]
+    assert sorted(f.filename for f in changes.added) == ["fresh.md", "poem1.md"]
+    assert sorted(f.filename for f in changes.removed) == ["essay1.md", "poem1.md"]
+    assert changes.categories == {"poetry", "essays", "uncategorized"}
+    assert index.files[poem].category == "essays"
+    assert not index.refresh()
+
+
+def test_scan_index_update_handles_directories(temp_dir):
+    """Updating a removed directory drops every file that was inside it."""
+    index = ScanIndex(FileScanner(temp_dir, recursive=True))
+    index.load()
+
+    nested = temp_dir / "subdir" / "nested.md"
+    nested.unlink()
+    (temp_dir / "subdir").rmdir()
+    changes = index.update([temp_dir / "subdir"])
+
+    assert [f.path for f in changes.removed] == [nested]
+    assert nested not in index.files
+
+
+def test_iter_scan_is_lazy_and_matches_scan(temp_dir, monkeypatch):
+    """iter_scan yields the same files as scan, one at a time."""
+    scanner = FileScanner(temp_dir, recursive=True)
+    expected = [f.path for f in scanner.scan()]
+
+    parsed = []
+    original_init = WritingFile.__init__
+
+    def tracking_init(self, path, *args, **kwargs):
+        parsed.append(path)
+        original_init(self, path, *args, **kwargs)
+
+    monkeypatch.setattr(WritingFile, "__init__", tracking_init)
+    stream = scanner.iter_scan()
+    first = next(stream)
+
+    # Only the first file has been parsed so far
+    assert parsed == [first.path]
+    assert [first.path] + [f.path for f in stream] == expected
+
+
+def test_numeric_category_is_text(tmp_path):
+    """A category the header parses as a number groups and sorts with the rest."""
+    (tmp_path / "a.md").write_text("---\ncategory: 2024\n---\n\nA year.\n")
+    (tmp_path / "b.md").write_text("---\ncategory: poetry\n---\n\nA poem.\n")
+    for lazy in (False, True):
+        scanner = FileScanner(tmp_path, lazy=lazy)
+        files = scanner.scan()
+
+        assert sorted(f.category for f in files) == ["2024", "poetry"]
+        assert sorted(scanner.group_by_category(files)) == ["2024", "poetry"]
+
+
+def test_writing_file_is_compact_record(tmp_path):
+    """Files are slotted records that share interned category and tag strings."""
+    for name in ("a", "b"):
+        (tmp_path / f"{name}.md").write_text(
+            f"---\ncategory: poetry\ntitle: Poem {name.upper()}\n"
+            f"tags: [nature]\nmood: calm\n---\n\nSome words.\n"
+        )
+    a, b = FileScanner(tmp_path).scan()
+
+    assert not hasattr(a, "__dict__")
+    assert a.category is b.category
+    assert a.tags[0] is b.tags[0]
+    assert a.title_key == "poem a"
+    assert a.frontmatter == {
+        "title": "Poem A", "category": "poetry", "tags": ["nature"], "mood": "calm",
+    }
+    assert a.metadata["word_count"] == a.word_count == 2
+    assert a.metadata["modified"] == a.modified
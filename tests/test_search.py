@@ -0,0 +1,109 @@
+"""Tests for the full-text search index."""
+
+import os
+
+import pytest
+
+from writerbox.scanner import FileScanner
+from writerbox.search import SearchIndex, tokenize
+
+
+@pytest.fixture
+def collection(tmp_path):
+    """Create a small writing collection."""
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "rain.md").write_text("""---
+title: Spring Rain
+tags: [weather, seasons]
+---
+
+The rain falls softly on the garden.
+""")
+    (notes / "garden.md").write_text("""---
+title: Garden Notes
+tags: [gardening]
+---
+
+Planted tomatoes and spring onions today.
+""")
+    (notes / "plain.md").write_text("Softly, softly, the night comes.\n")
+    return notes
+
+
+def build(directory, path=None):
+    index = SearchIndex(path)
+    index.sync(FileScanner(directory).scan())
+    return index
+
+
+def names(paths):
+    return sorted(p.name for p in paths)
+
+
+def test_tokenize():
+    """Words are lowercased and split on punctuation."""
+    assert tokenize("Don't STOP, now!") == ["don", "t", "stop", "now"]
+
+
+def test_terms_match_title_tags_and_body(collection):
+    """Every clause must match somewhere in the file."""
+    index = build(collection)
+    assert names(index.search("spring")) == ["garden.md", "rain.md"]
+    assert names(index.search("weather")) == ["rain.md"]
+    assert names(index.search("softly")) == ["plain.md", "rain.md"]
+    assert names(index.search("spring softly")) == ["rain.md"]
+    assert index.search("volcano") == set()
+    assert index.search("   ") == set()
+
+
+def test_prefix_and_phrase_queries(collection):
+    """Prefixes expand to every matching term; phrases need adjacent words."""
+    index = build(collection)
+    assert names(index.search("garden*")) == ["garden.md", "rain.md"]
+    assert names(index.search('"spring onions"')) == ["garden.md"]
+    assert names(index.search('"the garden"')) == ["rain.md"]
+    assert index.search('"garden the"') == set()
+
+
+def test_phrases_do_not_span_fields(collection):
+    """The end of the title and the start of the tags are not adjacent."""
+    index = build(collection)
+    assert index.search('"rain weather"') == set()
+    assert names(index.search('"spring rain"')) == ["rain.md"]
+
+
+def test_sync_only_reindexes_changes(collection, monkeypatch):
+    """Unchanged files are skipped and deleted files are dropped."""
+    index = build(collection)
+
+    rain = collection / "rain.md"
+    rain.write_text("---\ntitle: Snow\n---\n\nCold and white.\n")
+    stat = rain.stat()
+    os.utime(rain, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    (collection / "plain.md").unlink()
+
+    assert index.sync(FileScanner(collection).scan()) == 1
+    assert len(index) == 2
+    assert names(index.search("snow")) == ["rain.md"]
+    assert index.search("softly") == set()
+
+
+def test_index_persists_between_sessions(collection, tmp_path):
+    """A saved index loads back and answers the same queries."""
+    path = tmp_path / "index.search"
+    build(collection, path).save()
+
+    reopened = SearchIndex(path)
+    assert reopened.load()
+    assert names(reopened.search('"spring onions"')) == ["garden.md"]
+    assert reopened.sync(FileScanner(collection).scan()) == 0
+
+
+def test_version_mismatch_discards_index(collection, tmp_path, monkeypatch):
+    """Bumping the index version throws away the saved index."""
+    path = tmp_path / "index.search"
+    build(collection, path).save()
+
+    monkeypatch.setattr(SearchIndex, "VERSION", SearchIndex.VERSION + 1)
+    assert not SearchIndex(path).load()
@@ -0,0 +1,62 @@
+"""Tests for the tag index."""
+
+from pathlib import Path
+
+import pytest
+
+from writerbox.scanner import FileScanner, ScanIndex
+from writerbox.tags import TagIndex
+
+
+@pytest.fixture
+def sample_writings_dir():
+    """Use the actual sample_writings directory for testing."""
+    return Path(__file__).parent.parent / "sample_writings"
+
+
+def test_index_matches_file_tags(sample_writings_dir):
+    """Every tag maps to exactly the files that carry it."""
+    files = FileScanner(sample_writings_dir, lazy=True).scan()
+
+    index = TagIndex().consume(files)
+
+    assert set(index.paths) == {tag for f in files for tag in f.tags}
+    for tag, count in index.counts():
+        assert index.files_with(tag) == {f.path for f in files if tag in f.tags}
+        assert count == index.count(tag)
+    counts = [count for _, count in index.counts()]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_shared_tags_are_one_object(tmp_path):
+    """Tags are normalized at load and shared between files."""
+    (tmp_path / "a.md").write_text("---\ntags: [ nature , poetry]\n---\nA", encoding="utf-8")
+    (tmp_path / "b.md").write_text("---\ntags: |\n  - nature\n  - poetry\n---\nB", encoding="utf-8")
+
+    a, b = sorted(FileScanner(tmp_path).scan(), key=lambda f: f.filename)
+
+    assert a.tags == b.tags == ["nature", "poetry"]
+    assert all(x is y for x, y in zip(a.tags, b.tags))
+
+
+def test_index_follows_changes(tmp_path):
+    """Edits and deletions move files between tags and drop unused ones."""
+    note = tmp_path / "note.md"
+    other = tmp_path / "other.md"
+    note.write_text("---\ntags: [old, shared]\n---\nBody", encoding="utf-8")
+    other.write_text("---\ntags: [shared]\n---\nBody", encoding="utf-8")
+    scan = ScanIndex(FileScanner(tmp_path))
+    index = TagIndex().consume(scan.load())
+
+    note.write_text("---\ntags: [new, shared]\n---\nLonger body", encoding="utf-8")
+    index.apply(scan.update([note]))
+
+    assert "old" not in index
+    assert index.files_with("new") == {note}
+    assert index.files_with("shared") == {note, other}
+
+    other.unlink()
+    index.apply(scan.update([other]))
+
+    assert index.count("shared") == 1
+    assert len(index) == 2
@@ -0,0 +1,87 @@
+"""Tests for single-pass text statistics."""
+
+import io
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from writerbox.textstats import count_files, count_stream, count_text
+
+
+def reference(text):
+    """Count the obvious way, on the whole stripped text."""
+    text = text.strip()
+    return len(text.split()), len(text), len(text.splitlines())
+
+
+SAMPLES = [
+    "",
+    "   \n\n \t ",
+    "one",
+    "  hello  world  \n\n",
+    "line one\nline two\r\nline three\rfour",
+    "form\x0cfeed\n \x0b \nend  \n\n",
+    "unicode separator and\x85next café 🎨",
+    "non\xa0breaking space",
+    "First paragraph.\n\n\n  Second one!  Still second?\n \nThird",
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+def test_counts_match_whole_text(chunk_size):
+    """Chunked counts agree with splitting the whole text, at any chunk size."""
+    rng = random.Random(chunk_size)
+    alphabet = ["word", "a", " ", "  ", "\n", "\n\n", "\t", "\r\n", ".", "é", " "]
+    samples = SAMPLES + ["".join(rng.choices(alphabet, k=200)) for _ in range(50)]
+    for text in samples:
+        stats = count_text(text, chunk_size=chunk_size)
+        assert (stats.words, stats.chars, stats.lines) == reference(text), repr(text)
+
+
+def test_sentences_and_paragraphs():
+    """Optional counts cover sentence ends and blank-line separated blocks."""
+    text = "\n\nFirst paragraph. It has two sentences!\n\n\n  Second... one?\n \nThird without an end"
+    for chunk_size in (1, 5, 1024):
+        stats = count_text(text, sentences=True, paragraphs=True, chunk_size=chunk_size)
+        assert stats.sentences == 5
+        assert stats.paragraphs == 3
+
+    plain = count_text(text)
+    assert plain.sentences is None and plain.paragraphs is None
+    assert count_text("", sentences=True, paragraphs=True).paragraphs == 0
+
+
+def test_stream_and_batch_counts(tmp_path):
+    """Streams and batches of files give the same counts as strings."""
+    paths = []
+    for i, text in enumerate(SAMPLES):
+        path = tmp_path / f"f{i}.md"
+        path.write_text(text, encoding="utf-8", newline="")
+        paths.append(path)
+    paths.append(tmp_path / "missing.md")
+
+    expected = [reference(p.read_text(encoding="utf-8")) for p in paths[:-1]]
+    for results in (list(count_files(paths)),
+                    list(count_files(paths, executor=ThreadPoolExecutor(2)))):
+        assert results[-1] is None
+        assert [(s.words, s.chars, s.lines) for s in results[:-1]] == expected
+
+    stats = count_stream(io.StringIO("  two words\n"), chunk_size=3)
+    assert (stats.words, stats.chars, stats.lines) == (2, 9, 1)
+
+
+def test_long_run_without_whitespace_is_linear():
+    """A multi-MB word, e.g. an inline base64 image, isn't rescanned per chunk."""
+    word = "QUJD" * 1_000_000
+    text = f"![image](data:image/png;base64,{word})\n\nCaption here\n"
+    start = time.perf_counter()
+    stats = count_stream(io.StringIO(text), chunk_size=1024)
+    elapsed = time.perf_counter() - start
+    assert (stats.words, stats.chars, stats.lines) == reference(text)
+    # Rescanning the held text on every chunk takes minutes at this size
+    assert elapsed < 2
+
+    spaces = count_text(" " * 4_000_000 + "end", chunk_size=1024)
+    assert (spaces.words, spaces.chars, spaces.lines) == (1, 3, 1)
@@ -0,0 +1,547 @@
+"""Tests for the Textual UI."""
+
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from writerbox.preview import PagedPreview
+from writerbox.scanner import FileScanner, ScanIndex, WritingFile
+from writerbox.ui import WriterBoxUI
+
+
+@pytest.fixture
+def sample_writings_dir():
+    """Use the actual sample_writings directory for testing."""
+    return Path(__file__).parent.parent / "sample_writings"
+
+
+async def wait_for_scan(app, pilot):
+    """Wait for the background scan to finish and the UI to catch up."""
+    await pilot.pause()
+    # The watch worker runs until the app exits (and an empty list means all)
+    workers = [w for w in app.workers if w.group != "watch"]
+    if workers:
+        await app.workers.wait_for_complete(workers)
+    await pilot.pause()
+
+
+def run_app(app, *keys, check=None):
+    """Run the app headlessly, press keys, then call check(app) while mounted."""
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            for key in keys:
+                await pilot.press(key)
+                await pilot.pause()
+            if check is not None:
+                check(app)
+    asyncio.run(_run())
+    return app
+
+
+def test_sorting_does_not_rescan(sample_writings_dir):
+    """Changing the sort order re-orders loaded files without scanning."""
+    app = WriterBoxUI(sample_writings_dir, use_cache=False)
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            with mock.patch.object(FileScanner, "scan") as scan:
+                await pilot.press("3")
+                await pilot.pause()
+                scan.assert_not_called()
+    asyncio.run(_run())
+
+    assert app.sort == "title"
+    for files in app.categories.values():
+        titles = [f.title_key for f in files]
+        assert titles == sorted(titles)
+
+
+def test_sorting_keeps_tree_in_category_order(sample_writings_dir):
+    """Tree nodes follow the in-memory order after a sort change."""
+    app = WriterBoxUI(sample_writings_dir, use_cache=False)
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            tree = app.query_one("#file-tree")
+            for category_node in tree.root.children:
+                category_node.expand()
+            await pilot.pause()
+            await pilot.press("4")
+            await pilot.pause()
+            for category_node in tree.root.children:
+                files = [node.data for node in category_node.children]
+                assert all(isinstance(f, WritingFile) for f in files)
+                assert files == list(app.categories[category_node.data])
+    asyncio.run(_run())
+
+
+def test_refresh_patches_changed_categories(tmp_path):
+    """Refreshing moves an edited file between categories without a full scan, off the UI thread."""
+    (tmp_path / "a.md").write_text("---\ncategory: poetry\n---\n\nA poem.\n")
+    (tmp_path / "b.md").write_text("---\ncategory: essays\n---\n\nAn essay.\n")
+    app = WriterBoxUI(tmp_path, use_cache=False)
+    threads = []
+    original = ScanIndex.refresh
+
+    def refresh(self):
+        threads.append(threading.current_thread())
+        return original(self)
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            tree = app.query_one("#file-tree")
+            for node in tree.root.children:
+                node.expand()
+            await pilot.pause()
+            path = tmp_path / "a.md"
+            path.write_text("---\ncategory: essays\n---\n\nNow an essay too.\n")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+            with mock.patch.object(FileScanner, "scan") as scan, \
+                    mock.patch.object(ScanIndex, "refresh", refresh):
+                await pilot.press("r")
+                await wait_for_scan(app, pilot)
+                scan.assert_not_called()
+            assert threads and threading.main_thread() not in threads
+
+            labels = {node.data: str(node.label) for node in tree.root.children}
+            assert list(labels) == ["essays"]
+            assert "(2 files)" in labels["essays"]
+            assert len(tree.root.children[0].children) == 2
+            # Footer totals were patched rather than summed again
+            assert app.totals.total.words == sum(f.word_count for f in app.index.files.values()) == 6
+            assert "Categories: 1 " in str(app.query_one("#footer-box").render())
+    asyncio.run(_run())
+
+
+def test_watch_mode_picks_up_changes_off_the_ui_thread(tmp_path):
+    """The watcher is set up and polled in a worker; new files reach the tree."""
+    from writerbox import ui
+    (tmp_path / "a.md").write_text("---\ncategory: poetry\n---\n\nA poem.\n")
+    app = WriterBoxUI(tmp_path, use_cache=False, watch=True)
+    app.WATCH_INTERVAL = 0.05
+    threads = []
+    original = ui.create_watcher
+
+    def create_watcher(*args):
+        threads.append(threading.current_thread())
+        return original(*args)
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            (tmp_path / "b.md").write_text("---\ncategory: essays\n---\n\nAn essay.\n")
+            for _ in range(100):
+                await pilot.pause(0.05)
+                if "essays" in app.categories:
+                    break
+            assert tmp_path / "b.md" in app.index.files
+    with mock.patch.object(ui, "create_watcher", create_watcher):
+        asyncio.run(_run())
+    assert threads and threading.main_thread() not in threads
+    # Closed by the worker on the way out
+    assert getattr(app.watcher, "_fd", -1) == -1
+
+
+def test_large_category_is_shown_a_page_at_a_time(tmp_path):
+    """Only the first rows get nodes; reaching the "more" node loads the next page."""
+    from writerbox.ui import MoreFiles
+    for i in range(25):
+        path = tmp_path / f"note{i:02}.md"
+        path.write_text(f"---\ncategory: journal\n---\n\nEntry {i}.\n")
+        os.utime(path, (1_000_000 + i, 1_000_000 + i))
+    app = WriterBoxUI(tmp_path, use_cache=False)
+    app.TREE_PAGE = 10
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            tree = app.query_one("#file-tree")
+            node = tree.root.children[0]
+            node.expand()
+            await pilot.pause()
+            names = [child.data.filename for child in node.children[:-1]]
+            assert names == [f"note{i:02}.md" for i in range(24, 14, -1)]
+            assert isinstance(node.children[-1].data, MoreFiles)
+            assert "15 more" in str(node.children[-1].label)
+
+            tree.move_cursor(node.children[-1])
+            await pilot.pause()
+            assert len(node.children) == 21
+            assert node.children[10].data.filename == "note14.md"
+
+            tree.move_cursor(node.children[-1])
+            await pilot.pause()
+            names = [child.data.filename for child in node.children]
+            assert names == [f"note{i:02}.md" for i in range(24, -1, -1)]
+    asyncio.run(_run())
+
+
+def test_background_scan_fills_tree_in_batches(tmp_path):
+    """Files stream into the tree and the footer reports the final totals."""
+    for i in range(250):
+        category = ["poetry", "essays", "journal"][i % 3]
+        (tmp_path / f"note{i:03}.md").write_text(f"---\ncategory: {category}\n---\n\nWords {i}.\n")
+    app = WriterBoxUI(tmp_path, use_cache=False)
+    batches = []
+    original = WriterBoxUI.scan_batch_loaded
+
+    def record(self, index, changes, done, total):
+        batches.append((len(changes.added), done, total))
+        original(self, index, changes, done, total)
+
+    def check(app):
+        assert not app.scanning
+        assert len(app.index.files) == 250
+        assert sum(len(files) for files in app.categories.values()) == 250
+        footer = str(app.query_one("#footer-box").render())
+        assert "Files: 250" in footer
+        assert "Scanning" not in footer
+
+    with mock.patch.object(WriterBoxUI, "scan_batch_loaded", record):
+        run_app(app, check=check)
+
+    # Batches arrive while the walk is still going, so the total is only
+    # known for the last one
+    assert batches[0] == (0, 0, None)
+    assert batches[1:] == [(100, 100, None), (150, 250, 250)]
+
+
+def test_refresh_mid_scan_restarts(sample_writings_dir):
+    """Pressing r while scanning cancels the scan and starts a new one."""
+    app = WriterBoxUI(sample_writings_dir, use_cache=False)
+    # Hold the first scan at the starting line
+    app._scan_lock.acquire()
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            first_index = app.index
+            assert app.scanning
+            await pilot.press("r")
+            app._scan_lock.release()
+            await wait_for_scan(app, pilot)
+            assert app.index is not first_index
+            assert not app.scanning
+            assert len(app.index.files) == 19
+    asyncio.run(_run())
+
+
+def test_search_filters_tree(sample_writings_dir):
+    """Typing after / narrows the tree; Escape brings everything back."""
+    app = WriterBoxUI(sample_writings_dir, use_cache=False)
+
+    def file_nodes(tree):
+        return [node.data for category in tree.root.children for node in category.children]
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            # Indexing starts once the scan is done
+            await wait_for_scan(app, pilot)
+            assert app.search_ready
+            tree = app.query_one("#file-tree")
+            for node in tree.root.children:
+                node.expand()
+            await pilot.pause()
+            everything = file_nodes(tree)
+
+            await pilot.press("/")
+            for key in "morning":
+                await pilot.press(key)
+            await pilot.pause()
+            hits = file_nodes(tree)
+            assert hits and len(hits) < len(everything)
+            assert {f.path for f in hits} == app.search_index.search("morning")
+            assert "Matches:" in str(app.query_one("#footer-box").render())
+
+            await pilot.press("escape")
+            await pilot.pause()
+            assert app.search_matches is None
+            # The categories open before the search are restored
+            assert len(file_nodes(tree)) == len(everything)
+    asyncio.run(_run())
+
+
+def test_category_children_are_built_on_expand(sample_writings_dir):
+    """File nodes only exist for open categories, and labels are formatted once."""
+    app = WriterBoxUI(sample_writings_dir, use_cache=False)
+    formatted = []
+    original = WriterBoxUI.format_file_label_simple
+
+    def record(self, file):
+        formatted.append(file)
+        return original(self, file)
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            tree = app.query_one("#file-tree")
+            assert tree.root.children
+            assert all(not node.children for node in tree.root.children)
+            assert formatted == []
+
+            node = tree.root.children[0]
+            node.expand()
+            await pilot.pause()
+            assert [child.data for child in node.children] == list(app.categories[node.data])
+
+            node.collapse()
+            await pilot.pause()
+            assert not node.children
+            node.expand()
+            await pilot.pause()
+            assert len(node.children) == len(app.categories[node.data])
+            assert len(formatted) == len(set(formatted)) == len(node.children)
+
+    with mock.patch.object(WriterBoxUI, "format_file_label_simple", record):
+        asyncio.run(_run())
+
+
+def test_preview_is_debounced_and_cached(sample_writings_dir):
+    """Scrolling past files only renders where the cursor stops."""
+    app = WriterBoxUI(sample_writings_dir, use_cache=False)
+    # Long enough that the key presses all land within it
+    app.PREVIEW_DELAY = 0.5
+    rendered = []
+    original = WriterBoxUI.render_file_preview
+
+    def record(self, file, width):
+        rendered.append(file)
+        return original(self, file, width)
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            tree = app.query_one("#file-tree")
+            for node in tree.root.children:
+                node.expand()
+            await pilot.pause()
+            with mock.patch.object(WriterBoxUI, "render_file_preview", record):
+                await pilot.press("down", "down", "down", "down")
+                await pilot.pause(app.PREVIEW_DELAY * 3)
+                await wait_for_scan(app, pilot)
+                assert rendered == [app.current_file]
+                assert app.current_file is tree.cursor_node.data
+
+                # Going back to a file that was shown (or prefetched) is a cache hit
+                await pilot.press("up")
+                await pilot.pause(app.PREVIEW_DELAY * 3)
+                await wait_for_scan(app, pilot)
+                assert rendered == [tree.get_node_at_line(tree.cursor_line + 1).data]
+    asyncio.run(_run())
+
+
+def test_large_files_are_previewed_in_pages(tmp_path):
+    """A big file shows its first pages, and scrolling renders more."""
+    body = "".join(f"Paragraph {i} " + "word " * 40 + "\n\n" for i in range(2000))
+    (tmp_path / "big.md").write_text("---\ncategory: fiction\n---\n" + body)
+    app = WriterBoxUI(tmp_path, use_cache=False)
+    app.PAGED_PREVIEW_BYTES = 1024
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            tree = app.query_one("#file-tree")
+            tree.root.children[0].expand()
+            await pilot.pause()
+            app.display_file_content(tree.root.children[0].children[0].data)
+            await wait_for_scan(app, pilot)
+
+            preview = app.shown_preview
+            assert isinstance(preview, PagedPreview)
+            assert not preview.complete
+            first = len(preview)
+
+            app.query_one("#file-content").scroll_end(animate=False)
+            await wait_for_scan(app, pilot)
+            assert len(preview) > first
+    asyncio.run(_run())
+
+
+def test_profile_mode_shows_and_saves_timings(sample_writings_dir, tmp_path):
+    """With profiling on, t shows the timings, p profiles a refresh, and exit saves them.
+
+    Files are only sorted when a category is opened, so one is opened first.
+    """
+    from writerbox.profiling import timings
+    from writerbox.ui import TimingScreen
+    output = tmp_path / "profile.json"
+    app = WriterBoxUI(sample_writings_dir, use_cache=False, profile=True, profile_output=output)
+
+    try:
+        def check(app):
+            assert isinstance(app.screen, TimingScreen)
+        run_app(app, "down", "enter", "p", "t", check=check)
+    finally:
+        timings.enabled = False
+        timings.reset()
+
+    phases = json.loads(output.read_text())["phases"]
+    assert {"walk", "parse", "sort", "tree"} <= set(phases)
+    assert (tmp_path / "profile.prof").exists()
+
+
+def test_profile_keys_do_nothing_without_profile_mode(sample_writings_dir, tmp_path, monkeypatch):
+    """Without --profile, p doesn't run cProfile or write anything."""
+    monkeypatch.chdir(tmp_path)
+    app = WriterBoxUI(sample_writings_dir, use_cache=False)
+
+    with mock.patch("writerbox.ui.profile_call") as profile_call:
+        run_app(app, "p")
+    profile_call.assert_not_called()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_tag_browser_filters_tree(sample_writings_dir):
+    """Picking a tag in the browser shows only files with that tag."""
+    app = WriterBoxUI(sample_writings_dir, use_cache=False)
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            tag, count = app.tag_index.counts()[0]
+            assert count == sum(1 for f in app.index.files.values() if tag in f.tags)
+
+            await pilot.press("g")
+            await pilot.pause()
+            # The first entry clears the filter; the most used tag comes next
+            await pilot.press("down", "enter")
+            await pilot.pause()
+            assert app.tag_filter == tag
+            shown = [f for files in app.visible_categories().values() for f in files]
+            assert len(shown) == count and all(tag in f.tags for f in shown)
+            tree = app.query_one("#file-tree")
+            assert sum(len(node.children) for node in tree.root.children) == count
+            assert f"Tag: #{tag}" in str(app.query_one("#footer-box").render())
+            assert f"Matches: {count} |" in str(app.query_one("#footer-box").render())
+
+            # Closing the browser keeps the filter
+            await pilot.press("g")
+            await pilot.pause()
+            await pilot.press("escape")
+            await pilot.pause()
+            assert app.tag_filter == tag
+
+            await pilot.press("escape")
+            await pilot.pause()
+            assert app.tag_filter is None
+    asyncio.run(_run())
+
+
+def test_returning_from_editor_reloads_only_that_file(tmp_path):
+    """An edit is patched into the tree in place, keeping the cursor on the file."""
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.md").write_text(f"---\ncategory: poetry\ntitle: {name}\n---\n\nShort.\n")
+    app = WriterBoxUI(tmp_path, use_cache=False, sort="title")
+
+    def edit(editor, path):
+        path.write_text("---\ncategory: poetry\ntitle: b\n---\n\nMuch longer than it was.\n")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        return 0
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            tree = app.query_one("#file-tree")
+            category = tree.root.children[0]
+            category.expand()
+            await pilot.pause()
+            nodes = list(category.children)
+            tree.move_cursor(nodes[1])
+            await pilot.pause()
+
+            with mock.patch.object(app, "suspend"), \
+                    mock.patch("writerbox.ui.open_in_editor", side_effect=edit), \
+                    mock.patch.object(FileScanner, "scan") as scan, \
+                    mock.patch.object(FileScanner, "find_entries") as walk:
+                app.action_open_file()
+                await wait_for_scan(app, pilot)
+                scan.assert_not_called()
+                walk.assert_not_called()
+
+            # Same nodes, with only the edited one relabelled
+            assert list(category.children) == nodes
+            assert nodes[1].data.word_count == 5
+            assert "5 words" in str(nodes[1].label)
+            assert tree.cursor_node is nodes[1]
+            assert category.is_expanded
+    asyncio.run(_run())
+
+
+def test_editing_category_moves_file_and_keeps_cursor(tmp_path):
+    """A file whose category changed in the editor follows it in the tree."""
+    (tmp_path / "a.md").write_text("---\ncategory: poetry\n---\n\nA poem.\n")
+    (tmp_path / "b.md").write_text("---\ncategory: essays\n---\n\nAn essay.\n")
+    app = WriterBoxUI(tmp_path, use_cache=False)
+    path = tmp_path / "a.md"
+
+    def edit(editor, path):
+        path.write_text("---\ncategory: essays\n---\n\nNow an essay too.\n")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        return 0
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            tree = app.query_one("#file-tree")
+            for node in tree.root.children:
+                node.expand()
+            await pilot.pause()
+            app.select_file(path)
+            await pilot.pause()
+
+            with mock.patch.object(app, "suspend"), \
+                    mock.patch("writerbox.ui.open_in_editor", side_effect=edit):
+                app.action_open_file()
+                await wait_for_scan(app, pilot)
+
+            assert [node.data for node in tree.root.children] == ["essays"]
+            assert tree.cursor_node.data.path == path
+            assert tree.cursor_node.data.category == "essays"
+    asyncio.run(_run())
+
+
+def test_search_box_accepts_field_queries(sample_writings_dir):
+    """Field terms in the / prompt filter by metadata; a half-typed one keeps the last results."""
+    app = WriterBoxUI(sample_writings_dir, use_cache=False)
+
+    async def _run():
+        async with app.run_test() as pilot:
+            await wait_for_scan(app, pilot)
+            await wait_for_scan(app, pilot)
+            await pilot.press("/")
+            for key in "category:poetry":
+                await pilot.press(key)
+            await pilot.pause()
+            assert set(app.visible_categories()) == {"poetry"}
+            assert app.query_error is None
+
+            for key in " words>":
+                await pilot.press(key)
+            await pilot.pause()
+            assert app.query_error is not None
+            assert "Query:" in str(app.query_one("#footer-box").render())
+            # " words" was briefly free text; its results stay up
+            assert app.search_matches == app.search_index.search("words") & \
+                app.query_index.categories["poetry"]
+
+            for key in "40":
+                await pilot.press(key)
+            await pilot.pause()
+            shown = [f for files in app.visible_categories().values() for f in files]
+            assert shown and all(f.category == "poetry" and f.word_count > 40 for f in shown)
+            assert app.query_error is None
+    asyncio.run(_run())
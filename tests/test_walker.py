@@ -0,0 +1,97 @@
+"""Tests for the scandir-based directory walker."""
+
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from writerbox.scanner import FileScanner
+from writerbox.walker import DirectoryWalker, IgnorePattern
+
+
+@pytest.fixture
+def collection(tmp_path):
+    """Create a collection with directories that should be pruned."""
+    for rel in [
+        "a.md",
+        "notes.txt",
+        ".hidden.md",
+        "drafts/b.md",
+        "drafts/old/c.md",
+        ".git/d.md",
+        "node_modules/pkg/e.md",
+        "build/f.md",
+        "archive/keep.md",
+        "archive/skip.md",
+    ]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("words\n")
+    (tmp_path / ".gitignore").write_text("# build output\nbuild/\n")
+    (tmp_path / "archive" / ".gitignore").write_text("*.md\n!keep.md\n")
+    return tmp_path
+
+
+def names(walker):
+    return [path.relative_to(walker.root).as_posix() for path, _ in walker.walk()]
+
+
+def test_walk_prunes_default_and_gitignored_dirs(collection):
+    """VCS, dependency and .gitignore'd directories are skipped."""
+    walker = DirectoryWalker(collection)
+    assert names(walker) == [
+        ".hidden.md",
+        "a.md",
+        "archive/keep.md",
+        "drafts/b.md",
+        "drafts/old/c.md",
+    ]
+
+
+def test_walk_options(collection):
+    """Hidden files, extra excludes and .gitignore handling are configurable."""
+    assert ".hidden.md" not in names(DirectoryWalker(collection, skip_hidden=True))
+    assert "drafts/old/c.md" not in names(DirectoryWalker(collection, excludes=["old/"]))
+    assert "build/f.md" in names(DirectoryWalker(collection, use_gitignore=False))
+    assert names(DirectoryWalker(collection, recursive=False)) == [".hidden.md", "a.md"]
+
+
+def test_walk_returns_stat_results(collection):
+    """Each file comes with the stat result from its directory entry."""
+    for path, stat in DirectoryWalker(collection).walk():
+        assert stat.st_size == path.stat().st_size
+
+
+def test_is_excluded(collection):
+    """Single paths are checked against the same rules as the walk."""
+    walker = DirectoryWalker(collection)
+    assert walker.is_excluded(collection / ".git" / "d.md")
+    assert walker.is_excluded(collection / "build" / "f.md")
+    assert walker.is_excluded(collection / "archive" / "skip.md")
+    assert not walker.is_excluded(collection / "archive" / "keep.md")
+    assert not walker.is_excluded(collection / "drafts" / "old" / "c.md")
+
+
+@pytest.mark.parametrize("pattern, path, is_dir, expected", [
+    ("*.md", "deep/dir/x.md", False, True),
+    ("/x.md", "deep/x.md", False, False),
+    ("docs/*.md", "docs/x.md", False, True),
+    ("docs/*.md", "docs/sub/x.md", False, False),
+    ("docs/**/*.md", "docs/sub/x.md", False, True),
+    ("**/tmp", "a/b/tmp", True, True),
+    ("tmp/", "tmp", False, False),
+    ("draft-?.md", "draft-1.md", False, True),
+    ("draft-[0-9].md", "draft-x.md", False, False),
+])
+def test_ignore_pattern(pattern, path, is_dir, expected):
+    """Gitignore-style globbing rules."""
+    assert IgnorePattern(pattern).matches(path, is_dir) is expected
+
+
+def test_scanner_does_not_stat_twice(collection):
+    """The scanner hands walk stat results to WritingFile."""
+    scanner = FileScanner(collection, recursive=True)
+    with mock.patch.object(Path, "stat", side_effect=AssertionError("extra stat")):
+        files = scanner.scan()
+    assert len(files) == 5
+    assert all(f.signature is not None for f in files)
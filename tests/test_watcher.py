@@ -0,0 +1,77 @@
+"""Tests for filesystem change detection."""
+
+import os
+import sys
+from unittest import mock
+
+import pytest
+
+from writerbox.watcher import InotifyWatcher, PollingWatcher
+
+
+@pytest.fixture
+def collection(tmp_path):
+    """Create a collection with one nested file."""
+    (tmp_path / "a.md").write_text("first\n")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "b.md").write_text("second\n")
+    return tmp_path
+
+
+def bump_mtime(path):
+    """Make sure a rewrite is visible even on coarse mtime filesystems."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+WATCHERS = [PollingWatcher]
+if sys.platform.startswith("linux"):
+    WATCHERS.append(InotifyWatcher)
+
+
+@pytest.mark.parametrize("watcher_class", WATCHERS)
+def test_reports_created_modified_and_deleted(collection, watcher_class):
+    """Changes to markdown files are reported by path."""
+    watcher = watcher_class(collection)
+    try:
+        assert not watcher.poll()
+
+        (collection / "new.md").write_text("hello\n")
+        (collection / "a.md").write_text("first, edited\n")
+        bump_mtime(collection / "a.md")
+        (collection / "sub" / "b.md").unlink()
+        (collection / "notes.txt").write_text("ignored\n")
+
+        changed = watcher.poll()
+        assert collection / "new.md" in changed
+        assert collection / "a.md" in changed
+        assert collection / "sub" / "b.md" in changed
+        assert collection / "notes.txt" not in changed
+        assert not watcher.poll()
+    finally:
+        watcher.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_watches_new_directories(collection):
+    """Files in directories created after start-up are still seen."""
+    watcher = InotifyWatcher(collection)
+    try:
+        new_dir = collection / "later"
+        new_dir.mkdir()
+        assert new_dir in watcher.poll()
+
+        (new_dir / "c.md").write_text("third\n")
+        assert new_dir / "c.md" in watcher.poll()
+    finally:
+        watcher.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_inotify_closes_descriptor_when_setup_fails(collection):
+    """Running out of watches mid-setup doesn't leak the inotify descriptor."""
+    before = len(os.listdir("/proc/self/fd"))
+    with mock.patch.object(InotifyWatcher, "_add_tree", side_effect=OSError(28, "No space")):
+        with pytest.raises(OSError):
+            InotifyWatcher(collection)
+    assert len(os.listdir("/proc/self/fd")) == before